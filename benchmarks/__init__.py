@@ -0,0 +1,9 @@
+"""
+Suite de benchmarks de ClicToriano.
+
+- `sitio_sintetico`: generador de sitios sintéticos servidos por un servidor HTTP local.
+- `escenarios`: escenarios que ejecutan `ClicToris` de extremo a extremo (headless) contra ese sitio.
+- `informe`: resumen (percentiles con `estadisticas.percentil`) y presentación de resultados.
+
+Ejecución: `python3 -m benchmarks --help`
+"""
@@ -0,0 +1,45 @@
+"""Punto de entrada: `python3 -m benchmarks`."""
+
+import argparse
+import sys
+from dataclasses import replace
+
+from benchmarks.escenarios import ESCENARIOS, ejecutar_escenario
+from benchmarks.informe import guardar_json, imprimir_tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de ClicToriano contra un sitio sintético local')
+    parser.add_argument('--escenario', choices=sorted(ESCENARIOS) + ['todos'], default='pequeno',
+                        help="Escenario a ejecutar (default: pequeno; 'todos' ejecuta la suite completa)")
+    parser.add_argument('--browser', choices=['chrome', 'chromium', 'firefox'], default='chrome')
+    parser.add_argument('--backend', choices=['selenium', 'cdp', 'ambos'], default='selenium',
+                        help="Backend de Chrome: 'selenium', 'cdp' o 'ambos' para comparar su latencia (default: selenium)")
+    parser.add_argument('--max-clicks', type=int, help='Sobrescribe el número de clics de cada escenario')
+    parser.add_argument('--json', dest='ruta_json', help='Guardar los resultados en un fichero JSON')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Mostrar el log de ClicToris')
+    args = parser.parse_args()
+
+    nombres = sorted(ESCENARIOS) if args.escenario == 'todos' else [args.escenario]
+    backends = ['selenium', 'cdp'] if args.backend == 'ambos' else [args.backend]
+    resultados = []
+    for nombre in nombres:
+        for backend in backends:
+            escenario = replace(ESCENARIOS[nombre], browser=args.browser, backend=backend)
+            if args.max_clicks:
+                escenario = replace(escenario, max_clicks=args.max_clicks)
+            print(f"▶ Ejecutando escenario '{nombre}' ({backend})...", file=sys.stderr)
+            try:
+                resultados.append(ejecutar_escenario(escenario, verbose=args.verbose))
+            except Exception as e:
+                print(f"✗ Escenario '{nombre}' ({backend}) fallido: {e}", file=sys.stderr)
+
+    if resultados:
+        imprimir_tabla(resultados)
+        if args.ruta_json:
+            guardar_json(resultados, args.ruta_json)
+    sys.exit(0 if len(resultados) == len(nombres) * len(backends) else 1)
+
+
+if __name__ == '__main__':
+    main()
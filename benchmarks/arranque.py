@@ -0,0 +1,86 @@
+"""Benchmark de arranque: coste de importar cada punto de entrada (`python -X importtime`).
+
+Uso: `python3 -m benchmarks.arranque [--presupuesto-ms 150] [--modulo click_enlaces ...]`
+
+Cada módulo se importa en un intérprete nuevo varias veces y se toma el mejor tiempo
+acumulado. Termina con código 1 si algún módulo supera el presupuesto, para poder
+usarlo en CI y detectar importaciones pesadas que vuelvan al arranque.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+__all__ = ["MODULOS", "medir_importacion"]
+
+RAIZ = Path(__file__).resolve().parent.parent
+MODULOS = ('click_enlaces', 'click_enlaces_gui', 'run_selector')
+
+
+def _analizar_importtime(salida: str) -> list[tuple[str, int, int]]:
+    """Devuelve (módulo, propio_us, acumulado_us) por cada línea de `-X importtime`."""
+    filas = []
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or '[us]' in linea:
+            continue
+        try:
+            propio, acumulado, nombre = linea[len('import time:'):].split('|')
+            filas.append((nombre.strip(), int(propio), int(acumulado)))
+        except ValueError:
+            continue
+    return filas
+
+
+def medir_importacion(modulo: str, repeticiones: int = 3, top: int = 5) -> dict:
+    """Importa `modulo` en `repeticiones` intérpretes nuevos y devuelve la mejor medida."""
+    mejor = None
+    for _ in range(repeticiones):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                              cwd=RAIZ, capture_output=True, text=True)
+        if proc.returncode != 0:
+            ultima = (proc.stderr.strip().splitlines() or ['error desconocido'])[-1]
+            return {'modulo': modulo, 'ms': None, 'error': ultima, 'mas_costosos': []}
+        filas = _analizar_importtime(proc.stderr)
+        total = next((acum for nombre, _, acum in filas if nombre == modulo), None)
+        if total is not None and (mejor is None or total < mejor[0]):
+            mejor = (total, filas)
+    if mejor is None:
+        return {'modulo': modulo, 'ms': None, 'error': 'sin datos de importtime', 'mas_costosos': []}
+    total, filas = mejor
+    costosos = sorted(filas, key=lambda f: f[1], reverse=True)[:top]
+    return {
+        'modulo': modulo,
+        'ms': round(total / 1000, 1),
+        'error': None,
+        'mas_costosos': [{'modulo': n, 'ms': round(p / 1000, 1)} for n, p, _ in costosos],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide el tiempo de importación de los puntos de entrada')
+    parser.add_argument('--modulo', action='append', choices=MODULOS,
+                        help='Módulo a medir (se puede repetir; default: todos)')
+    parser.add_argument('--presupuesto-ms', type=float, default=150.0,
+                        help='Tiempo máximo de importación permitido por módulo (default: 150 ms)')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    excedidos = 0
+    for modulo in args.modulo or MODULOS:
+        r = medir_importacion(modulo, repeticiones=args.repeticiones)
+        if r['ms'] is None:
+            print(f"–  {modulo:<20} no disponible ({r['error']})")
+            continue
+        ok = r['ms'] <= args.presupuesto_ms
+        excedidos += not ok
+        print(f"{'✓' if ok else '✗'}  {modulo:<20} {r['ms']:>8.1f} ms  (presupuesto {args.presupuesto_ms:.0f} ms)")
+        for c in r['mas_costosos']:
+            print(f"      {c['modulo']:<40} {c['ms']:>6.1f} ms")
+    sys.exit(1 if excedidos else 0)
+
+
+if __name__ == '__main__':
+    main()
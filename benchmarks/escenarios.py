@@ -0,0 +1,98 @@
+"""
+Escenarios de benchmark que ejecutan `ClicToris` de extremo a extremo en modo headless
+contra un sitio sintético local.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import time
+from dataclasses import dataclass, field
+
+from instrumentacion import InstrumentadorComandos
+
+from benchmarks.informe import resumir
+from benchmarks.sitio_sintetico import ParametrosSitio, SitioSintetico, servir_sitio
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    sitio: ParametrosSitio
+    max_clicks: int = 20
+    browser: str = 'chrome'
+    # 'selenium' (chromedriver) o 'cdp' (DevTools directo)
+    backend: str = 'selenium'
+    # Argumentos adicionales para el constructor de ClicToris
+    opciones: dict = field(default_factory=dict)
+
+
+ESCENARIOS = {
+    'pequeno': Escenario('pequeno', ParametrosSitio(paginas=30, enlaces_por_pagina=8)),
+    'ancho': Escenario('ancho', ParametrosSitio(paginas=200, enlaces_por_pagina=60, profundidad=2)),
+    'profundo': Escenario('profundo', ParametrosSitio(paginas=200, enlaces_por_pagina=5, profundidad=10)),
+    'externos': Escenario('externos', ParametrosSitio(paginas=50, enlaces_por_pagina=10, ratio_externos=0.4)),
+    'dinamico': Escenario('dinamico', ParametrosSitio(paginas=50, enlaces_por_pagina=10, ratio_dinamicos=0.5)),
+    'lento': Escenario('lento', ParametrosSitio(paginas=50, enlaces_por_pagina=10, latencia=0.2)),
+}
+
+
+class _ObservadorBenchmark:
+    """Recoge páginas cargadas y latencia por paso."""
+
+    def __init__(self):
+        self.paginas = 0
+        self.pasos: list[float] = []
+        self.inicio = None
+        self.fin = None
+
+    def al_iniciar(self, programa):
+        self.inicio = time.perf_counter()
+
+    def al_navegar(self, programa, url, segundos, error):
+        if error is None:
+            self.paginas += 1
+
+    def al_paso(self, programa, segundos):
+        self.pasos.append(segundos)
+
+    def al_finalizar(self, programa):
+        self.fin = time.perf_counter()
+
+
+def ejecutar_escenario(escenario: Escenario, verbose: bool = False) -> dict:
+    """Ejecuta `escenario` y devuelve el diccionario de resultados (ver `informe.resumir`)."""
+    from click_enlaces import ClicToris
+
+    servidor, url = servir_sitio(SitioSintetico(escenario.sitio))
+    observador = _ObservadorBenchmark()
+    instrumentador = InstrumentadorComandos(imprimir=False)
+    try:
+        programa = ClicToris(
+            url=url,
+            intervalo_min=0,
+            intervalo_max=0,
+            modo_headless=True,
+            max_clicks=escenario.max_clicks,
+            browser=escenario.browser,
+            link_wait=2,
+            **escenario.opciones,
+        )
+        programa.backend = escenario.backend
+        programa.observadores += [instrumentador, observador]
+        salida = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with salida:
+            programa.ejecutar()
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    if observador.inicio is None:
+        raise RuntimeError(f"El navegador no pudo iniciarse en el escenario '{escenario.nombre}'")
+    duracion = (observador.fin or time.perf_counter()) - observador.inicio
+    resultado = resumir(escenario.nombre, duracion, observador.paginas, len(observador.pasos),
+                        instrumentador.total_comandos(), observador.pasos)
+    resultado['backend'] = escenario.backend
+    resultado['comandos_mas_costosos'] = instrumentador.resumen()[:5]
+    return resultado
@@ -0,0 +1,41 @@
+"""Cálculo de estadísticas y presentación de los resultados de los benchmarks."""
+
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+from estadisticas import percentil
+
+
+def resumir(nombre: str, duracion: float, paginas: int, clics: int, comandos: int, pasos: list[float]) -> dict:
+    """Construye el diccionario de resultados de un escenario."""
+    return {
+        'escenario': nombre,
+        'duracion_s': round(duracion, 3),
+        'paginas': paginas,
+        'clics': clics,
+        'paginas_por_s': round(paginas / duracion, 3) if duracion > 0 else None,
+        'comandos_webdriver': comandos,
+        'comandos_por_clic': round(comandos / clics, 2) if clics else None,
+        'paso_p50_s': _redondear(percentil(pasos, 50)),
+        'paso_p95_s': _redondear(percentil(pasos, 95)),
+    }
+
+
+def _redondear(valor: Optional[float]) -> Optional[float]:
+    return round(valor, 4) if valor is not None else None
+
+
+def imprimir_tabla(resultados: list[dict]) -> None:
+    columnas = ('escenario', 'backend', 'paginas_por_s', 'comandos_por_clic', 'paso_p50_s', 'paso_p95_s', 'clics', 'duracion_s')
+    anchos = [max(len(c), *(len(str(r.get(c))) for r in resultados)) for c in columnas]
+    print('  '.join(c.ljust(a) for c, a in zip(columnas, anchos)))
+    print('  '.join('-' * a for a in anchos))
+    for r in resultados:
+        print('  '.join(str(r.get(c)).ljust(a) for c, a in zip(columnas, anchos)))
+
+
+def guardar_json(resultados: list[dict], ruta: str) -> None:
+    with open(ruta, 'w', encoding='utf-8') as fh:
+        json.dump(resultados, fh, indent=2, ensure_ascii=False)
@@ -0,0 +1,118 @@
+"""
+Generador de sitios sintéticos para los benchmarks.
+
+El sitio se genera de forma determinista a partir de una semilla y se sirve
+desde un `ThreadingHTTPServer` local. Los enlaces externos apuntan al mismo
+servidor usando otro nombre de host (`localhost` frente a `127.0.0.1`), así
+que `ClicToris` los clasifica como externos sin salir de la máquina.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+@dataclass
+class ParametrosSitio:
+    paginas: int = 50
+    enlaces_por_pagina: int = 10
+    profundidad: int = 3
+    ratio_externos: float = 0.1
+    ratio_dinamicos: float = 0.0
+    latencia: float = 0.0
+    semilla: int = 1234
+
+
+class SitioSintetico:
+    """Grafo de páginas sintéticas generado a partir de `ParametrosSitio`."""
+
+    def __init__(self, parametros: Optional[ParametrosSitio] = None):
+        self.parametros = parametros or ParametrosSitio()
+        p = self.parametros
+        rnd = random.Random(p.semilla)
+        # Repartir las páginas en niveles; la página 0 es la portada (nivel 0)
+        self.nivel = [0] * p.paginas
+        if p.profundidad > 0:
+            for i in range(1, p.paginas):
+                self.nivel[i] = 1 + ((i - 1) * p.profundidad) // max(1, p.paginas - 1)
+        self.enlaces: list[list[tuple[str, int, bool]]] = []
+        for pagina in range(p.paginas):
+            limite = self.nivel[pagina] + 1
+            destinos = [j for j in range(p.paginas) if self.nivel[j] <= limite and j != pagina] or [0]
+            enlaces = []
+            for _ in range(p.enlaces_por_pagina):
+                tipo = 'ext' if rnd.random() < p.ratio_externos else 'int'
+                dinamico = rnd.random() < p.ratio_dinamicos
+                enlaces.append((tipo, rnd.choice(destinos), dinamico))
+            self.enlaces.append(enlaces)
+
+    def html(self, pagina: int, host_interno: str, host_externo: str) -> str:
+        estaticos = []
+        dinamicos = []
+        for tipo, destino, dinamico in self.enlaces[pagina]:
+            host = host_externo if tipo == 'ext' else host_interno
+            ruta = f"/ext/{destino}" if tipo == 'ext' else f"/p/{destino}"
+            href = f"http://{host}{ruta}"
+            texto = f"{'Externo' if tipo == 'ext' else 'Página'} {destino}"
+            if dinamico:
+                dinamicos.append((href, texto))
+            else:
+                estaticos.append(f'<li><a href="{escape(href)}">{escape(texto)}</a></li>')
+        script = ''
+        if dinamicos:
+            items = ','.join(f'["{escape(h)}","{escape(t)}"]' for h, t in dinamicos)
+            script = (
+                "<script>setTimeout(function(){var ul=document.getElementById('enlaces');"
+                f"[{items}].forEach(function(e){{var li=document.createElement('li');"
+                "var a=document.createElement('a');a.href=e[0];a.textContent=e[1];"
+                "li.appendChild(a);ul.appendChild(li);});},200);</script>"
+            )
+        return (
+            f"<!doctype html><html><head><meta charset='utf-8'><title>Página {pagina}</title></head>"
+            f"<body><h1>Página {pagina} (nivel {self.nivel[pagina]})</h1>"
+            f"<ul id='enlaces'>{''.join(estaticos)}</ul>{script}</body></html>"
+        )
+
+
+def servir_sitio(sitio: SitioSintetico, puerto: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Sirve `sitio` en un hilo daemon y devuelve `(servidor, url_portada)`."""
+    latencia = sitio.parametros.latencia
+
+    class _Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latencia:
+                time.sleep(latencia)
+            partes = self.path.split('?', 1)[0].strip('/').split('/')
+            puerto_local = self.server.server_address[1]
+            try:
+                if partes == ['']:
+                    pagina = 0
+                elif len(partes) == 2 and partes[0] in ('p', 'ext'):
+                    pagina = int(partes[1])
+                else:
+                    raise ValueError
+                if not 0 <= pagina < len(sitio.enlaces):
+                    raise ValueError
+            except ValueError:
+                self.send_error(404)
+                return
+            cuerpo = sitio.html(pagina, f"127.0.0.1:{puerto_local}", f"localhost:{puerto_local}").encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, format, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', puerto), _Manejador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='sitio-sintetico', daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/"
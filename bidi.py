@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Modo WebDriver BiDi para sesiones de Firefox (`--backend bidi`).
+
+Con WebDriver clásico la única forma de saber si una página tiene enlaces o si se abrió
+una pestaña es preguntar una y otra vez (o dormir un tiempo fijo). Con BiDi, geckodriver
+devuelve en `capabilities['webSocketUrl']` un websocket por el que Firefox empuja eventos.
+`SesionBiDi` se suscribe a ellos y `ClicToris` espera exactamente hasta que ocurren:
+
+- `browsingContext.contextCreated` / `contextDestroyed`: pestañas abiertas sin pedir
+  `window_handles` en cada paso.
+- `browsingContext.navigationStarted` / `load`: carga de las pestañas nuevas.
+- `script.message`: un script de precarga con un `MutationObserver` avisa en cuanto el
+  documento contiene un enlace `http(s)`, en lugar de sondear cada medio segundo.
+
+Los identificadores de contexto de nivel superior coinciden con los `window_handles`
+de WebDriver clásico en Firefox, así que ambos protocolos se combinan en la misma sesión.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from cdp import ErrorCDP, _ConexionCDP, _TransporteWebSocket
+
+__all__ = ["SesionBiDi", "ErrorCDP"]
+
+_EVENTOS = ('browsingContext.contextCreated', 'browsingContext.contextDestroyed',
+            'browsingContext.navigationStarted', 'browsingContext.load', 'script.message')
+
+_CANAL_ENLACES = 'clictoris-enlaces'
+
+# Se ejecuta en cada documento nuevo antes que sus propios scripts. Usa el mismo criterio
+# que `obtener_enlaces` sobre el documento principal (URLs ya resueltas, `data-href`,
+# `role="link"`); los enlaces dentro de shadow roots o iframes los detecta el sondeo de
+# respaldo de `ClicToris._esperar_enlaces_iniciales`.
+_SCRIPT_ENLACES = """(aviso) => {
+  const destino = (e) => {
+    let v = e.getAttribute('data-href');
+    if (e.localName === 'a' || e.localName === 'area') v = e.getAttribute('href') || v;
+    else if (!v) v = e.getAttribute('href');
+    if (!v) return false;
+    try { return /^https?:/.test(new URL(v, e.baseURI).href); } catch (_) { return false; }
+  };
+  const hay = () => Array.prototype.some.call(
+    document.querySelectorAll('a[href], area[href], [data-href], [role="link"]'), destino);
+  const comprobar = () => {
+    if (!hay()) return false;
+    aviso('listo');
+    return true;
+  };
+  const observar = () => {
+    if (comprobar()) return;
+    const obs = new MutationObserver(() => { if (comprobar()) obs.disconnect(); });
+    obs.observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['href', 'data-href', 'role']});
+  };
+  if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', observar);
+  else observar();
+}"""
+
+
+class SesionBiDi:
+    """Conexión BiDi de una sesión de Firefox con el estado de sus pestañas mantenido por eventos."""
+
+    def __init__(self, url_websocket: str, timeout: float = 30):
+        self._conexion = _ConexionCDP(_TransporteWebSocket(url_websocket))
+        self._estado = threading.Condition()
+        # contexto de nivel superior -> {'url': ..., 'cargada': bool, 'enlaces': bool}
+        self._contextos: dict[str, dict] = {}
+        manejadores = (self._al_crear_contexto, self._al_destruir_contexto, self._al_iniciar_navegacion,
+                       self._al_cargar, self._al_mensaje)
+        for evento, manejador in zip(_EVENTOS, manejadores):
+            self._conexion.suscribir(evento, manejador)
+        try:
+            self._conexion.enviar('session.subscribe', {'events': list(_EVENTOS)}, timeout=timeout)
+            self._conexion.enviar('script.addPreloadScript', {
+                'functionDeclaration': _SCRIPT_ENLACES,
+                'arguments': [{'type': 'channel', 'value': {'channel': _CANAL_ENLACES}}],
+            }, timeout=timeout)
+            arbol = self._conexion.enviar('browsingContext.getTree', {'maxDepth': 0}, timeout=timeout)
+        except BaseException:
+            self.cerrar()
+            raise
+        with self._estado:
+            for info in arbol.get('contexts') or ():
+                # Documentos ya cargados antes de la precarga: sin aviso de enlaces
+                self._contextos.setdefault(info['context'], {'url': info.get('url'), 'cargada': True,
+                                                              'enlaces': None})
+
+    @property
+    def activa(self) -> bool:
+        return not self._conexion.cerrada
+
+    # --- Eventos ---
+
+    def _al_crear_contexto(self, params, _sesion) -> None:
+        if params.get('parent'):
+            return
+        with self._estado:
+            self._contextos.setdefault(params['context'], {'url': params.get('url'), 'cargada': False,
+                                                           'enlaces': False})
+            self._estado.notify_all()
+
+    def _al_destruir_contexto(self, params, _sesion) -> None:
+        with self._estado:
+            if self._contextos.pop(params.get('context'), None) is not None:
+                self._estado.notify_all()
+
+    def _al_iniciar_navegacion(self, params, _sesion) -> None:
+        with self._estado:
+            info = self._contextos.get(params.get('context'))
+            if info is not None:
+                info.update(url=params.get('url'), cargada=False, enlaces=False)
+                self._estado.notify_all()
+
+    def _al_cargar(self, params, _sesion) -> None:
+        with self._estado:
+            info = self._contextos.get(params.get('context'))
+            if info is not None:
+                info.update(url=params.get('url'), cargada=True)
+                self._estado.notify_all()
+
+    def _al_mensaje(self, params, _sesion) -> None:
+        if params.get('channel') != _CANAL_ENLACES:
+            return
+        with self._estado:
+            info = self._contextos.get((params.get('source') or {}).get('context'))
+            if info is not None:
+                info['enlaces'] = True
+                self._estado.notify_all()
+
+    # --- Consultas y esperas ---
+
+    def _esperar(self, condicion, timeout: float):
+        limite = time.monotonic() + timeout
+        with self._estado:
+            while True:
+                resultado = condicion()
+                if resultado or not self.activa:
+                    return resultado
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return resultado
+                self._estado.wait(min(restante, 0.5))
+
+    def contextos(self) -> list:
+        """Pestañas de nivel superior abiertas (equivalente a `window_handles`, sin round-trip)."""
+        with self._estado:
+            return list(self._contextos)
+
+    def esperar_contexto_nuevo(self, conocidos, timeout: float = 5) -> Optional[str]:
+        """Espera a que se abra una pestaña que no esté en `conocidos` y devuelve su id."""
+        conocidos = set(conocidos)
+        return self._esperar(lambda: next((c for c in self._contextos if c not in conocidos), None), timeout)
+
+    def esperar_carga(self, contexto: str, timeout: float) -> bool:
+        """Espera al evento `load` de un documento real (no el about:blank inicial) en `contexto`."""
+        def cargada():
+            info = self._contextos.get(contexto)
+            return bool(info and info['cargada'] and info.get('url') not in (None, 'about:blank'))
+        return self._esperar(cargada, timeout)
+
+    def esperar_enlaces(self, contexto: str, timeout: float) -> bool:
+        """Espera al aviso del script de precarga de que hay algún enlace http(s)."""
+        return self._esperar(lambda: bool((self._contextos.get(contexto) or {}).get('enlaces')), timeout)
+
+    def cerrar_contexto(self, contexto: str) -> None:
+        """Cierra una pestaña sin cambiar el foco de la sesión clásica."""
+        self._conexion.enviar('browsingContext.close', {'context': contexto}, timeout=10)
+
+    def cerrar(self) -> None:
+        self._conexion.cerrar()
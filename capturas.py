@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Capturas de las páginas visitadas (captura de pantalla + HTML) como evidencia de regresión.
+
+El bucle principal sólo obtiene los bytes en bruto y los entrega a un hilo escritor
+a través de una cola acotada. El escritor calcula el hash de contenido, descarta
+duplicados, comprime el HTML y escribe cada objeto en un directorio direccionado
+por contenido:
+
+    <dir>/objetos/ab/abcdef....html.gz
+    <dir>/objetos/12/123456....png
+    <dir>/indice.jsonl            (una línea por captura: url, hora y hashes)
+
+Si la cola está llena, la captura se omite (y se contabiliza) en lugar de esperar:
+la E/S de disco nunca bloquea la navegación.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+__all__ = ["CapturadorPaginas"]
+
+_FIN = object()
+
+
+class CapturadorPaginas:
+    """Observador de `ClicToris` que captura pantalla y HTML tras cada navegación."""
+
+    def __init__(self, directorio: str = 'capturas', capacidad: int = 16,
+                 pantalla: bool = True, html: bool = True):
+        self.directorio = Path(directorio).expanduser()
+        self.pantalla = pantalla
+        self.html = html
+        self._cola: queue.Queue = queue.Queue(maxsize=max(1, capacidad))
+        self._hilo = None
+        self._sesiones = 0
+        self._lock = threading.Lock()
+        self._hashes = set()
+        self.capturadas = 0
+        self.deduplicadas = 0
+        self.descartadas = 0
+        self.errores = 0
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iniciar(self, programa) -> None:
+        # Varias sesiones (modo lote) comparten un único escritor
+        with self._lock:
+            self._sesiones += 1
+            if self._hilo is not None:
+                return
+            (self.directorio / 'objetos').mkdir(parents=True, exist_ok=True)
+            self._hilo = threading.Thread(target=self._escritor, name='clictoriano-capturas', daemon=True)
+            self._hilo.start()
+
+    def al_navegar(self, programa, url, segundos, error) -> None:
+        if error is not None or self._hilo is None:
+            return
+        # Contrapresión: si el escritor va retrasado no pedimos ni siquiera los bytes
+        if self._cola.full():
+            self.descartadas += 1
+            return
+        driver = programa.driver
+        png = driver.get_screenshot_as_png() if self.pantalla else None
+        fuente = driver.page_source if self.html else None
+        try:
+            self._cola.put_nowait((time.time(), url, png, fuente))
+        except queue.Full:
+            self.descartadas += 1
+
+    def al_finalizar(self, programa) -> None:
+        with self._lock:
+            self._sesiones = max(0, self._sesiones - 1)
+            if self._hilo is None or self._sesiones:
+                return
+        # El centinela puede esperar: la navegación ya terminó
+        self._cola.put(_FIN)
+        self._hilo.join(timeout=60)
+        self._hilo = None
+        print(f"📸 Capturas: {self.capturadas} guardadas, {self.deduplicadas} objetos deduplicados, "
+              f"{self.descartadas} omitidas por cola llena → {self.directorio}")
+
+    # --- Escritor en segundo plano ---
+
+    def _escritor(self) -> None:
+        with open(self.directorio / 'indice.jsonl', 'a', encoding='utf-8') as indice:
+            while True:
+                elemento = self._cola.get()
+                if elemento is _FIN:
+                    break
+                marca, url, png, fuente = elemento
+                try:
+                    entrada = {'ts': round(marca, 3), 'url': url}
+                    if png is not None:
+                        entrada['png'] = self._guardar(png, '.png', comprimir=False)
+                    if fuente is not None:
+                        entrada['html'] = self._guardar(fuente.encode('utf-8'), '.html.gz', comprimir=True)
+                    indice.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+                    indice.flush()
+                    self.capturadas += 1
+                except OSError:
+                    self.errores += 1
+
+    def _guardar(self, datos: bytes, sufijo: str, comprimir: bool) -> str:
+        """Guarda `datos` direccionado por su sha256 y devuelve el hash."""
+        resumen = hashlib.sha256(datos).hexdigest()
+        destino = self.directorio / 'objetos' / resumen[:2] / (resumen + sufijo)
+        if resumen in self._hashes or destino.exists():
+            self._hashes.add(resumen)
+            self.deduplicadas += 1
+            return resumen
+        destino.parent.mkdir(exist_ok=True)
+        if comprimir:
+            # mtime=0 para que el mismo contenido produzca siempre el mismo fichero
+            datos = gzip.compress(datos, compresslevel=6, mtime=0)
+        fd, temporal = tempfile.mkstemp(dir=destino.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(datos)
+            os.replace(temporal, destino)
+        except BaseException:
+            try:
+                os.unlink(temporal)
+            except OSError:
+                pass
+            raise
+        self._hashes.add(resumen)
+        return resumen
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Backend DevTools directo para Chrome/Chromium (sin chromedriver).
+
+Con Selenium cada acción recorre Python → HTTP → chromedriver → CDP → Chrome. Este módulo
+lanza el navegador con `--remote-debugging-pipe` (POSIX) o `--remote-debugging-port=0` +
+websocket (Windows, o `transporte='websocket'`) y le habla el protocolo DevTools
+directamente: desaparece el proceso chromedriver y un salto por comando.
+
+`NavegadorCDP` implementa la parte de la interfaz de Selenium WebDriver que usan
+`ClicToris` y sus observadores: `get`, `current_url`, `execute_script`,
+`find_elements` (por etiqueta o selector CSS), ventanas (`window_handles`,
+`switch_to.window`, `close`), `get_log('performance')` (modo link-check),
+`get_screenshot_as_png`, `page_source`, `service.process` (métricas de RSS) y
+`command_executor.execute` (instrumentación de comandos).
+
+`find_elements` obtiene en un único round-trip el `href` y el texto de todos los
+elementos; `get_attribute('href')` y `.text` no vuelven a consultar al navegador. Los
+elementos que devuelve `execute_script` llegan igual, como `ElementoCDP`.
+
+Uso:
+
+    programa = ClicToris(url, ...)
+    programa.backend = 'cdp'       # o `--backend cdp` en la CLI
+"""
+
+from __future__ import annotations
+
+import base64
+import collections
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+__all__ = ["NavegadorCDP", "ErrorCDP", "ErrorJavascriptCDP"]
+
+try:
+    from selenium.common.exceptions import JavascriptException as _ErrorJavascriptBase
+    from selenium.common.exceptions import WebDriverException as _ErrorBase
+except ImportError:
+    _ErrorBase = _ErrorJavascriptBase = Exception
+
+
+class ErrorCDP(_ErrorBase):
+    """Error del protocolo o conexión perdida.
+
+    Hereda de `WebDriverException` si Selenium está instalado, de modo que `ClicToris`
+    trata los fallos de ambos backends de la misma forma.
+    """
+
+
+class ErrorJavascriptCDP(ErrorCDP, _ErrorJavascriptBase):
+    """Excepción lanzada por un script de la página (`JavascriptException` con Selenium)."""
+
+
+# Opciones que chromedriver añade por defecto y de las que depende ClicToris
+# (p.ej. `window.open` sin bloqueador de ventanas emergentes)
+_ARGUMENTOS_BASE = ('--no-first-run', '--no-default-browser-check', '--disable-popup-blocking',
+                    '--disable-background-networking', '--disable-default-apps', '--disable-sync',
+                    '--password-store=basic', '--use-mock-keychain')
+
+# Métodos cuyos eventos se guardan para `get_log('performance')` (modo link-check)
+_EVENTOS_RED = ('Page.frameNavigated', 'Network.requestWillBeSent',
+                'Network.responseReceived', 'Network.loadingFailed')
+
+_SCRIPT_BUSCAR = """(function(sel){
+  var d = document;
+  if (!d.__clictoris) d.__clictoris = Math.random().toString(36).slice(2);
+  return {doc: d.__clictoris, items: Array.prototype.map.call(d.querySelectorAll(sel), function(e){
+    var h = (typeof e.href === 'string') ? e.href : e.getAttribute('href');
+    return {href: h, text: e.innerText || e.textContent || ''};
+  })};
+})(%s)"""
+
+# Ejecuta un script y sustituye los elementos del resultado por marcas resolubles después,
+# igual que WebDriver devuelve referencias a elementos en `execute_script`
+_SCRIPT_EJECUTAR = """(function(r){
+  var d = document;
+  function marcar(v) {
+    if (!v || typeof v !== 'object') return v;
+    if (v.nodeType === 1) {
+      if (!d.__clictoris) d.__clictoris = Math.random().toString(36).slice(2);
+      var nodos = d.__clictorisNodos || (d.__clictorisNodos = []);
+      var ids = d.__clictorisIds || (d.__clictorisIds = new Map());
+      var i = ids.get(v);
+      if (i === undefined) { i = nodos.length; nodos.push(v); ids.set(v, i); }
+      var h = (typeof v.href === 'string') ? v.href : v.getAttribute('href');
+      return {__clictorisNodo: i, doc: d.__clictoris, href: h, text: v.innerText || v.textContent || ''};
+    }
+    if (Array.isArray(v)) return v.map(marcar);
+    if (Object.getPrototypeOf(v) !== Object.prototype) return v;
+    var o = {};
+    for (var k in v) o[k] = marcar(v[k]);
+    return o;
+  }
+  return marcar(r);
+})((function(){%s
+}).apply(window, [%s]))"""
+
+_SCRIPT_RESOLVER_NODO = ("(function(){var d=document;"
+                         "if(d.__clictoris!==%s)throw new Error('stale element reference');"
+                         "var e=(d.__clictorisNodos||[])[%d];"
+                         "if(!e||!e.isConnected)throw new Error('stale element reference');return e;})()")
+
+_SCRIPT_RESOLVER = ("(function(){var d=document;"
+                    "if(d.__clictoris!==%s)throw new Error('stale element reference');"
+                    "var e=d.querySelectorAll(%s)[%d];"
+                    "if(!e)throw new Error('stale element reference');return e;})()")
+
+
+# --- Transportes ---------------------------------------------------------------------
+
+class _TransportePipe:
+    """Mensajes JSON separados por NUL sobre los descriptores 3 (entrada) y 4 (salida) de Chrome."""
+
+    def __init__(self, fd_escritura: int, fd_lectura: int):
+        self._fd_escritura = fd_escritura
+        self._fd_lectura = fd_lectura
+        self._buffer = b''
+        self._lock = threading.Lock()
+
+    def enviar(self, texto: str) -> None:
+        datos = texto.encode('utf-8') + b'\0'
+        with self._lock:
+            while datos:
+                escritos = os.write(self._fd_escritura, datos)
+                datos = datos[escritos:]
+
+    def recibir(self) -> Optional[str]:
+        while b'\0' not in self._buffer:
+            try:
+                bloque = os.read(self._fd_lectura, 1 << 16)
+            except OSError:
+                return None
+            if not bloque:
+                return None
+            self._buffer += bloque
+        mensaje, self._buffer = self._buffer.split(b'\0', 1)
+        return mensaje.decode('utf-8', 'replace')
+
+    def cerrar(self) -> None:
+        for fd in (self._fd_escritura, self._fd_lectura):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class _TransporteWebSocket:
+    """Websocket local de DevTools (usa `websocket-client`, dependencia de Selenium)."""
+
+    def __init__(self, url: str):
+        from websocket import create_connection
+        self._ws = create_connection(url, timeout=30, suppress_origin=True, enable_multithread=True)
+        self._ws.settimeout(None)
+
+    def enviar(self, texto: str) -> None:
+        try:
+            self._ws.send(texto)
+        except Exception as e:
+            raise OSError(str(e)) from e
+
+    def recibir(self) -> Optional[str]:
+        try:
+            mensaje = self._ws.recv()
+        except Exception:
+            return None
+        return mensaje or None
+
+    def cerrar(self) -> None:
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+# --- Conexión ------------------------------------------------------------------------
+
+class _ConexionCDP:
+    """Empareja peticiones y respuestas por `id` y reparte los eventos a sus manejadores.
+
+    El formato de mensajes de WebDriver BiDi es compatible, así que `bidi.py` la reutiliza.
+    """
+
+    def __init__(self, transporte):
+        self._transporte = transporte
+        self._ids = itertools.count(1)
+        self._pendientes: dict[int, dict] = {}
+        self._manejadores: dict[str, list] = collections.defaultdict(list)
+        self._lock = threading.Lock()
+        self.cerrada = False
+        self._hilo = threading.Thread(target=self._leer, name='clictoriano-cdp', daemon=True)
+        self._hilo.start()
+
+    def enviar(self, metodo: str, params: Optional[dict] = None, sesion: Optional[str] = None,
+               timeout: float = 60) -> dict:
+        if self.cerrada:
+            raise ErrorCDP(f"{metodo}: conexión con el navegador cerrada")
+        identificador = next(self._ids)
+        hueco = {'evento': threading.Event(), 'respuesta': None}
+        mensaje = {'id': identificador, 'method': metodo, 'params': params or {}}
+        if sesion:
+            mensaje['sessionId'] = sesion
+        with self._lock:
+            self._pendientes[identificador] = hueco
+        try:
+            self._transporte.enviar(json.dumps(mensaje))
+        except OSError as e:
+            with self._lock:
+                self._pendientes.pop(identificador, None)
+            raise ErrorCDP(f"{metodo}: {e}") from e
+        if not hueco['evento'].wait(timeout):
+            with self._lock:
+                self._pendientes.pop(identificador, None)
+            raise ErrorCDP(f"{metodo}: tiempo de espera agotado ({timeout:.0f} s)")
+        respuesta = hueco['respuesta']
+        if respuesta is None:
+            raise ErrorCDP(f"{metodo}: conexión con el navegador cerrada")
+        if 'error' in respuesta:
+            error = respuesta['error']
+            # CDP: {"error": {"message": ...}}; WebDriver BiDi: {"error": "código", "message": ...}
+            texto = error.get('message') if isinstance(error, dict) else f"{error}: {respuesta.get('message')}"
+            raise ErrorCDP(f"{metodo}: {texto}")
+        return respuesta.get('result') or {}
+
+    def suscribir(self, metodo: str, manejador) -> None:
+        """`manejador(params, sesion)` se llama desde el hilo lector para cada evento `metodo`."""
+        self._manejadores[metodo].append(manejador)
+
+    def _leer(self) -> None:
+        while True:
+            texto = self._transporte.recibir()
+            if texto is None:
+                break
+            try:
+                mensaje = json.loads(texto)
+            except ValueError:
+                continue
+            if 'id' in mensaje:
+                with self._lock:
+                    hueco = self._pendientes.pop(mensaje['id'], None)
+                if hueco:
+                    hueco['respuesta'] = mensaje
+                    hueco['evento'].set()
+                continue
+            for manejador in self._manejadores.get(mensaje.get('method'), ()):
+                try:
+                    manejador(mensaje.get('params') or {}, mensaje.get('sessionId'))
+                except Exception:
+                    pass
+        # El navegador se cerró: despertar a quien siga esperando respuesta
+        self.cerrada = True
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+        for hueco in pendientes.values():
+            hueco['evento'].set()
+
+    def cerrar(self) -> None:
+        self._transporte.cerrar()
+
+
+# --- Adaptador con interfaz de WebDriver ---------------------------------------------
+
+class ElementoCDP:
+    """Elemento devuelto por `find_elements` o `execute_script`, con `href` y texto ya leídos.
+
+    Se localiza de nuevo por selector e índice o, si `selector` es None, por su posición
+    entre los elementos que `execute_script` devolvió en el mismo documento.
+    """
+
+    def __init__(self, navegador: 'NavegadorCDP', documento: str, selector: Optional[str], indice: int,
+                 href: Optional[str], texto: str):
+        self._navegador = navegador
+        self._documento = documento
+        self._selector = selector
+        self._indice = indice
+        self._href = href
+        self.text = (texto or '').strip()
+
+    def _expresion(self) -> str:
+        if self._selector is None:
+            return _SCRIPT_RESOLVER_NODO % (json.dumps(self._documento), self._indice)
+        return _SCRIPT_RESOLVER % (json.dumps(self._documento), json.dumps(self._selector), self._indice)
+
+    def get_attribute(self, nombre: str):
+        if nombre == 'href':
+            return self._href
+        return self._navegador.execute_script(
+            "var e=arguments[0], n=arguments[1], v=e[n];"
+            "return (v === undefined || v === null || typeof v === 'object' || typeof v === 'function')"
+            " ? e.getAttribute(n) : v;", self, nombre)
+
+
+class _CambioVentana:
+    def __init__(self, navegador: 'NavegadorCDP'):
+        self._navegador = navegador
+
+    def window(self, handle: str) -> None:
+        self._navegador._activar(handle)
+
+
+class _Ejecutor:
+    """Equivalente a `command_executor` de Selenium: todos los comandos CDP pasan por aquí."""
+
+    def __init__(self, conexion: _ConexionCDP):
+        self._conexion = conexion
+
+    def execute(self, command: str, params: dict) -> dict:
+        params = dict(params or {})
+        sesion = params.pop('sessionId', None)
+        timeout = params.pop('_timeout', 60)
+        return self._conexion.enviar(command, params, sesion=sesion, timeout=timeout)
+
+
+class NavegadorCDP:
+    """Chrome/Chromium controlado por DevTools, con la interfaz de WebDriver que usa ClicToris."""
+
+    TAG_NAME = 'tag name'
+    CSS_SELECTOR = 'css selector'
+
+    def __init__(self, binario: str, argumentos=(), transporte: Optional[str] = None,
+                 javascript_enabled: bool = True, registro_red: bool = False,
+                 timeout_carga: float = 60, timeout_arranque: float = 30):
+        self.timeout_carga = timeout_carga
+        self.javascript_enabled = javascript_enabled
+        self.registro_red = registro_red
+        transporte = transporte or ('websocket' if os.name == 'nt' else 'pipe')
+        self._perfil = tempfile.mkdtemp(prefix='clictoriano-cdp-')
+        comando = [binario, f'--user-data-dir={self._perfil}', *_ARGUMENTOS_BASE, *argumentos]
+        # Sin URL inicial (o con --app=<url>) Chrome abre una única pestaña
+        if not any(a.startswith('--app=') for a in comando):
+            comando.append('about:blank')
+        try:
+            if transporte == 'pipe':
+                self._proceso, conexion = self._lanzar_pipe(comando)
+            elif transporte == 'websocket':
+                self._proceso, conexion = self._lanzar_websocket(comando, timeout_arranque)
+            else:
+                raise ValueError(f"Transporte CDP no soportado: {transporte}")
+        except BaseException:
+            shutil.rmtree(self._perfil, ignore_errors=True)
+            raise
+        self._conexion = conexion
+        # Compatibilidad con los observadores pensados para Selenium
+        self.service = SimpleNamespace(process=self._proceso)
+        self.command_executor = _Ejecutor(conexion)
+        self.switch_to = _CambioVentana(self)
+
+        self._lock = threading.Condition()
+        self._sesiones: dict[str, str] = {}       # targetId -> sessionId
+        self._cargas: dict[str, set] = collections.defaultdict(set)  # sessionId -> loaderIds cargados
+        self._eventos_red = collections.deque(maxlen=20000)
+        self._actual: Optional[str] = None
+        conexion.suscribir('Page.lifecycleEvent', self._al_ciclo_vida)
+        conexion.suscribir('Target.detachedFromTarget', self._al_desconectar)
+        if registro_red:
+            for metodo in _EVENTOS_RED:
+                conexion.suscribir(metodo, self._registrar_evento(metodo))
+
+        try:
+            limite = time.monotonic() + timeout_arranque
+            while True:
+                paginas = self.window_handles
+                if paginas:
+                    break
+                if time.monotonic() >= limite:
+                    raise ErrorCDP("el navegador no abrió ninguna pestaña")
+                time.sleep(0.1)
+            self._activar(paginas[0])
+        except BaseException:
+            self.quit()
+            raise
+
+    # --- Arranque ---
+
+    def _lanzar_pipe(self, comando):
+        # Chrome lee los comandos del fd 3 y escribe las respuestas en el fd 4
+        lectura_chrome, escritura_nuestra = os.pipe()
+        lectura_nuestra, escritura_chrome = os.pipe()
+        # `exec` en un shell coloca las tuberías en 3 y 4 sin preexec_fn (seguro con hilos)
+        envoltorio = ['/bin/sh', '-c', f'exec "$0" "$@" 3<&{lectura_chrome} 4>&{escritura_chrome}',
+                      *comando, '--remote-debugging-pipe']
+        try:
+            proceso = subprocess.Popen(envoltorio, pass_fds=(lectura_chrome, escritura_chrome),
+                                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL)
+        except BaseException:
+            for fd in (escritura_nuestra, lectura_nuestra):
+                os.close(fd)
+            raise
+        finally:
+            os.close(lectura_chrome)
+            os.close(escritura_chrome)
+        return proceso, _ConexionCDP(_TransportePipe(escritura_nuestra, lectura_nuestra))
+
+    def _lanzar_websocket(self, comando, timeout_arranque: float):
+        proceso = subprocess.Popen([*comando, '--remote-debugging-port=0'], stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Chrome escribe el puerto y la ruta del websocket en <perfil>/DevToolsActivePort
+        ruta = os.path.join(self._perfil, 'DevToolsActivePort')
+        limite = time.monotonic() + timeout_arranque
+        while True:
+            try:
+                with open(ruta, 'r', encoding='utf-8') as fh:
+                    lineas = fh.read().split()
+                if len(lineas) >= 2:
+                    break
+            except OSError:
+                pass
+            if proceso.poll() is not None or time.monotonic() >= limite:
+                proceso.kill()
+                raise ErrorCDP("no se pudo conectar con el puerto de depuración de Chrome")
+            time.sleep(0.05)
+        try:
+            return proceso, _ConexionCDP(_TransporteWebSocket(f"ws://127.0.0.1:{lineas[0]}{lineas[1]}"))
+        except Exception:
+            proceso.kill()
+            raise
+
+    # --- Eventos ---
+
+    def _al_ciclo_vida(self, params, sesion) -> None:
+        if params.get('name') == 'load' and params.get('loaderId'):
+            with self._lock:
+                self._cargas[sesion].add(params['loaderId'])
+                self._lock.notify_all()
+
+    def _al_desconectar(self, params, sesion) -> None:
+        with self._lock:
+            for objetivo, s in list(self._sesiones.items()):
+                if s == params.get('sessionId'):
+                    del self._sesiones[objetivo]
+            self._cargas.pop(params.get('sessionId'), None)
+
+    def _registrar_evento(self, metodo):
+        def manejador(params, sesion):
+            if sesion and sesion == self._sesiones.get(self._actual):
+                self._eventos_red.append({'method': metodo, 'params': params})
+        return manejador
+
+    # --- Comandos ---
+
+    def _comando(self, metodo: str, params: Optional[dict] = None, sesion: bool = True, **extra) -> dict:
+        params = dict(params or {})
+        if sesion:
+            params['sessionId'] = self._sesion_actual()
+        params.update(extra)
+        return self.command_executor.execute(metodo, params)
+
+    def _sesion_actual(self) -> str:
+        sesion = self._sesiones.get(self._actual) if self._actual else None
+        if not sesion:
+            raise ErrorCDP("no such window: la ventana actual está cerrada")
+        return sesion
+
+    def _activar(self, objetivo: str) -> None:
+        """Se conecta (una vez) a la pestaña `objetivo` y la convierte en la actual."""
+        if objetivo not in self._sesiones:
+            r = self._comando('Target.attachToTarget', {'targetId': objetivo, 'flatten': True}, sesion=False)
+            sesion = r['sessionId']
+            self._sesiones[objetivo] = sesion
+            self._actual = objetivo
+            self._comando('Page.enable')
+            self._comando('Page.setLifecycleEventsEnabled', {'enabled': True})
+            if self.registro_red:
+                self._comando('Network.enable')
+            if not self.javascript_enabled:
+                self._comando('Emulation.setScriptExecutionDisabled', {'value': True})
+        self._actual = objetivo
+
+    def _evaluar(self, expresion: str):
+        r = self._comando('Runtime.evaluate', {'expression': expresion, 'returnByValue': True,
+                                               'awaitPromise': False, 'userGesture': True})
+        if r.get('exceptionDetails'):
+            detalle = r['exceptionDetails']
+            texto = (detalle.get('exception') or {}).get('description') or detalle.get('text')
+            raise ErrorJavascriptCDP(f"javascript error: {texto}")
+        return (r.get('result') or {}).get('value')
+
+    # --- Interfaz WebDriver ---
+
+    def get(self, url: str) -> None:
+        sesion = self._sesion_actual()
+        r = self._comando('Page.navigate', {'url': url}, _timeout=self.timeout_carga)
+        if r.get('errorText'):
+            raise ErrorCDP(f"unknown error: {r['errorText']}")
+        cargador = r.get('loaderId')
+        if not cargador:
+            # Navegación dentro del mismo documento (#fragmento): no hay evento load
+            return
+        limite = time.monotonic() + self.timeout_carga
+        with self._lock:
+            while cargador not in self._cargas[sesion]:
+                restante = limite - time.monotonic()
+                if restante <= 0 or self._conexion.cerrada:
+                    raise ErrorCDP(f"timeout: la página no terminó de cargar en {self.timeout_carga:.0f} s")
+                self._lock.wait(min(restante, 0.5))
+            self._cargas[sesion].clear()
+
+    @property
+    def current_url(self) -> str:
+        return self._evaluar('location.href')
+
+    @property
+    def title(self) -> str:
+        return self._evaluar('document.title')
+
+    @property
+    def page_source(self) -> str:
+        return self._evaluar('document.documentElement ? document.documentElement.outerHTML : ""')
+
+    def execute_script(self, script: str, *args):
+        argumentos = ', '.join(a._expresion() if isinstance(a, ElementoCDP) else json.dumps(a) for a in args)
+        return self._elementos(self._evaluar(_SCRIPT_EJECUTAR % (script, argumentos)))
+
+    def _elementos(self, valor):
+        """Convierte las marcas de elemento de `_SCRIPT_EJECUTAR` en `ElementoCDP`."""
+        if isinstance(valor, list):
+            return [self._elementos(v) for v in valor]
+        if isinstance(valor, dict):
+            if '__clictorisNodo' in valor:
+                return ElementoCDP(self, valor.get('doc'), None, valor['__clictorisNodo'],
+                                   valor.get('href'), valor.get('text'))
+            return {clave: self._elementos(v) for clave, v in valor.items()}
+        return valor
+
+    def find_elements(self, by: str = TAG_NAME, value: str = '*') -> list:
+        if by not in (self.TAG_NAME, self.CSS_SELECTOR):
+            raise ErrorCDP(f"estrategia de búsqueda no soportada por el backend CDP: {by}")
+        selector = value
+        datos = self._evaluar(_SCRIPT_BUSCAR % json.dumps(selector)) or {}
+        documento = datos.get('doc')
+        return [ElementoCDP(self, documento, selector, i, item.get('href'), item.get('text'))
+                for i, item in enumerate(datos.get('items') or ())]
+
+    @property
+    def window_handles(self) -> list:
+        r = self._comando('Target.getTargets', sesion=False)
+        return [t['targetId'] for t in r.get('targetInfos', ()) if t.get('type') == 'page']
+
+    @property
+    def current_window_handle(self) -> str:
+        if self._conexion.cerrada:
+            raise ErrorCDP("conexión con el navegador cerrada")
+        self._sesion_actual()
+        return self._actual
+
+    def close(self) -> None:
+        objetivo = self._actual
+        if objetivo is None:
+            raise ErrorCDP("no such window: la ventana actual está cerrada")
+        self._comando('Target.closeTarget', {'targetId': objetivo}, sesion=False)
+        with self._lock:
+            sesion = self._sesiones.pop(objetivo, None)
+            self._cargas.pop(sesion, None)
+        self._actual = None
+
+    def _ventana(self) -> int:
+        r = self._comando('Browser.getWindowForTarget', {'targetId': self._actual}, sesion=False)
+        return r['windowId']
+
+    def set_window_position(self, x: int, y: int) -> None:
+        self._comando('Browser.setWindowBounds', {'windowId': self._ventana(),
+                                                  'bounds': {'left': x, 'top': y, 'windowState': 'normal'}},
+                      sesion=False)
+
+    def maximize_window(self) -> None:
+        self._comando('Browser.setWindowBounds', {'windowId': self._ventana(),
+                                                  'bounds': {'windowState': 'maximized'}}, sesion=False)
+
+    def get_screenshot_as_png(self) -> bytes:
+        r = self._comando('Page.captureScreenshot', {'format': 'png'})
+        return base64.b64decode(r.get('data', ''))
+
+    def get_log(self, tipo: str) -> list:
+        """Eventos de red en el formato del log de rendimiento de chromedriver."""
+        if tipo != 'performance' or not self.registro_red:
+            raise ErrorCDP(f"log '{tipo}' no disponible en el backend CDP")
+        entradas = []
+        while self._eventos_red:
+            entradas.append({'message': json.dumps({'message': self._eventos_red.popleft()})})
+        return entradas
+
+    def quit(self) -> None:
+        try:
+            if not self._conexion.cerrada:
+                self._comando('Browser.close', sesion=False, _timeout=5)
+        except Exception:
+            pass
+        try:
+            self._proceso.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proceso.kill()
+            try:
+                self._proceso.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+        self._conexion.cerrar()
+        shutil.rmtree(self._perfil, ignore_errors=True)
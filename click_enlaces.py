@@ -7,18 +7,105 @@ import argparse
 import time
 import random
 from urllib.parse import urlparse
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException, NoSuchElementException, StaleElementReferenceException, NoSuchWindowException, TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
 import sys
 import platform
 import os
+import shutil
 import threading
-import json
-from pathlib import Path
+from configuracion import cargar_configuracion
+
+# Selenium se importa la primera vez que se crea un ClicToris (ver _cargar_selenium),
+# de modo que `--help`, la GUI y el selector arrancan sin pagar su coste.
+webdriver = By = Options = Service = WebDriverWait = None
+WebDriverException = NoSuchElementException = StaleElementReferenceException = None
+NoSuchWindowException = TimeoutException = JavascriptException = None
+
+# Recorrido en la página que devuelve de una vez todos los destinos navegables: `<a>` y
+# `<area>` con href, elementos con `data-href` o `role="link"`, también dentro de shadow
+# roots abiertos e iframes del mismo origen. Para los enlaces de un iframe se devuelve
+# el iframe del documento principal, que es el único elemento que WebDriver puede usar
+# desde el contexto de nivel superior (p.ej. para el scroll).
+# Con `arguments[0]` verdadero, cada enlace lleva además `visible`, `en_viewport` y
+# `obstruido` (otro elemento recibe el clic en su centro), combinados con los del iframe
+# que lo contiene.
+_SCRIPT_ENLACES = """
+var SELECTOR = 'a[href], area[href], [data-href], [role="link"]';
+var BANDERAS = !!arguments[0];
+var resultado = [];
+function destino(e) {
+  var v = e.getAttribute('data-href');
+  if (e.localName === 'a' || e.localName === 'area') v = e.getAttribute('href') || v;
+  else if (!v) v = e.getAttribute('href');
+  if (!v) return null;
+  try { v = new URL(v, e.baseURI).href; } catch (_) { return null; }
+  return /^https?:/.test(v) ? v : null;
+}
+function estado(e, raiz) {
+  // Un <area> se ve y se pulsa a través de la imagen que usa su mapa
+  var caja = e, mapa = e.localName === 'area' ? e.closest('map') : null;
+  if (mapa && mapa.name) caja = raiz.querySelector('img[usemap="#' + CSS.escape(mapa.name) + '"]') || e;
+  var vista = caja.ownerDocument.defaultView;
+  var r = caja.getClientRects()[0];
+  var visible = !!r && r.width > 0 && r.height > 0 && (caja.checkVisibility
+    ? caja.checkVisibility({checkOpacity: true, checkVisibilityCSS: true})
+    : vista.getComputedStyle(caja).visibility !== 'hidden');
+  var enViewport = visible && r.bottom > 0 && r.right > 0 && r.top < vista.innerHeight && r.left < vista.innerWidth;
+  var obstruido = false;
+  if (enViewport) {
+    var x = Math.min(Math.max((r.left + r.right) / 2, 0), vista.innerWidth - 1);
+    var y = Math.min(Math.max((r.top + r.bottom) / 2, 0), vista.innerHeight - 1);
+    var encima = raiz.elementFromPoint(x, y);
+    obstruido = !!encima && encima !== e && !caja.contains(encima) && !e.contains(encima);
+  }
+  return {visible: visible, en_viewport: enViewport, obstruido: obstruido};
+}
+function combinar(a, b) {
+  if (!b) return a;
+  return {visible: a.visible && b.visible, en_viewport: a.en_viewport && b.en_viewport, obstruido: a.obstruido || b.obstruido};
+}
+function recorrer(raiz, marco, exterior) {
+  raiz.querySelectorAll(SELECTOR).forEach(function (e) {
+    var url = destino(e);
+    if (!url) return;
+    var texto = e.innerText || e.textContent || e.getAttribute('aria-label') || e.getAttribute('alt') || e.getAttribute('title') || '';
+    var enlace = {url: url, texto: texto.trim().slice(0, 200), elemento: marco || e};
+    if (BANDERAS) {
+      var banderas = combinar(estado(e, raiz), exterior);
+      enlace.visible = banderas.visible;
+      enlace.en_viewport = banderas.en_viewport;
+      enlace.obstruido = banderas.obstruido;
+    }
+    resultado.push(enlace);
+  });
+  raiz.querySelectorAll('*').forEach(function (e) {
+    if (e.shadowRoot) recorrer(e.shadowRoot, marco, exterior);
+    if (e.localName === 'iframe' || e.localName === 'frame') {
+      var doc = null;
+      try { doc = e.contentDocument; } catch (_) {}
+      if (doc && doc.documentElement) recorrer(doc, marco || e, BANDERAS ? combinar(estado(e, raiz), exterior) : null);
+    }
+  });
+}
+recorrer(document, null, null);
+return resultado;
+"""
+
+
+def _cargar_selenium():
+    """Importa Selenium bajo demanda y publica sus nombres en este módulo."""
+    global webdriver, By, Options, Service, WebDriverWait
+    global WebDriverException, NoSuchElementException, StaleElementReferenceException
+    global NoSuchWindowException, TimeoutException, JavascriptException
+    if webdriver is not None:
+        return
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import WebDriverException, NoSuchElementException, StaleElementReferenceException, NoSuchWindowException, TimeoutException, JavascriptException
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium import webdriver as _webdriver
+    webdriver = _webdriver
+
 
 class ClicToris:
     def __init__(self, url, intervalo_min=5, intervalo_max=10, modo_headless=False, max_clicks=None, chrome_path=None, external_links_policy='new_tab', link_wait=10, browser='chrome', javascript_enabled=True, secure_dns_enabled=False):
@@ -32,6 +119,7 @@ class ClicToris:
             modo_headless (bool): Si True, ejecuta el navegador sin interfaz gráfica
             max_clicks (int): Número máximo de clics (None = infinito)
         """
+        _cargar_selenium()
         self.url = url
         self.intervalo_min = intervalo_min
         self.intervalo_max = intervalo_max
@@ -55,10 +143,116 @@ class ClicToris:
         self.scroll_policy = 'none'
         # Tiempo máximo (s) para esperar enlaces dinámicos tras cargar la página
         self.link_wait = link_wait
+        # Enlaces elegibles: 'any' | 'visible' | 'clickable' (visible y sin nada encima) |
+        # 'viewport' (clickable y ya en pantalla)
+        self.link_filter = 'any'
         # Habilitar o deshabilitar JavaScript
         self.javascript_enabled = javascript_enabled
         # Habilitar o deshabilitar Secure DNS (DoH)
         self.secure_dns_enabled = secure_dns_enabled
+        # Observadores opcionales (métricas, etc.): objetos con métodos `al_<evento>`
+        self.observadores = []
+        # Comprobador opcional de estado HTTP de cada navegación (modo link-check)
+        self.comprobador_enlaces = None
+        # Última URL cargada en la pestaña principal (evita pedir current_url en cada paso)
+        self.url_actual = url
+        # Detector opcional de páginas casi duplicadas (SimHash)
+        self.detector_duplicados = None
+        # Detector opcional de trampas de rastreo (plantillas de URL de bajo rendimiento)
+        self.detector_trampas = None
+        # Clics realizados en el recorrido actual
+        self.contador_clics = 0
+        # Instante (time.monotonic) a partir del cual se corta el recorrido (None = sin límite)
+        self.limite_tiempo = None
+        # Señal para detener el bucle desde otro hilo
+        self._detener = threading.Event()
+        # Backend de control: 'selenium' (WebDriver clásico), 'cdp' (Chrome por DevTools, sin
+        # chromedriver) o 'bidi' (Firefox con eventos WebDriver BiDi)
+        self.backend = 'selenium'
+        # Sesión WebDriver BiDi activa (sólo con backend 'bidi' en Firefox)
+        self._bidi = None
+        # Política opcional de reciclado del navegador (ver reciclaje.py)
+        self.reciclaje = None
+        # Control adaptativo de sesiones activas y ritmo (ver concurrencia.py)
+        self.concurrencia = None
+
+    def _emitir(self, evento, *args):
+        """Notifica `evento` a los observadores registrados.
+
+        Cada observador puede implementar `al_<evento>(programa, *args)`; los errores
+        de un observador nunca interrumpen la navegación.
+        """
+        for observador in list(getattr(self, 'observadores', ())):
+            manejador = getattr(observador, evento, None)
+            if manejador is None:
+                continue
+            try:
+                manejador(self, *args)
+            except Exception:
+                pass
+
+    def _navegar(self, url):
+        """Carga `url` en la pestaña actual midiendo la latencia para los observadores.
+
+        Devuelve el resultado del comprobador de enlaces (estado HTTP, redirecciones,
+        URL final) si el modo link-check está activo, o None.
+        """
+        inicio = time.perf_counter()
+        try:
+            self.driver.get(url)
+        except Exception as e:
+            self._emitir('al_navegar', url, time.perf_counter() - inicio, e)
+            if self.comprobador_enlaces:
+                # Los fallos de red (net::ERR_*) son los enlaces rotos más habituales
+                try:
+                    self.comprobador_enlaces.registrar_error(self.driver, url, e)
+                except Exception:
+                    pass
+            raise
+        self._emitir('al_navegar', url, time.perf_counter() - inicio, None)
+        self.url_actual = url
+        if self.comprobador_enlaces:
+            resultado = self.comprobador_enlaces.registrar(self.driver, url)
+            self.url_actual = resultado.get('url_final') or url
+            return resultado
+        return None
+
+    def _priorizar(self, pendientes):
+        """Aplica los filtros opcionales de selección a los enlaces pendientes."""
+        if self.link_filter != 'any':
+            pendientes = [e for e in pendientes if self._alcanzable(e)]
+        if self.detector_duplicados:
+            pendientes = self.detector_duplicados.filtrar(pendientes)
+        if self.detector_trampas:
+            pendientes = self.detector_trampas.filtrar(pendientes)
+        return pendientes
+
+    def _alcanzable(self, enlace):
+        """True si `enlace` cumple `link_filter` según las banderas calculadas en la página."""
+        # Sin banderas (p.ej. búsqueda de respaldo por <a>) no se descarta nada
+        alcanzable = enlace.get('visible', True)
+        if self.link_filter in ('clickable', 'viewport'):
+            alcanzable = alcanzable and not enlace.get('obstruido', False)
+        if self.link_filter == 'viewport':
+            alcanzable = alcanzable and enlace.get('en_viewport', True)
+        return alcanzable
+
+    def _elegir_enlace(self, pendientes):
+        """Elige al azar el siguiente enlace, ponderando por plantilla si hay detector de trampas."""
+        if self.detector_trampas and self.detector_trampas.modo == 'deprioritize':
+            return random.choices(pendientes, weights=self.detector_trampas.pesos(pendientes))[0]
+        return random.choice(pendientes)
+
+    def _informar_carga(self, resultado, mensaje_ok):
+        """Imprime el resultado de una navegación teniendo en cuenta el estado HTTP si se conoce."""
+        if resultado and resultado.get('roto'):
+            detalle = f"HTTP {resultado['estado']}" if resultado.get('estado') else resultado.get('error')
+            print(f"    ✗ Enlace roto: {detalle}")
+        else:
+            estado = f" (HTTP {resultado['estado']})" if resultado and resultado.get('estado') else ''
+            print(f"    {mensaje_ok}{estado}")
+        if resultado and resultado.get('redirecciones'):
+            print(f"    ↪️  {len(resultado['redirecciones'])} redirección(es) → {resultado.get('url_final')}")
 
     def _apply_scroll(self, elemento, policy=None):
         """Aplica scroll según la política configurada antes de interactuar con un elemento.
@@ -111,7 +305,6 @@ class ClicToris:
     def iniciar_navegador(self):
         """Inicializa el navegador según la opción `browser` (chrome/chromium/firefox)"""
         import os
-        import subprocess
         
         # Asegurar que ~/.local/bin esté en PATH para geckodriver y otros binarios
         local_bin = os.path.expanduser('~/.local/bin')
@@ -136,6 +329,8 @@ class ClicToris:
                         self.driver = None
             # Si el usuario pidió Firefox, usar FirefoxOptions y el driver correspondiente
             if self.browser == 'firefox':
+                if self.backend == 'cdp':
+                    print("ℹ️  El backend CDP sólo está disponible para Chrome/Chromium; Firefox usa Selenium")
                 from selenium.webdriver.firefox.options import Options as FirefoxOptions
                 from selenium.webdriver.firefox.service import Service as FirefoxService
                 firefox_options = FirefoxOptions()
@@ -145,6 +340,10 @@ class ClicToris:
                 # Configurar JavaScript para Firefox
                 firefox_options.set_preference("javascript.enabled", self.javascript_enabled)
 
+                # Modo BiDi: geckodriver devuelve el websocket de eventos en la capability webSocketUrl
+                if self.backend == 'bidi':
+                    firefox_options.set_capability('webSocketUrl', True)
+
                 # Configurar Secure DNS (DoH) para Firefox
                 if self.secure_dns_enabled:
                     # 2 = TRR (Trusted Recursive Resolver) preferred
@@ -169,6 +368,7 @@ class ClicToris:
                     # Dejar que Selenium Manager maneje geckodriver si es necesario
                     self.driver = webdriver.Firefox(options=firefox_options)
                     print(f"✓ Firefox iniciado correctamente")
+                    self._conectar_bidi()
                     return True
                 except Exception as e:
                     # Al fallar, intentar instalar/usar geckodriver compatible si el módulo webdrivers está disponible
@@ -184,6 +384,7 @@ class ClicToris:
                                     serv = FirefoxService(executable_path=driver_path)
                                     self.driver = webdriver.Firefox(service=serv, options=firefox_options)
                                     print(f"✓ Firefox iniciado correctamente usando geckodriver: {driver_path}")
+                                    self._conectar_bidi()
                                     return True
                                 except Exception as e2:
                                     print(f"⚠️  Reintento con geckodriver descargado falló: {e2}")
@@ -194,6 +395,8 @@ class ClicToris:
                     # Si todo falla, re-raise para que el llamador lo maneje
                     raise e
 
+            if self.backend == 'bidi':
+                print("ℹ️  El modo BiDi sólo está disponible para Firefox; Chrome/Chromium usa Selenium")
             chrome_options = Options()
             if self.modo_headless:
                 chrome_options.add_argument('--headless=new')
@@ -214,6 +417,10 @@ class ClicToris:
                 # Usar Google DNS
                 chrome_options.add_argument('--dns-over-https-templates=https://dns.google/dns-query{?dns}')
 
+            # Modo link-check: activar eventos de red en el log de rendimiento
+            if self.comprobador_enlaces:
+                self.comprobador_enlaces.preparar_opciones_chrome(chrome_options)
+
             # Si no estamos en modo headless, iniciar Chrome directamente en la URL
             # objetivo para evitar que aparezca primero una pestaña about:blank.
             if not self.modo_headless and getattr(self, 'url', None):
@@ -230,13 +437,8 @@ class ClicToris:
             # Configuración de rutas según el sistema operativo
             sistema = platform.system()
 
-            # Función interna para validar que el binario funciona
-            def _validar_binario(ruta):
-                try:
-                    subprocess.run([ruta, '--version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-                    return True
-                except Exception:
-                    return False
+            # Validar que el binario funciona (`--version`), con caché por mtime/tamaño
+            from descubrimiento import binario_valido as _validar_binario, recordar_resuelto, resuelto
 
             # Intentar usar ruta proporcionada por CLI o variables de entorno
             # Soporta varias variables de entorno comunes por compatibilidad
@@ -291,6 +493,10 @@ class ClicToris:
                             '/usr/bin/google-chrome-stable',
                             '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'  # macOS
                         ]
+                # Probar primero la ruta que se resolvió en la ejecución anterior
+                anterior = resuelto(self.browser)
+                if anterior in posibles:
+                    posibles = [anterior] + [p for p in posibles if p != anterior]
                 # Probar y registrar el resultado de cada ruta candidata (útil para diagnóstico)
                 revisadas = []
                 for p in posibles:
@@ -298,6 +504,7 @@ class ClicToris:
                     revisadas.append((p, ok))
                     if ok:
                         binary_location = p
+                        recordar_resuelto(self.browser, p)
                         break
 
             if binary_location:
@@ -314,6 +521,10 @@ class ClicToris:
                     pass
                 print("    Intentando iniciar el navegador, confiando en Selenium Manager para encontrarlo.")
 
+            # Backend DevTools directo: sin chromedriver
+            if self.backend == 'cdp':
+                return self._iniciar_cdp(binary_location, chrome_options.arguments)
+
             # Intentar iniciar el driver
             try:
                 self.driver = webdriver.Chrome(options=chrome_options)
@@ -350,27 +561,156 @@ class ClicToris:
             print(f"     chromedriver --version")
             return False
     
-    def obtener_enlaces(self):
-        """Obtiene todos los enlaces de la página actual (internos y externos)"""
+    def _iniciar_cdp(self, binario, argumentos):
+        """Arranca Chrome/Chromium controlado por el protocolo DevTools (ver cdp.py)."""
+        from cdp import NavegadorCDP
+        binario = binario or next((shutil.which(n) for n in ('google-chrome', 'chromium', 'chromium-browser', 'chrome')
+                                   if shutil.which(n)), None)
+        if not binario:
+            print("✗ El backend CDP necesita un binario de Chrome/Chromium (usa --chrome-path)")
+            return False
         try:
-            # Buscar todos los elementos <a> con atributo href
-            elementos = self.driver.find_elements(By.TAG_NAME, "a")
-            enlaces = []
+            self.driver = NavegadorCDP(binario, argumentos, javascript_enabled=self.javascript_enabled,
+                                       registro_red=bool(self.comprobador_enlaces))
+        except Exception as e:
+            print(f"✗ Error al iniciar el navegador con el backend CDP: {e}")
+            return False
+        print("✓ Navegador iniciado correctamente (backend CDP, sin chromedriver)")
+        return True
 
-            for elemento in elementos:
+    def _conectar_bidi(self):
+        """Abre la sesión WebDriver BiDi de Firefox si se pidió el backend 'bidi' (ver bidi.py)."""
+        self._bidi = None
+        if self.backend != 'bidi':
+            return
+        url = (getattr(self.driver, 'capabilities', None) or {}).get('webSocketUrl')
+        if not isinstance(url, str):
+            print("⚠️  geckodriver no ofrece WebDriver BiDi (actualízalo); se usa el modo clásico")
+            return
+        try:
+            from bidi import SesionBiDi
+            self._bidi = SesionBiDi(url)
+            print("✓ Sesión WebDriver BiDi activa (eventos de carga y pestañas)")
+        except Exception as e:
+            print(f"⚠️  No se pudo abrir la sesión BiDi ({e}); se usa el modo clásico")
+
+    def _esperar_enlaces_iniciales(self):
+        """Espera (hasta `link_wait`) a que la página inicial tenga algún enlace http(s)."""
+        espera = getattr(self, 'link_wait', 10)
+        if self._bidi and self._bidi.activa:
+            # `get` ya esperó al evento load: basta con el aviso del script de precarga
+            try:
+                contexto = self.driver.current_window_handle
+                limite = time.monotonic() + espera
+                # El aviso despierta en cuanto aparece un enlace; entre avisos se comprueba
+                # con el recorrido completo (shadow DOM, iframes, documentos sin precarga)
+                while not self._bidi.esperar_enlaces(contexto, 0):
+                    if self._hay_enlaces():
+                        return
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        return
+                    self._bidi.esperar_enlaces(contexto, min(restante, 0.5))
+            except Exception:
+                pass
+            return
+        time.sleep(2)  # Esperar a que cargue la página
+        # Esperar activamente hasta que aparezca al menos un enlace http(s), también en shadow DOM o iframes
+        try:
+            WebDriverWait(self.driver, espera, poll_frequency=0.5).until(lambda d: self._hay_enlaces())
+        except TimeoutException:
+            # Si no aparece en el tiempo dado, continuar de todos modos
+            pass
+        except Exception:
+            pass
+
+    def _visitar_en_pestana(self, url):
+        """Abre `url` en una pestaña nueva, deja que cargue y la cierra; el foco queda en la principal."""
+        if self.comprobador_enlaces:
+            self._comprobar_en_pestana(url)
+            return
+        if self._bidi and self._bidi.activa:
+            conocidos = self._bidi.contextos()
+            self.driver.execute_script(f"window.open('{url}', '_blank');")
+            print(f"    ✓ Enlace abierto en nueva pestaña")
+            # Reaccionar a los eventos en lugar de dormir un tiempo fijo
+            nueva = self._bidi.esperar_contexto_nuevo(conocidos, timeout=5)
+            if nueva:
+                self._bidi.esperar_carga(nueva, timeout=getattr(self, 'link_wait', 10))
                 try:
-                    href = elemento.get_attribute("href")
+                    self._bidi.cerrar_contexto(nueva)
                 except Exception:
-                    continue
+                    pass
+            return
+        self.driver.execute_script(f"window.open('{url}', '_blank');")
+        print(f"    ✓ Enlace abierto en nueva pestaña")
+        # Esperar un momento para que se abra la pestaña
+        time.sleep(1)
+        # Cerrar cualquier pestaña que no sea la principal
+        ventanas = self.driver.window_handles
+        for ventana in ventanas:
+            if ventana != self.ventana_principal:
+                try:
+                    self.driver.switch_to.window(ventana)
+                    self.driver.close()
+                except Exception:
+                    pass
+        # Volver a la ventana principal
+        try:
+            self.driver.switch_to.window(self.ventana_principal)
+        except Exception:
+            pass
+
+    def _comprobar_en_pestana(self, url):
+        """Variante de `_visitar_en_pestana` para el modo link-check.
+
+        La carga se hace con `_navegar` dentro de la pestaña nueva, de modo que los enlaces
+        externos también pasan por el comprobador (estado HTTP, redirecciones o fallo de red).
+        """
+        conocidas = set(self.driver.window_handles)
+        self.driver.execute_script("window.open('about:blank', '_blank');")
+        nuevas = [v for v in self.driver.window_handles if v not in conocidas]
+        if not nuevas:
+            raise RuntimeError("No se pudo abrir una pestaña nueva")
+        url_previa = self.url_actual
+        self.driver.switch_to.window(nuevas[0])
+        try:
+            resultado = self._navegar(url)
+            self._informar_carga(resultado, "✓ Enlace externo comprobado en nueva pestaña")
+        except Exception as e:
+            # El fallo ya quedó anotado en el informe; la sesión sigue siendo válida
+            detalle = (str(e).strip().splitlines() or [e.__class__.__name__])[0]
+            print(f"    ✗ Enlace roto: {detalle}")
+        finally:
+            self.url_actual = url_previa
+            self.driver.close()
+            self.driver.switch_to.window(self.ventana_principal)
+
+    def obtener_enlaces(self):
+        """Obtiene todos los enlaces de la página actual (internos y externos).
+
+        Un único script recorre el documento, sus shadow roots abiertos y los iframes del
+        mismo origen, y devuelve URL, texto y elemento de cada enlace en un solo round-trip.
+        """
+        try:
+            enlaces = []
+
+            for encontrado in self._buscar_enlaces():
+                href = encontrado.get('url')
                 if href and href.startswith("http"):
                     # Verificar si el enlace es interno o externo
                     es_interno = href.startswith(self.dominio_base)
-                    enlaces.append({
+                    enlace = {
                         'url': href,
-                        'texto': (elemento.text or '[Sin texto]')[:200],
-                        'elemento': elemento,
+                        'texto': (encontrado.get('texto') or '[Sin texto]')[:200],
+                        'elemento': encontrado.get('elemento'),
                         'es_interno': es_interno
-                    })
+                    }
+                    # Banderas de visibilidad (sólo con --link-filter)
+                    for clave in ('visible', 'en_viewport', 'obstruido'):
+                        if clave in encontrado:
+                            enlace[clave] = encontrado[clave]
+                    enlaces.append(enlace)
 
             return enlaces
         except (StaleElementReferenceException, WebDriverException, NoSuchWindowException) as e:
@@ -382,321 +722,433 @@ class ClicToris:
         except Exception as e:
             print(f"Error al obtener enlaces: {e}")
             return []
+
+    def _buscar_enlaces(self):
+        """Destinos navegables de la página como dicts con 'url', 'texto' y 'elemento'."""
+        try:
+            return self.driver.execute_script(_SCRIPT_ENLACES, self.link_filter != 'any') or []
+        except JavascriptException:
+            # El script no pudo ejecutarse: sólo los <a> del documento principal
+            return self._enlaces_por_anclas()
+
+    def _hay_enlaces(self):
+        """True si la página tiene algún enlace http(s) con el mismo criterio que `obtener_enlaces`."""
+        return any((e.get('url') or '').startswith('http') for e in self._buscar_enlaces())
+
+    def _enlaces_por_anclas(self):
+        """Enlaces `<a>` del documento principal consultados elemento a elemento."""
+        encontrados = []
+        for elemento in self.driver.find_elements(By.TAG_NAME, "a"):
+            try:
+                href = elemento.get_attribute("href")
+            except Exception:
+                continue
+            encontrados.append({'url': href, 'texto': elemento.text, 'elemento': elemento})
+        return encontrados
     
     def ejecutar(self):
         """Ejecuta el programa principal"""
         if not self.iniciar_navegador():
             return
+        self._emitir('al_iniciar')
         
         try:
-            # Cargar la página inicial
-            print(f"\n🌐 Cargando URL: {self.url}")
-            print(f"🔒 Dominio base: {self.dominio_base}")
-            print(f"   • Enlaces internos: navegar en la misma pestaña")
-            policy = getattr(self, 'external_policy', 'new_tab')
-            policy_map = {
-                'new_tab': 'abrir en nueva pestaña',
-                'same_window': 'abrir en la misma ventana',
-                'ignore': 'ignorar enlaces externos'
-            }
-            print(f"   • Enlaces externos: {policy_map.get(policy, 'abrir en nueva pestaña')}")
-            # Navegar a la URL si el navegador NO arrancó ya con la URL
-            # (cuando usamos --app=<url> evitamos about:blank inicial).
-            if not getattr(self, '_started_with_url', False):
-                self.driver.get(self.url)
+            self.recorrer()
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Programa interrumpido por el usuario")
+            print(f"Total de clics realizados: {self.contador_clics}")
+            print(f"Total de enlaces visitados: {len(self.enlaces_visitados)}")
+        
+        finally:
+            self.cerrar_navegador()
+
+    def cerrar_navegador(self):
+        """Notifica el final a los observadores y cierra el navegador si sigue abierto."""
+        self._emitir('al_finalizar')
+        if self._bidi:
+            self._bidi.cerrar()
+            self._bidi = None
+        if self.driver:
             try:
-                if getattr(self, '_started_offscreen', False):
-                    try:
-                        # Mover la ventana a posición visible y maximizar
-                        try:
-                            self.driver.set_window_position(50, 50)
-                        except Exception:
-                            pass
-                        try:
-                            self.driver.maximize_window()
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
+                self.driver.quit()
             except Exception:
                 pass
-            time.sleep(2)  # Esperar a que cargue la página
+            finally:
+                self.driver = None
+            print("\n✓ Navegador cerrado\n")
+
+    def _reciclar_navegador(self, motivo):
+        """Reinicia el navegador y vuelve a la página actual (ver reciclaje.py).
 
-            # Esperar activamente hasta que aparezca al menos un enlace <a> con href que empiece por http
+        Conserva el conjunto de visitados, los contadores y la frontera; devuelve False
+        si el navegador nuevo no arranca.
+        """
+        print(f"\n♻️  Reciclando el navegador ({motivo})...")
+        url = self.url_actual
+        if self._bidi:
+            self._bidi.cerrar()
+            self._bidi = None
+        if self.driver:
             try:
-                try:
-                    WebDriverWait(self.driver, getattr(self, 'link_wait', 10), poll_frequency=0.5).until(
-                        lambda d: any(((e.get_attribute('href') or '').startswith('http')) for e in d.find_elements(By.TAG_NAME, 'a'))
-                    )
-                except TimeoutException:
-                    # Si no aparece en el tiempo dado, continuar de todos modos
-                    pass
+                self.driver.quit()
             except Exception:
                 pass
-            # Guardar la ventana principal
-            # Si la página inicial es un `data:` o `about:blank`, reemplazarla
-            try:
-                url_actual = ''
-                try:
-                    url_actual = self.driver.current_url
-                except Exception:
-                    url_actual = ''
+            self.driver = None
+        if not self.iniciar_navegador():
+            self._driver_lost = True
+            return False
+        # Antes de navegar: los observadores que guardan el driver deben ver el nuevo
+        self._emitir('al_reciclar', motivo)
+        try:
+            resultado = self._navegar(url)
+            self._informar_carga(resultado, f"✓ De vuelta en {url}")
+        except Exception as e:
+            print(f"⚠️  No se pudo volver a {url}: {e}")
+            self._emitir('al_error', e)
+        self._esperar_enlaces_iniciales()
+        try:
+            self.ventana_principal = self.driver.current_window_handle
+        except Exception:
+            self.ventana_principal = None
+        return True
 
-                if url_actual.startswith('data:') or url_actual in ('about:blank', ''):
-                    # Intentar abrir la URL objetivo en una nueva pestaña y cerrar la ventana en blanco
-                    try:
-                        self.driver.execute_script(f"window.open('{self.url}', '_blank');")
-                        time.sleep(0.6)
-                        handles = self.driver.window_handles
-                        target_handle = None
-                        for h in handles:
-                            try:
-                                self.driver.switch_to.window(h)
-                                cu = self.driver.current_url
-                                if cu.startswith('http') and (urlparse(cu).netloc == urlparse(self.url).netloc or self.url in cu):
-                                    target_handle = h
-                                    break
-                            except Exception:
-                                continue
+    def cambiar_semilla(self, url):
+        """Prepara una sesión ya iniciada para recorrer `url` desde cero (modo lote / demonio).
 
-                        # Si no encontramos una pestaña coincidente, usar la última
-                        if not target_handle and handles:
-                            target_handle = handles[-1]
+        Conserva el navegador y los observadores; reinicia el conjunto de visitados.
+        """
+        self.url = url
+        parsed_url = urlparse(url)
+        self.dominio_base = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        self.url_actual = url
+        self.enlaces_visitados = set()
+        self.contador_clics = 0
+        self._driver_lost = False
+        self._detener.clear()
+        # Las plantillas aprendidas en un sitio no deben filtrar los enlaces del siguiente
+        if self.detector_duplicados:
+            self.detector_duplicados.reiniciar()
+        if self.detector_trampas:
+            self.detector_trampas.reiniciar()
+        # La sesión ya está abierta: siempre hay que navegar a la nueva URL
+        self._started_with_url = False
 
-                        # Cerrar las demás ventanas (incluida la que tenía data:)
-                        for h in handles:
-                            if h != target_handle:
-                                try:
-                                    self.driver.switch_to.window(h)
-                                    self.driver.close()
-                                except Exception:
-                                    pass
+    def detener(self):
+        """Solicita que el bucle principal termine en cuanto sea posible (seguro entre hilos)."""
+        self._detener.set()
 
-                        # Enfocar la pestaña objetivo
-                        if target_handle:
-                            self.driver.switch_to.window(target_handle)
-                    except Exception:
-                        # Fallback: navegar directamente
-                        try:
-                            self.driver.get(self.url)
-                        except Exception:
-                            pass
+    def recorrer(self):
+        """Carga `self.url` en el navegador ya iniciado y ejecuta el bucle de clics.
 
-            except Exception:
-                pass
+        Devuelve el número de clics realizados. No cierra el navegador.
+        """
+        # Cargar la página inicial
+        print(f"\n🌐 Cargando URL: {self.url}")
+        print(f"🔒 Dominio base: {self.dominio_base}")
+        print(f"   • Enlaces internos: navegar en la misma pestaña")
+        policy = getattr(self, 'external_policy', 'new_tab')
+        policy_map = {
+            'new_tab': 'abrir en nueva pestaña',
+            'same_window': 'abrir en la misma ventana',
+            'ignore': 'ignorar enlaces externos'
+        }
+        print(f"   • Enlaces externos: {policy_map.get(policy, 'abrir en nueva pestaña')}")
+        # Con control de concurrencia, una sesión aparcada no carga ni la semilla
+        if self.concurrencia and not self.concurrencia.esperar_turno(self):
+            return self.contador_clics
+        try:
+            return self._recorrer_con_turno()
+        finally:
+            # Devolver el hueco aunque la semilla no cargue: si no, las demás quedan aparcadas
+            if self.concurrencia:
+                self.concurrencia.liberar(self)
 
-            # Guardar la ventana principal
+    def _recorrer_con_turno(self):
+        """Cuerpo de `recorrer` una vez obtenido el turno del control de concurrencia."""
+        # Navegar a la URL si el navegador NO arrancó ya con la URL
+        # (cuando usamos --app=<url> evitamos about:blank inicial).
+        if not getattr(self, '_started_with_url', False):
+            self._navegar(self.url)
+        try:
+            if getattr(self, '_started_offscreen', False):
+                try:
+                    # Mover la ventana a posición visible y maximizar
+                    try:
+                        self.driver.set_window_position(50, 50)
+                    except Exception:
+                        pass
+                    try:
+                        self.driver.maximize_window()
+                    except Exception:
+                        pass
+                except Exception:
+                    pass
+        except Exception:
+            pass
+        self._esperar_enlaces_iniciales()
+        # Guardar la ventana principal
+        # Si la página inicial es un `data:` o `about:blank`, reemplazarla
+        try:
+            url_actual = ''
             try:
-                self.ventana_principal = self.driver.current_window_handle
+                url_actual = self.driver.current_url
             except Exception:
-                self.ventana_principal = None
-            # Cerrar ventanas duplicadas que carguen la misma URL objetivo
-            try:
-                if self.ventana_principal:
+                url_actual = ''
+
+            if url_actual.startswith('data:') or url_actual in ('about:blank', ''):
+                # Intentar abrir la URL objetivo en una nueva pestaña y cerrar la ventana en blanco
+                try:
+                    self.driver.execute_script(f"window.open('{self.url}', '_blank');")
+                    time.sleep(0.6)
                     handles = self.driver.window_handles
-                    seen = {}
-                    keep_handle = None
-                    target_netloc = urlparse(self.url).netloc
+                    target_handle = None
                     for h in handles:
                         try:
                             self.driver.switch_to.window(h)
-                            cu = ''
+                            cu = self.driver.current_url
+                            if cu.startswith('http') and (urlparse(cu).netloc == urlparse(self.url).netloc or self.url in cu):
+                                target_handle = h
+                                break
+                        except Exception:
+                            continue
+
+                    # Si no encontramos una pestaña coincidente, usar la última
+                    if not target_handle and handles:
+                        target_handle = handles[-1]
+
+                    # Cerrar las demás ventanas (incluida la que tenía data:)
+                    for h in handles:
+                        if h != target_handle:
                             try:
-                                cu = self.driver.current_url
+                                self.driver.switch_to.window(h)
+                                self.driver.close()
                             except Exception:
-                                cu = ''
-                            # Normalizar URLs que empiezan por http
-                            if cu and cu.startswith('http'):
-                                netloc = urlparse(cu).netloc
-                                key = netloc + '|' + cu
-                                if key not in seen:
-                                    seen[key] = h
-                                    # Preferir ventana cuyo netloc coincida con la URL objetivo
-                                    if netloc == target_netloc and not keep_handle:
-                                        keep_handle = h
-                                else:
-                                    # Cerrar duplicado
-                                    try:
-                                        self.driver.close()
-                                    except Exception:
-                                        pass
+                                pass
+
+                    # Enfocar la pestaña objetivo
+                    if target_handle:
+                        self.driver.switch_to.window(target_handle)
+                except Exception:
+                    # Fallback: navegar directamente
+                    try:
+                        self.driver.get(self.url)
+                    except Exception:
+                        pass
+
+        except Exception:
+            pass
+
+        # Guardar la ventana principal
+        try:
+            self.ventana_principal = self.driver.current_window_handle
+        except Exception:
+            self.ventana_principal = None
+        # Cerrar ventanas duplicadas que carguen la misma URL objetivo
+        try:
+            if self.ventana_principal:
+                handles = self.driver.window_handles
+                seen = {}
+                keep_handle = None
+                target_netloc = urlparse(self.url).netloc
+                for h in handles:
+                    try:
+                        self.driver.switch_to.window(h)
+                        cu = ''
+                        try:
+                            cu = self.driver.current_url
+                        except Exception:
+                            cu = ''
+                        # Normalizar URLs que empiezan por http
+                        if cu and cu.startswith('http'):
+                            netloc = urlparse(cu).netloc
+                            key = netloc + '|' + cu
+                            if key not in seen:
+                                seen[key] = h
+                                # Preferir ventana cuyo netloc coincida con la URL objetivo
+                                if netloc == target_netloc and not keep_handle:
+                                    keep_handle = h
                             else:
-                                # Si la ventana no tiene URL válida, cerrarla
+                                # Cerrar duplicado
                                 try:
                                     self.driver.close()
                                 except Exception:
                                     pass
-                        except Exception:
-                            continue
+                        else:
+                            # Si la ventana no tiene URL válida, cerrarla
+                            try:
+                                self.driver.close()
+                            except Exception:
+                                pass
+                    except Exception:
+                        continue
 
-                    # Si no elegimos una ventana para mantener, tomar la primera disponible
-                    remaining = self.driver.window_handles
-                    if not keep_handle and remaining:
-                        keep_handle = remaining[0]
+                # Si no elegimos una ventana para mantener, tomar la primera disponible
+                remaining = self.driver.window_handles
+                if not keep_handle and remaining:
+                    keep_handle = remaining[0]
 
-                    # Enfocar la ventana que mantuvimos
-                    if keep_handle:
-                        try:
-                            self.driver.switch_to.window(keep_handle)
-                            self.ventana_principal = keep_handle
-                        except Exception:
-                            pass
-            except Exception:
-                pass
+                # Enfocar la ventana que mantuvimos
+                if keep_handle:
+                    try:
+                        self.driver.switch_to.window(keep_handle)
+                        self.ventana_principal = keep_handle
+                    except Exception:
+                        pass
+        except Exception:
+            pass
+        
+        self.contador_clics = 0
+        
+        print(f"\n⏱️  Intervalo aleatorio entre clics: {self.intervalo_min} - {self.intervalo_max} segundos")
+        if self.max_clicks:
+            print(f"🔢 Máximo de clics: {self.max_clicks}")
+        print("\n" + "="*60)
+        print("Presiona Ctrl+C para detener el programa")
+        print("="*60 + "\n")
+        
+        while True:
+            # Comprueba si el driver se ha perdido (por errores previos)
+            if getattr(self, '_driver_lost', False):
+                print("⚠️  La sesión del navegador se perdió. Saliendo...")
+                break
+            # Verificar que queden ventanas abiertas (con BiDi se conocen por eventos, sin round-trip)
+            try:
+                handles_check = self._bidi.contextos() if self._bidi and self._bidi.activa else self.driver.window_handles
+                if not handles_check:
+                    print("⚠️  No quedan ventanas del navegador abiertas. Saliendo...")
+                    break
+            except (WebDriverException, NoSuchWindowException):
+                print("⚠️  No se puede acceder a las ventanas del navegador (conexión perdida). Saliendo...")
+                break
+
+            # Detención solicitada desde otro hilo (GUI, lote, demonio)
+            if self._detener.is_set():
+                print("\n⏹  Ejecución detenida")
+                break
+            # Presupuesto de tiempo agotado (modo lote)
+            if self.limite_tiempo is not None and time.monotonic() >= self.limite_tiempo:
+                print("\n⌛ Se agotó el tiempo asignado a esta URL")
+                break
+
+            # Verificar si se alcanzó el máximo de clics
+            if self.max_clicks and self.contador_clics >= self.max_clicks:
+                print(f"\n✓ Se alcanzó el máximo de {self.max_clicks} clics")
+                break
+            # Reciclar el navegador si la política lo pide (páginas, antigüedad o memoria)
+            if self.reciclaje:
+                motivo = self.reciclaje.motivo(self)
+                if motivo and not self._reciclar_navegador(motivo):
+                    print("⚠️  No se pudo reiniciar el navegador. Saliendo...")
+                    break
+            # Esperar hueco si el control de concurrencia redujo las sesiones activas
+            if self.concurrencia and not self.concurrencia.esperar_turno(self):
+                print("\n⏹  Ejecución detenida")
+                break
+            self._emitir('al_iteracion', self.contador_clics + 1)
             
-            contador_clics = 0
+            # Obtener enlaces de la página actual
+            inicio_paso = time.perf_counter()
+            enlaces = self.obtener_enlaces()
+            self._emitir('al_enlaces', self.url_actual, enlaces)
             
-            contador_clics = 0
+            if not enlaces:
+                print("⚠️  No se encontraron enlaces en la página")
+                break
             
-            print(f"\n⏱️  Intervalo aleatorio entre clics: {self.intervalo_min} - {self.intervalo_max} segundos")
-            if self.max_clicks:
-                print(f"🔢 Máximo de clics: {self.max_clicks}")
-            print("\n" + "="*60)
-            print("Presiona Ctrl+C para detener el programa")
-            print("="*60 + "\n")
+            # Filtrar enlaces no visitados
+            enlaces_no_visitados = [e for e in enlaces if e['url'] not in self.enlaces_visitados]
+            enlaces_no_visitados = self._priorizar(enlaces_no_visitados)
+            self._emitir('al_frontera', len(enlaces_no_visitados), len(self.enlaces_visitados))
             
-            while True:
-                # Comprueba si el driver se ha perdido (por errores previos)
-                if getattr(self, '_driver_lost', False):
-                    print("⚠️  La sesión del navegador se perdió. Saliendo...")
-                    break
-                # Verificar que queden ventanas abiertas
-                try:
-                    handles_check = self.driver.window_handles
-                    if not handles_check:
-                        print("⚠️  No quedan ventanas del navegador abiertas. Saliendo...")
-                        break
-                except (WebDriverException, NoSuchWindowException):
-                    print("⚠️  No se puede acceder a las ventanas del navegador (conexión perdida). Saliendo...")
-                    break
-
-                # Verificar si se alcanzó el máximo de clics
-                if self.max_clicks and contador_clics >= self.max_clicks:
-                    print(f"\n✓ Se alcanzó el máximo de {self.max_clicks} clics")
-                    break
-                
-                # Obtener enlaces de la página actual
-                enlaces = self.obtener_enlaces()
-                
-                if not enlaces:
-                    print("⚠️  No se encontraron enlaces en la página")
-                    break
-                
-                # Filtrar enlaces no visitados
-                enlaces_no_visitados = [e for e in enlaces if e['url'] not in self.enlaces_visitados]
-                
-                if not enlaces_no_visitados:
-                    print("\n✓ Todos los enlaces han sido visitados")
-                    print(f"Total de enlaces visitados: {len(self.enlaces_visitados)}")
-                    break
-                
-                # Seleccionar un enlace aleatorio
-                enlace = random.choice(enlaces_no_visitados)
-                contador_clics += 1
-                
-                print(f"\n[{contador_clics}] 🖱️  Haciendo clic en:")
-                print(f"    Texto: {enlace['texto'][:60]}")
-                print(f"    URL: {enlace['url'][:80]}")
-                
-                # Marcar como visitado
-                self.enlaces_visitados.add(enlace['url'])
-                
-                # Determinar si es interno o externo
-                es_interno = enlace.get('es_interno', True)
-                
+            if not enlaces_no_visitados:
+                print("\n✓ Todos los enlaces han sido visitados")
+                print(f"Total de enlaces visitados: {len(self.enlaces_visitados)}")
+                break
+            
+            # Seleccionar un enlace aleatorio
+            enlace = self._elegir_enlace(enlaces_no_visitados)
+            self.contador_clics += 1
+            
+            print(f"\n[{self.contador_clics}] 🖱️  Haciendo clic en:")
+            print(f"    Texto: {enlace['texto'][:60]}")
+            print(f"    URL: {enlace['url'][:80]}")
+            
+            # Marcar como visitado
+            self.enlaces_visitados.add(enlace['url'])
+            
+            # Determinar si es interno o externo
+            es_interno = enlace.get('es_interno', True)
+            
+            if es_interno:
+                print(f"    📍 Tipo: Enlace INTERNO (mismo dominio)")
+            else:
+                print(f"    🌍 Tipo: Enlace EXTERNO (otro dominio)")
+            
+            # Hacer clic
+            try:
                 if es_interno:
-                    print(f"    📍 Tipo: Enlace INTERNO (mismo dominio)")
-                else:
-                    print(f"    🌍 Tipo: Enlace EXTERNO (otro dominio)")
-                
-                # Hacer clic
-                try:
-                    if es_interno:
-                        # Enlaces internos: navegar normalmente
+                    # Enlaces internos: navegar normalmente
+                    try:
+                        # Intentar desplazar hasta el elemento antes de navegar
                         try:
-                            # Intentar desplazar hasta el elemento antes de navegar
+                            policy_to_apply = self.scroll_policy
+                            if policy_to_apply == 'random':
+                                policy_to_apply = random.choice(['none', 'small', 'medium', 'full'])
+                            # Informar qué política se eligió (aparece en la GUI/log)
                             try:
-                                policy_to_apply = self.scroll_policy
-                                if policy_to_apply == 'random':
-                                    policy_to_apply = random.choice(['none', 'small', 'medium', 'full'])
-                                # Informar qué política se eligió (aparece en la GUI/log)
-                                try:
-                                    print(f"    🔽 Scroll elegido: {policy_to_apply}")
-                                except Exception:
-                                    pass
-                                self._apply_scroll(enlace.get('elemento'), policy=policy_to_apply)
+                                print(f"    🔽 Scroll elegido: {policy_to_apply}")
                             except Exception:
                                 pass
+                            self._apply_scroll(enlace.get('elemento'), policy=policy_to_apply)
                         except Exception:
                             pass
-                        self.driver.get(enlace['url'])
-                        print(f"    ✓ Página cargada correctamente")
+                    except Exception:
+                        pass
+                    resultado = self._navegar(enlace['url'])
+                    self._informar_carga(resultado, "✓ Página cargada correctamente")
+                else:
+                    # Enlaces externos: comportamientos según la política de usuario
+                    if self.external_policy == 'ignore':
+                        print(f"    ⚠️ Enlace externo ignorado por configuración")
+                    elif self.external_policy == 'same_window':
+                        try:
+                            # No aplicar scroll para dominios externos (solo se aplica en enlaces internos)
+                            resultado = self._navegar(enlace['url'])
+                            self._informar_carga(resultado, "✓ Página externa cargada en la misma ventana")
+                        except Exception as e:
+                            print(f"    ✗ Error al cargar en la misma ventana: {e}")
+                            self._emitir('al_error', e)
+                            # Si hay problema con la sesión, marcar pérdida
+                            if isinstance(e, WebDriverException):
+                                self._driver_lost = True
+                                break
                     else:
-                        # Enlaces externos: comportamientos según la política de usuario
-                        if self.external_policy == 'ignore':
-                            print(f"    ⚠️ Enlace externo ignorado por configuración")
-                        elif self.external_policy == 'same_window':
-                            try:
-                                # No aplicar scroll para dominios externos (solo se aplica en enlaces internos)
-                                self.driver.get(enlace['url'])
-                                print(f"    ✓ Página externa cargada en la misma ventana")
-                            except Exception as e:
-                                print(f"    ✗ Error al cargar en la misma ventana: {e}")
-                                # Si hay problema con la sesión, marcar pérdida
-                                if isinstance(e, WebDriverException):
-                                    self._driver_lost = True
-                                    break
-                        else:
-                            # default/new_tab: abrir en nueva pestaña
-                            try:
-                                # No aplicar scroll para dominios externos (solo se aplica en enlaces internos)
-                                self.driver.execute_script(f"window.open('{enlace['url']}', '_blank');")
-                                print(f"    ✓ Enlace abierto en nueva pestaña")
-                                # Esperar un momento para que se abra la pestaña
-                                time.sleep(1)
-                                # Cerrar cualquier pestaña que no sea la principal
-                                ventanas = self.driver.window_handles
-                                for ventana in ventanas:
-                                    if ventana != self.ventana_principal:
-                                        try:
-                                            self.driver.switch_to.window(ventana)
-                                            self.driver.close()
-                                        except Exception:
-                                            pass
-                                # Volver a la ventana principal
-                                try:
-                                    self.driver.switch_to.window(self.ventana_principal)
-                                except Exception:
-                                    pass
-                                print(f"    ↩️  Foco devuelto a la página principal")
-                            except Exception as e:
-                                print(f"    ✗ Error al abrir en nueva pestaña: {e}")
-                                if isinstance(e, WebDriverException):
-                                    self._driver_lost = True
-                                    break
-                        
-                except Exception as e:
-                    print(f"    ✗ Error al cargar la página: {e}")
-                
-                # Esperar un intervalo aleatorio
-                tiempo_espera = random.uniform(self.intervalo_min, self.intervalo_max)
-                print(f"    ⏳ Esperando {tiempo_espera:.1f} segundos (aleatorio entre {self.intervalo_min}-{self.intervalo_max})...")
-                time.sleep(tiempo_espera)
-                
-        except KeyboardInterrupt:
-            print("\n\n⚠️  Programa interrumpido por el usuario")
-            print(f"Total de clics realizados: {contador_clics}")
-            print(f"Total de enlaces visitados: {len(self.enlaces_visitados)}")
-        
-        finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except Exception:
-                    pass
-                finally:
-                    self.driver = None
-                print("\n✓ Navegador cerrado\n")
+                        # default/new_tab: abrir en nueva pestaña
+                        try:
+                            # No aplicar scroll para dominios externos (solo se aplica en enlaces internos)
+                            self._visitar_en_pestana(enlace['url'])
+                            print(f"    ↩️  Foco devuelto a la página principal")
+                        except Exception as e:
+                            print(f"    ✗ Error al abrir en nueva pestaña: {e}")
+                            self._emitir('al_error', e)
+                            if isinstance(e, WebDriverException):
+                                self._driver_lost = True
+                                break
+                    
+            except Exception as e:
+                print(f"    ✗ Error al cargar la página: {e}")
+                self._emitir('al_error', e)
+            
+            self._emitir('al_paso', time.perf_counter() - inicio_paso)
+
+            # Esperar un intervalo aleatorio
+            tiempo_espera = random.uniform(self.intervalo_min, self.intervalo_max)
+            print(f"    ⏳ Esperando {tiempo_espera:.1f} segundos (aleatorio entre {self.intervalo_min}-{self.intervalo_max})...")
+            if self._detener.wait(tiempo_espera):
+                print("\n⏹  Ejecución detenida")
+                break
+
+        return self.contador_clics
 
 
 def main():
@@ -709,26 +1161,29 @@ Ejemplos de uso:
   %(prog)s https://example.com --min 5 --max 15
   %(prog)s https://example.com --min 2 --max 5 --headless
   %(prog)s https://example.com --max-clicks 20
+  %(prog)s --seeds-file semillas.txt --seed-max-clicks 5 --headless
+  %(prog)s --daemon --sessions 2 --headless
         """
     )
 
     parser.add_argument(
         'url',
-        help='URL de la página web a visitar'
+        nargs='?',
+        help='URL de la página web a visitar (no necesaria con --seeds-file)'
     )
 
     parser.add_argument(
         '--min',
         type=int,
-        default=5,
-        help='Tiempo mínimo en segundos entre clics (default: 5)'
+        default=None,
+        help='Tiempo mínimo en segundos entre clics (default: config.json o 5)'
     )
 
     parser.add_argument(
         '--max',
         type=int,
-        default=10,
-        help='Tiempo máximo en segundos entre clics (default: 10)'
+        default=None,
+        help='Tiempo máximo en segundos entre clics (default: config.json o 10)'
     )
 
     # Mantener compatibilidad con -i (usará ese valor como min y max)
@@ -771,6 +1226,14 @@ Ejemplos de uso:
         help="Política de scroll antes de clicar: 'none','small','medium','full' o 'random' (elige una al azar antes de cada clic)"
     )
 
+    parser.add_argument(
+        '--link-filter',
+        dest='link_filter',
+        choices=['any', 'visible', 'clickable', 'viewport'],
+        default='any',
+        help="Enlaces elegibles: 'any' (por defecto), 'visible', 'clickable' (visible y sin otro elemento encima) o 'viewport' (clickable y ya en pantalla)"
+    )
+
     parser.add_argument(
         '--link-wait',
         dest='link_wait',
@@ -786,6 +1249,13 @@ Ejemplos de uso:
         help='Navegador a usar: chrome (por defecto), chromium o firefox'
     )
 
+    parser.add_argument(
+        '--backend',
+        choices=['selenium', 'cdp', 'bidi'],
+        default='selenium',
+        help="Control del navegador: 'selenium' (WebDriver clásico, por defecto), 'cdp' (Chrome/Chromium por protocolo DevTools, sin chromedriver) o 'bidi' (Firefox con eventos WebDriver BiDi)"
+    )
+
     parser.add_argument(
         '--disable-javascript',
         action='store_true',
@@ -798,16 +1268,230 @@ Ejemplos de uso:
         help='Habilitar DNS sobre HTTPS (Secure DNS) para evitar bloqueos'
     )
 
+    parser.add_argument(
+        '--metrics-port',
+        dest='metrics_port',
+        type=int,
+        help='Exponer métricas en formato Prometheus en http://127.0.0.1:<puerto>/metrics (opcional)'
+    )
+
+    parser.add_argument(
+        '--instrument-commands',
+        action='store_true',
+        help='Medir cada comando WebDriver (número, tiempo total y p95 por método) e imprimir una tabla al terminar'
+    )
+
+    parser.add_argument(
+        '--instrument-json',
+        dest='instrument_json',
+        help='Exportar la instrumentación de comandos a este fichero JSON (implica --instrument-commands)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        action='store_true',
+        help='Perfilar la ejecución (cProfile + muestreo) y guardar .pstats y .collapsed en --profile-dir'
+    )
+
+    parser.add_argument(
+        '--profile-dir',
+        dest='profile_dir',
+        default='perfiles',
+        help='Directorio de los perfiles de --profile (default: ./perfiles)'
+    )
+
+    parser.add_argument(
+        '--profile-iterations',
+        dest='profile_iterations',
+        type=int,
+        help='Perfilar por separado el arranque y sólo las N primeras iteraciones del bucle (implica --profile)'
+    )
+
+    parser.add_argument(
+        '--link-check',
+        dest='link_check',
+        action='store_true',
+        help='Registrar el estado HTTP y las redirecciones de cada navegación y escribir los enlaces rotos en --link-check-csv'
+    )
+
+    parser.add_argument(
+        '--link-check-csv',
+        dest='link_check_csv',
+        default='enlaces_rotos.csv',
+        help='CSV de enlaces rotos de --link-check (default: enlaces_rotos.csv)'
+    )
+
+    parser.add_argument(
+        '--graph',
+        dest='graph',
+        action='store_true',
+        help='Registrar el grafo de enlaces (origen→destino) en --graph-dir: nodos.csv, aristas.csv y grafo.graphml'
+    )
+
+    parser.add_argument(
+        '--graph-dir',
+        dest='graph_dir',
+        default='grafo',
+        help='Directorio del grafo de --graph (default: ./grafo)'
+    )
+
+    parser.add_argument(
+        '--snapshots',
+        dest='snapshots',
+        action='store_true',
+        help='Guardar captura de pantalla y HTML de cada página visitada, deduplicados por contenido, en --snapshots-dir'
+    )
+
+    parser.add_argument(
+        '--snapshots-dir',
+        dest='snapshots_dir',
+        default='capturas',
+        help='Directorio de las capturas de --snapshots (default: ./capturas)'
+    )
+
+    parser.add_argument(
+        '--snapshot-queue',
+        dest='snapshot_queue',
+        type=int,
+        default=16,
+        help='Capturas pendientes de escribir como máximo; si se llena, se omiten capturas en lugar de frenar la navegación (default: 16)'
+    )
+
+    parser.add_argument(
+        '--near-duplicates',
+        dest='near_duplicates',
+        choices=['skip', 'deprioritize'],
+        help="Detectar páginas casi duplicadas (SimHash) y omitir ('skip') o dejar para el final ('deprioritize') los enlaces con el mismo patrón de URL"
+    )
+
+    parser.add_argument(
+        '--trap-detection',
+        dest='trap_detection',
+        choices=['cap', 'deprioritize'],
+        help="Detectar trampas de rastreo (calendarios, IDs de sesión, facetas) por plantilla de URL y limitarlas ('cap') o despriorizarlas ('deprioritize')"
+    )
+
+    parser.add_argument(
+        '--seeds-file',
+        dest='seeds_file',
+        help="Modo lote: leer URLs semilla (una por línea) de este fichero, o de stdin con '-'"
+    )
+
+    parser.add_argument(
+        '--sessions',
+        type=int,
+        default=1,
+        help='Modo lote: número de sesiones de navegador en paralelo (default: 1)'
+    )
+
+    parser.add_argument(
+        '--seed-max-clicks',
+        dest='seed_max_clicks',
+        type=int,
+        help='Modo lote: máximo de clics por semilla (default: --max-clicks)'
+    )
+
+    parser.add_argument(
+        '--seed-timeout',
+        dest='seed_timeout',
+        type=float,
+        help='Modo lote: tiempo máximo en segundos por semilla'
+    )
+
+    parser.add_argument(
+        '--results',
+        dest='results',
+        default='resultados_lote.jsonl',
+        help='Modo lote: fichero JSONL donde se añade el resultado de cada semilla (default: resultados_lote.jsonl)'
+    )
+
+    parser.add_argument(
+        '--recycle-pages',
+        dest='recycle_pages',
+        type=int,
+        help='Reiniciar el navegador cada N navegaciones, conservando visitados y contadores'
+    )
+
+    parser.add_argument(
+        '--recycle-minutes',
+        dest='recycle_minutes',
+        type=float,
+        help='Reiniciar el navegador cuando lleve abierto este número de minutos'
+    )
+
+    parser.add_argument(
+        '--recycle-rss-mb',
+        dest='recycle_rss_mb',
+        type=int,
+        help='Reiniciar el navegador cuando el RSS de su árbol de procesos supere estos MB (sólo Linux)'
+    )
+
+    parser.add_argument(
+        '--target-p95',
+        dest='target_p95',
+        type=float,
+        help='Control AIMD: ajustar sesiones activas (--sessions) y ritmo de clics para mantener el p95 de carga por debajo de estos segundos'
+    )
+
+    parser.add_argument(
+        '--aimd-window',
+        dest='aimd_window',
+        type=int,
+        default=20,
+        help='Control AIMD: navegaciones por ventana de evaluación (default: 20)'
+    )
+
+    parser.add_argument(
+        '--aimd-max-errors',
+        dest='aimd_max_errors',
+        type=float,
+        default=0.05,
+        help='Control AIMD: fracción de navegaciones con error a partir de la cual se frena (default: 0.05)'
+    )
+
+    parser.add_argument(
+        '--watch-config',
+        dest='watch_config',
+        action='store_true',
+        help='Vigilar ~/.clictoriano/config.json y aplicar en caliente intervalos, políticas y límites'
+    )
+
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Modo demonio: mantener los navegadores abiertos y aceptar trabajos por una API HTTP local'
+    )
+
+    parser.add_argument(
+        '--daemon-port',
+        dest='daemon_port',
+        type=int,
+        default=8765,
+        help='Puerto de la API del modo demonio en 127.0.0.1 (default: 8765)'
+    )
+
     args = parser.parse_args()
 
     # Validar la URL
-    if not args.url.startswith('http'):
+    if not args.url and not args.seeds_file and not args.daemon:
+        parser.error('indica una URL, --seeds-file o --daemon')
+    if args.url and not args.url.startswith('http'):
         print("Error: La URL debe comenzar con http:// o https://")
         sys.exit(1)
+    if (args.seeds_file or args.daemon) and (args.sessions > 1 or args.daemon) and args.graph:
+        print("Error: --graph sólo admite una sesión (--sessions 1) y no se usa con --daemon")
+        sys.exit(1)
+    if (args.seeds_file or args.daemon) and (args.profile or args.profile_iterations):
+        print("Error: --profile sólo perfila una ejecución con una URL; no se usa con --seeds-file ni --daemon")
+        sys.exit(1)
 
-    # Gestionar intervalos
-    intervalo_min = args.min
-    intervalo_max = args.max
+    # Leer configuración persistente (solo para opciones no proporcionadas por CLI)
+    config = cargar_configuracion()
+
+    # Gestionar intervalos: prioridad CLI > config > default
+    intervalo_min = args.min if args.min is not None else float(config.intervalo_min or 5)
+    intervalo_max = args.max if args.max is not None else float(config.intervalo_max or max(10, intervalo_min))
 
     if args.intervalo:
         intervalo_min = args.intervalo
@@ -821,43 +1505,160 @@ Ejemplos de uso:
         print(f"Error: El máximo ({intervalo_max}) no puede ser menor que el mínimo ({intervalo_min})")
         sys.exit(1)
 
-    # Leer configuración persistente si existe (solo para opciones no proporcionadas por CLI)
-    config_path = Path.home() / '.clictoriano' / 'config.json'
-    config = {}
-    try:
-        if config_path.exists():
-            with config_path.open('r', encoding='utf-8') as f:
-                config = json.load(f)
-    except Exception:
-        config = {}
-
-    # Determinar política externa: prioridad CLI > config > default
-    policy = args.external_policy or config.get('external_policy', 'new_tab')
-    scroll_policy = args.scroll_policy or config.get('scroll_policy', 'none')
-    link_wait = args.link_wait if args.link_wait is not None else config.get('link_wait', 10)
+    # Determinar políticas: prioridad CLI > config > default
+    policy = args.external_policy or config.external_policy
+    scroll_policy = args.scroll_policy or config.scroll_policy
+    link_wait = args.link_wait if args.link_wait is not None else config.link_wait
+    max_clicks = args.max_clicks if args.max_clicks is not None else config.max_clicks
 
-    # Crear y ejecutar el programa
-    programa = ClicToris(
-        url=args.url,
+    opciones = dict(
         javascript_enabled=not args.disable_javascript,
         secure_dns_enabled=args.secure_dns,
         intervalo_min=intervalo_min,
         intervalo_max=intervalo_max,
         modo_headless=args.headless,
-        max_clicks=args.max_clicks,
+        max_clicks=max_clicks,
         chrome_path=args.chrome_path,
         external_links_policy=policy,
         link_wait=link_wait,
         browser=args.browser,
     )
-    # Aplicar política de scroll seleccionada
-    try:
-        programa.scroll_policy = scroll_policy
-    except Exception:
-        pass
-    
-    programa.ejecutar()
+    # Observadores compartidos por todas las sesiones
+    compartidos = []
 
+    # Recarga en caliente de config.json sin reiniciar el navegador
+    if args.watch_config:
+        from configuracion import RecargaConfiguracion
+        compartidos.append(RecargaConfiguracion())
+
+    # Endpoint de métricas opcional, servido desde un hilo en segundo plano
+    if args.metrics_port:
+        from metricas import MetricasClicToris, servir_metricas
+        metricas = MetricasClicToris()
+        compartidos.append(metricas)
+        try:
+            servir_metricas(metricas, args.metrics_port)
+            print(f"📈 Métricas disponibles en http://127.0.0.1:{args.metrics_port}/metrics")
+        except OSError as e:
+            print(f"⚠️  No se pudo abrir el puerto de métricas {args.metrics_port}: {e}")
+
+    # Modo de comprobación de enlaces
+    comprobador = None
+    if args.link_check:
+        from comprobacion_enlaces import ComprobadorEnlaces
+        comprobador = ComprobadorEnlaces(args.link_check_csv)
+        compartidos.append(comprobador)
+
+    # Registro opcional del grafo de enlaces
+    if args.graph:
+        from grafo import GrafoRastreo
+        compartidos.append(GrafoRastreo(args.graph_dir))
+
+    # Capturas opcionales de las páginas visitadas
+    if args.snapshots:
+        from capturas import CapturadorPaginas
+        compartidos.append(CapturadorPaginas(args.snapshots_dir, capacidad=args.snapshot_queue))
+
+    # Instrumentación opcional de comandos WebDriver
+    if args.instrument_commands or args.instrument_json:
+        from instrumentacion import InstrumentadorComandos
+        compartidos.append(InstrumentadorComandos(ruta_json=args.instrument_json))
+
+    # Control adaptativo de la concurrencia hacia un p95 de latencia objetivo
+    controlador = None
+    if args.target_p95:
+        from concurrencia import ControladorAIMD
+        controlador = ControladorAIMD(
+            p95_objetivo=args.target_p95,
+            sesiones_max=args.sessions if (args.seeds_file or args.daemon) else 1,
+            ventana=args.aimd_window,
+            max_errores=args.aimd_max_errors,
+        )
+        compartidos.append(controlador)
+
+    def crear_programa(url):
+        programa = ClicToris(url=url, **opciones)
+        # Aplicar política de scroll seleccionada
+        try:
+            programa.scroll_policy = scroll_policy
+        except Exception:
+            pass
+        programa.backend = args.backend
+        programa.link_filter = args.link_filter
+        programa.observadores.extend(compartidos)
+        programa.comprobador_enlaces = comprobador
+        programa.concurrencia = controlador
+
+        # Detección opcional de casi duplicados
+        if args.near_duplicates:
+            from duplicados import DetectorDuplicados
+            programa.detector_duplicados = DetectorDuplicados(modo=args.near_duplicates)
+            programa.observadores.append(programa.detector_duplicados)
+
+        # Reciclado opcional del navegador en ejecuciones largas
+        if args.recycle_pages or args.recycle_minutes or args.recycle_rss_mb:
+            from reciclaje import PoliticaReciclaje
+            programa.reciclaje = PoliticaReciclaje(
+                max_paginas=args.recycle_pages,
+                max_edad=args.recycle_minutes * 60 if args.recycle_minutes else None,
+                max_rss=args.recycle_rss_mb * 1024 * 1024 if args.recycle_rss_mb else None,
+            )
+            programa.observadores.append(programa.reciclaje)
+
+        # Detección opcional de trampas de rastreo
+        if args.trap_detection:
+            from trampas import DetectorTrampas
+            programa.detector_trampas = DetectorTrampas(modo=args.trap_detection)
+            programa.observadores.append(programa.detector_trampas)
+        return programa
+
+    # Modo demonio: navegadores permanentes que atienden trabajos por HTTP
+    if args.daemon:
+        from demonio import DemonioClicToris, servir_demonio
+        demonio = DemonioClicToris(crear_programa, sesiones=args.sessions)
+        try:
+            servidor = servir_demonio(demonio, args.daemon_port)
+        except OSError as e:
+            print(f"Error: no se pudo abrir el puerto {args.daemon_port}: {e}")
+            sys.exit(1)
+        demonio.iniciar()
+        print(f"🛰️  Demonio escuchando en http://127.0.0.1:{args.daemon_port}/jobs con {demonio.sesiones} sesión(es)")
+        print("   Presiona Ctrl+C para detenerlo")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("\n⚠️  Deteniendo demonio...")
+        finally:
+            servidor.shutdown()
+            demonio.detener()
+        return
+
+    # Modo lote: muchas semillas con sesiones de navegador reutilizadas
+    if args.seeds_file:
+        from lote import EjecutorLote, leer_semillas
+        ejecutor = EjecutorLote(
+            crear_programa,
+            sesiones=args.sessions,
+            max_clicks=args.seed_max_clicks or max_clicks,
+            tiempo_max=args.seed_timeout,
+            ruta_resultados=args.results,
+        )
+        try:
+            ejecutor.ejecutar(leer_semillas(args.seeds_file))
+        except OSError as e:
+            print(f"Error: no se pudo leer {args.seeds_file}: {e}")
+            sys.exit(1)
+        return
+
+    # Crear y ejecutar el programa
+    programa = crear_programa(args.url)
+    if args.profile or args.profile_iterations:
+        from perfilado import PerfiladorEjecucion
+        perfilador = PerfiladorEjecucion(args.profile_dir, iteraciones=args.profile_iterations)
+        perfilador.ejecutar(programa)
+    else:
+        programa.ejecutar()
 
 if __name__ == "__main__":
     main()
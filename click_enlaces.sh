@@ -3,6 +3,9 @@
 
 cd "$(dirname "$0")"
 
+# El instalador de ChromeDriver usa ~/.local/bin si /usr/local/bin no es escribible
+export PATH="$HOME/.local/bin:$PATH"
+
 # Verificar si existe el entorno virtual
 if [ ! -d "venv" ]; then
     echo "📦 Creando entorno virtual..."
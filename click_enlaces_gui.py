@@ -9,11 +9,9 @@ from tkinter import messagebox
 import threading
 import sys
 import os
-import webbrowser
-from PIL import Image
 from io import StringIO
 from click_enlaces import ClicToris
-import json
+from configuracion import cargar_configuracion, guardar_configuracion, RecargaConfiguracion
 from pathlib import Path
 
 # Configuración inicial de CustomTkinter
@@ -46,30 +44,19 @@ class ClicTorisGUI(ctk.CTk):
         self.javascript_enabled = True
         # Secure DNS (DoH) deshabilitado por defecto
         self.secure_dns_enabled = False
-        # Intentar cargar preferencia persistente
+        # Perfilado de la ejecución deshabilitado por defecto (None = todas las iteraciones)
+        self.profile_enabled = False
+        self.profile_iterations = None
+        # Cargar preferencias persistentes (valores no válidos → valores por defecto)
         try:
-            cfg_file = Path.home() / '.clictoriano' / 'config.json'
-            if cfg_file.exists():
-                with cfg_file.open('r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    p = data.get('external_policy')
-                    if p in ('new_tab', 'same_window', 'ignore'):
-                        self.external_policy = p
-                    sp = data.get('scroll_policy')
-                    if sp in ('none', 'small', 'medium', 'full', 'random'):
-                        self.scroll_policy = sp
-                    # Cargar preferencia de navegador si existe
-                    b = data.get('browser')
-                    if b in ('chrome', 'chromium', 'firefox'):
-                        self.browser = b
-                    # Cargar preferencia de javascript
-                    js = data.get('javascript_enabled')
-                    if js is not None:
-                        self.javascript_enabled = bool(js)
-                    # Cargar preferencia de secure dns
-                    sdns = data.get('secure_dns_enabled')
-                    if sdns is not None:
-                        self.secure_dns_enabled = bool(sdns)
+            cfg = cargar_configuracion()
+            self.external_policy = cfg.external_policy
+            self.scroll_policy = cfg.scroll_policy
+            self.browser = cfg.browser
+            self.javascript_enabled = cfg.javascript_enabled
+            self.secure_dns_enabled = cfg.secure_dns_enabled
+            self.profile_enabled = cfg.profile_enabled
+            self.profile_iterations = cfg.profile_iterations
         except Exception:
             pass
         
@@ -124,6 +111,7 @@ class ClicTorisGUI(ctk.CTk):
         try:
             logo_path = os.path.join(os.path.dirname(__file__), "img", "logo.png")
             if os.path.exists(logo_path):
+                from PIL import Image
                 img = ctk.CTkImage(light_image=Image.open(logo_path),
                                  dark_image=Image.open(logo_path),
                                  size=(100, 100))
@@ -262,7 +250,7 @@ class ClicTorisGUI(ctk.CTk):
         cfg = ctk.CTkToplevel(self)
         cfg.title("Configuración")
         # Ventana más grande para mostrar todas las opciones (incluido selector de navegador)
-        cfg.geometry("520x320")
+        cfg.geometry("520x640")
         cfg.resizable(True, True)
         cfg.transient(self)
         cfg.grab_set()
@@ -363,6 +351,19 @@ class ClicTorisGUI(ctk.CTk):
         else:
             dns_switch.deselect()
 
+        # --- Opción de perfilado ---
+        ctk.CTkLabel(cfg, text="Perfilado (cProfile):", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(6,6))
+        profile_switch = ctk.CTkSwitch(cfg, text="Perfilar la ejecución (~/.clictoriano/perfiles)")
+        profile_switch.pack(pady=(0,6))
+        if self.profile_enabled:
+            profile_switch.select()
+        else:
+            profile_switch.deselect()
+        profile_iter_entry = ctk.CTkEntry(cfg, placeholder_text="Iteraciones a perfilar (vacío = todas)", width=260)
+        profile_iter_entry.pack(pady=(0,12))
+        if self.profile_iterations:
+            profile_iter_entry.insert(0, str(self.profile_iterations))
+
         def guardar():
             try:
                 sel_label = opt.get()
@@ -385,25 +386,25 @@ class ClicTorisGUI(ctk.CTk):
             self.javascript_enabled = bool(js_switch.get())
             # Obtener selección de Secure DNS
             self.secure_dns_enabled = bool(dns_switch.get())
-            # Guardar preferencia en ~/.clictoriano/config.json (mantener otras claves si existen)
+            # Obtener selección de perfilado
+            self.profile_enabled = bool(profile_switch.get())
             try:
-                cfg_dir = Path.home() / '.clictoriano'
-                cfg_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
-                cfg_file = cfg_dir / 'config.json'
-                cfg_data = {}
-                if cfg_file.exists():
-                    try:
-                        with cfg_file.open('r', encoding='utf-8') as f:
-                            cfg_data = json.load(f) or {}
-                    except Exception:
-                        cfg_data = {}
-                cfg_data['external_policy'] = self.external_policy
-                cfg_data['scroll_policy'] = self.scroll_policy
-                cfg_data['browser'] = self.browser
-                cfg_data['javascript_enabled'] = self.javascript_enabled
-                cfg_data['secure_dns_enabled'] = self.secure_dns_enabled
-                with cfg_file.open('w', encoding='utf-8') as f:
-                    json.dump(cfg_data, f)
+                pi = int(profile_iter_entry.get().strip())
+                self.profile_iterations = pi if pi > 0 else None
+            except ValueError:
+                self.profile_iterations = None
+            # Guardar preferencia en ~/.clictoriano/config.json (mantener otras claves si existen).
+            # Si hay una ejecución en marcha, los ajustes seguros se aplican en caliente.
+            try:
+                guardar_configuracion({
+                    'external_policy': self.external_policy,
+                    'scroll_policy': self.scroll_policy,
+                    'browser': self.browser,
+                    'javascript_enabled': self.javascript_enabled,
+                    'secure_dns_enabled': self.secure_dns_enabled,
+                    'profile_enabled': self.profile_enabled,
+                    'profile_iterations': self.profile_iterations,
+                })
             except Exception:
                 pass
             cfg.destroy()
@@ -420,6 +421,7 @@ class ClicTorisGUI(ctk.CTk):
 
     def abrir_github(self):
         """Abre el repositorio en el navegador"""
+        import webbrowser
         webbrowser.open("https://github.com/sapoclay/clictoriano")
 
     def centrar_ventana(self):
@@ -694,6 +696,8 @@ class ClicTorisGUI(ctk.CTk):
                 self.programa.scroll_policy = self.scroll_policy
             except Exception:
                 pass
+            # Aplicar en caliente los cambios guardados desde el diálogo de configuración
+            self.programa.observadores.append(RecargaConfiguracion())
             
             # Redirigir stdout
             old_stdout = sys.stdout
@@ -729,9 +733,18 @@ class ClicTorisGUI(ctk.CTk):
             import builtins
             builtins.print = custom_print
             
-            try:
+            def lanzar():
                 if self.programa.iniciar_navegador():
                     self.programa.ejecutar()
+
+            try:
+                if self.profile_enabled:
+                    from perfilado import PerfiladorEjecucion
+                    perfilador = PerfiladorEjecucion(Path.home() / '.clictoriano' / 'perfiles',
+                                                     iteraciones=self.profile_iterations)
+                    perfilador.ejecutar(self.programa, lanzar)
+                else:
+                    lanzar()
             finally:
                 sys.stdout = old_stdout
                 builtins.print = original_print
@@ -747,6 +760,10 @@ class ClicTorisGUI(ctk.CTk):
         Devuelve la primera pareja de dígitos separadas por puntos encontrada, p.ej. '0.34.0' o '145.0.2'.
         """
         import subprocess, re
+        if len(cmd) == 2 and cmd[1] == '--version':
+            # Consultas de versión: caché compartida por mtime/tamaño del binario
+            from descubrimiento import version_binario
+            return version_binario(cmd[0])
         try:
             out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True, timeout=6)
             m = re.search(r"(\d+\.\d+(?:\.\d+)*)", out)
@@ -1073,6 +1090,10 @@ class ClicTorisGUI(ctk.CTk):
         
         self.agregar_log(f"\n{'='*20} FINALIZADO {'='*20}\n")
 
-if __name__ == "__main__":
+def main():
     app = ClicTorisGUI()
     app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
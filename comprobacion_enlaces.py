@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Modo de comprobación de enlaces.
+
+Para cada navegación registra el código HTTP del documento principal, la cadena de
+redirecciones y la URL final, y escribe de forma incremental un informe CSV con los
+enlaces rotos (código >= 400 o fallo de red). Las navegaciones que el driver no llega a
+completar (DNS, TLS, conexión rechazada...) se anotan con `registrar_error`.
+
+- En Chrome/Chromium se usan los eventos de red del log de rendimiento de
+  chromedriver (`goog:loggingPrefs` → `performance`), sin peticiones adicionales.
+- En Firefox (o si el log no está disponible) se recurre a la Navigation Timing API
+  (`responseStatus`, `redirectCount`) del documento cargado.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import threading
+from typing import Optional
+
+__all__ = ["ComprobadorEnlaces"]
+
+_SCRIPT_NAVEGACION = (
+    "var n = performance.getEntriesByType('navigation')[0];"
+    "return n ? {status: n.responseStatus || null, redirects: n.redirectCount || 0} : null;"
+)
+
+
+class ComprobadorEnlaces:
+    """Registra el estado HTTP de cada navegación de `ClicToris`."""
+
+    CAMPOS = ('url', 'estado', 'url_final', 'redirecciones', 'error')
+
+    def __init__(self, ruta_informe: str = 'enlaces_rotos.csv'):
+        self.ruta_informe = ruta_informe
+        self.comprobados = 0
+        self.rotos = 0
+        self._lock = threading.Lock()
+        self._fh = None
+        self._writer = None
+        self._log_disponible = True
+        self._cabecera_escrita = False
+        self._sesiones = 0
+
+    # --- Integración con ClicToris ---
+
+    def preparar_opciones_chrome(self, opciones) -> None:
+        """Activa el log de rendimiento (eventos de red) en las opciones de Chrome."""
+        opciones.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    def al_iniciar(self, programa) -> None:
+        with self._lock:
+            self._sesiones += 1
+        # Descartar los eventos del arranque
+        self._leer_eventos(programa.driver)
+
+    def al_reciclar(self, programa, motivo) -> None:
+        # Descartar los eventos del arranque del navegador nuevo
+        self._leer_eventos(programa.driver)
+
+    def al_finalizar(self, programa) -> None:
+        # Varias sesiones comparten el comprobador: sólo informa la última en cerrar
+        with self._lock:
+            self._sesiones = max(0, self._sesiones - 1)
+            if self._sesiones:
+                return
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+        print(f"🔗 Comprobación de enlaces: {self.comprobados} navegaciones, {self.rotos} rotas")
+        if self.rotos:
+            print(f"    Informe de enlaces rotos: {self.ruta_informe}")
+
+    def registrar(self, driver, url: str) -> dict:
+        """Obtiene el resultado de la última navegación a `url` y lo anota si está roto."""
+        eventos = self._leer_eventos(driver)
+        resultado = self._desde_eventos(url, eventos) if eventos else None
+        if resultado is None:
+            resultado = self._desde_navigation_timing(driver, url)
+        return self._anotar(resultado)
+
+    def registrar_error(self, driver, url: str, error: Exception) -> dict:
+        """Anota como rota una navegación a `url` que falló con `error` (DNS, TLS, conexión...)."""
+        eventos = self._leer_eventos(driver)
+        resultado = self._desde_eventos(url, eventos) if eventos else None
+        if resultado is None or not resultado.get('error'):
+            # Selenium añade a net::ERR_* varias líneas con datos de la sesión
+            mensaje = str(getattr(error, 'msg', None) or error).strip().splitlines()
+            resultado = {'url': url, 'estado': None, 'url_final': None, 'redirecciones': [],
+                         'error': mensaje[0] if mensaje else error.__class__.__name__}
+        return self._anotar(resultado)
+
+    def _anotar(self, resultado: dict) -> dict:
+        estado = resultado.get('estado')
+        resultado['roto'] = bool(resultado.get('error')) or (estado is not None and estado >= 400)
+        with self._lock:
+            self.comprobados += 1
+            if resultado['roto']:
+                self.rotos += 1
+                self._escribir(resultado)
+        return resultado
+
+    # --- Fuentes ---
+
+    def _leer_eventos(self, driver) -> list[dict]:
+        if not self._log_disponible:
+            return []
+        try:
+            entradas = driver.get_log('performance')
+        except Exception:
+            # Firefox y drivers sin log de rendimiento
+            self._log_disponible = False
+            return []
+        eventos = []
+        for entrada in entradas:
+            try:
+                eventos.append(json.loads(entrada['message'])['message'])
+            except (KeyError, ValueError, TypeError):
+                continue
+        return eventos
+
+    def _desde_eventos(self, url: str, eventos: list[dict]) -> Optional[dict]:
+        # Marco principal: el último navegado sin padre
+        marco = None
+        for ev in eventos:
+            if ev.get('method') == 'Page.frameNavigated':
+                frame = ev.get('params', {}).get('frame', {})
+                if not frame.get('parentId'):
+                    marco = frame.get('id')
+        peticion = None
+        redirecciones: list[tuple[str, int]] = []
+        resultado = None
+        for ev in eventos:
+            metodo = ev.get('method')
+            params = ev.get('params', {})
+            if params.get('type') != 'Document':
+                continue
+            if metodo == 'Network.requestWillBeSent':
+                if marco and params.get('frameId') != marco:
+                    continue
+                redirigida = params.get('redirectResponse')
+                if redirigida and params.get('requestId') == peticion:
+                    redirecciones.append((redirigida.get('url'), redirigida.get('status')))
+                else:
+                    peticion = params.get('requestId')
+                    redirecciones = []
+            # responseReceived y loadingFailed se asocian por requestId (loadingFailed no trae frameId)
+            elif metodo == 'Network.responseReceived' and params.get('requestId') == peticion:
+                respuesta = params.get('response', {})
+                resultado = {'url': url, 'estado': respuesta.get('status'), 'url_final': respuesta.get('url'),
+                             'redirecciones': list(redirecciones), 'error': None}
+            elif metodo == 'Network.loadingFailed' and params.get('requestId') == peticion:
+                if not params.get('canceled'):
+                    resultado = {'url': url, 'estado': None, 'url_final': None,
+                                 'redirecciones': list(redirecciones), 'error': params.get('errorText')}
+        return resultado
+
+    def _desde_navigation_timing(self, driver, url: str) -> dict:
+        resultado = {'url': url, 'estado': None, 'url_final': None, 'redirecciones': [], 'error': None}
+        try:
+            resultado['url_final'] = driver.current_url
+            datos = driver.execute_script(_SCRIPT_NAVEGACION) or {}
+            resultado['estado'] = datos.get('status')
+            # Navigation Timing sólo indica cuántas redirecciones hubo, no sus URLs
+            resultado['redirecciones'] = [(None, None)] * int(datos.get('redirects') or 0)
+        except Exception as e:
+            resultado['error'] = f"{e.__class__.__name__}: {e}"
+        return resultado
+
+    # --- Informe ---
+
+    def _escribir(self, resultado: dict) -> None:
+        if self._fh is None:
+            # En modo lote varias sesiones comparten el informe: sólo la primera lo trunca
+            modo = 'a' if self._cabecera_escrita else 'w'
+            self._fh = open(self.ruta_informe, modo, encoding='utf-8', newline='')
+            self._writer = csv.writer(self._fh)
+            if not self._cabecera_escrita:
+                self._writer.writerow(self.CAMPOS)
+                self._cabecera_escrita = True
+        cadena = ' -> '.join(f"{u or '?'} [{s or '?'}]" for u, s in resultado['redirecciones'])
+        self._writer.writerow([resultado['url'], resultado.get('estado') or '', resultado.get('url_final') or '',
+                               cadena, resultado.get('error') or ''])
+        # Volcar cada fila para que el informe sea útil aunque se interrumpa la ejecución
+        self._fh.flush()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Control adaptativo de la concurrencia (AIMD) según la latencia observada del servidor.
+
+Contra un entorno de pruebas con muchas sesiones interesa sacar todo el rendimiento que
+el origen aguante sin sacarlo de su SLO. `ControladorAIMD` es un observador compartido
+por todas las sesiones que junta la latencia de carga (`al_navegar`) y los errores de
+navegación en ventanas de `ventana` muestras y, al cerrar cada ventana, compara su p95
+con `p95_objetivo`:
+
+- Por encima del objetivo, o con más errores de los tolerados (`max_errores`):
+  reducción multiplicativa. Se queda la mitad de las sesiones activas (mínimo 1) y los
+  intervalos entre clics se multiplican por `factor_freno`.
+- Por debajo de `margen * p95_objetivo` y sin errores de más: aumento aditivo. Se
+  activa una sesión más y, si ya están todas, los intervalos bajan en `paso_ritmo`
+  veces el intervalo configurado.
+- Entre ambos valores no se toca nada.
+
+Las sesiones sobrantes no se cierran: `esperar_turno` las aparca entre clics (con el
+navegador abierto) hasta que vuelva a haber hueco. El ritmo se aplica escalando los
+`intervalo_min` / `intervalo_max` de cada sesión, que ya se leen en cada paso; si otro
+componente los cambia (trabajos del demonio, `--watch-config`) se toman como nueva base.
+Cada ajuste se imprime y se guarda en `ajustes`.
+
+Uso:
+
+    controlador = ControladorAIMD(p95_objetivo=2.0, sesiones_max=8)
+    programa.concurrencia = controlador
+    programa.observadores.append(controlador)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from estadisticas import percentil
+
+__all__ = ["ControladorAIMD"]
+
+
+class ControladorAIMD:
+    """Observador compartido que ajusta sesiones activas y ritmo hacia un p95 objetivo."""
+
+    def __init__(self, p95_objetivo: float, sesiones_max: int = 1, sesiones_iniciales: int = 1,
+                 ventana: int = 20, max_errores: float = 0.05, margen: float = 0.8,
+                 factor_freno: float = 2.0, paso_ritmo: float = 0.1,
+                 escala_min: float = 0.1, escala_max: float = 10.0):
+        self.p95_objetivo = p95_objetivo
+        self.sesiones_max = max(1, sesiones_max)
+        self.limite = min(self.sesiones_max, max(1, sesiones_iniciales))
+        self.ventana = max(1, ventana)
+        self.max_errores = max_errores
+        self.margen = margen
+        self.factor_freno = factor_freno
+        self.paso_ritmo = paso_ritmo
+        self.escala_min = escala_min
+        self.escala_max = escala_max
+        # Multiplicador de los intervalos entre clics configurados
+        self.escala = 1.0
+        self.ajustes: list[dict] = []
+        self._muestras: list[float] = []
+        self._errores = 0
+        self._activas: set = set()
+        # id(programa) -> (min, max) configurados y (min, max) escritos por el controlador
+        self._bases: dict[int, tuple] = {}
+        self._estado = threading.Condition()
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_navegar(self, programa, url, segundos, error) -> None:
+        with self._estado:
+            self._muestras.append(segundos)
+            if error is not None:
+                self._errores += 1
+            if len(self._muestras) >= self.ventana:
+                self._evaluar()
+
+    def al_finalizar(self, programa) -> None:
+        self.liberar(programa)
+        with self._estado:
+            self._bases.pop(id(programa), None)
+
+    # --- Turnos de las sesiones ---
+
+    def esperar_turno(self, programa) -> bool:
+        """Bloquea mientras la sesión sobre del límite actual y aplica el ritmo vigente.
+
+        Devuelve False si se pidió detener la sesión mientras esperaba.
+        """
+        avisado = False
+        with self._estado:
+            while True:
+                if programa._detener.is_set():
+                    self._activas.discard(programa)
+                    return False
+                if programa in self._activas and len(self._activas) <= self.limite:
+                    break
+                # Sobra una sesión activa tras un recorte: cede su hueco a la espera
+                self._activas.discard(programa)
+                if len(self._activas) < self.limite:
+                    self._activas.add(programa)
+                    break
+                if not avisado:
+                    print(f"    🅿️  Sesión aparcada por el control de concurrencia ({self.limite} activa(s))")
+                    avisado = True
+                self._estado.wait(0.5)
+            self._aplicar_ritmo(programa)
+        return True
+
+    def liberar(self, programa) -> None:
+        """La sesión deja de contar como activa (terminó su semilla o se cerró)."""
+        with self._estado:
+            if programa in self._activas:
+                self._activas.discard(programa)
+                self._estado.notify_all()
+
+    def _aplicar_ritmo(self, programa) -> None:
+        actual = (programa.intervalo_min, programa.intervalo_max)
+        base, escrito = self._bases.get(id(programa), (actual, (None, None)))
+        # Primer paso de la sesión o alguien cambió un intervalo: ese valor es la nueva base
+        base = tuple(a if a != e else b for a, e, b in zip(actual, escrito, base))
+        escrito = (round(base[0] * self.escala, 3), round(base[1] * self.escala, 3))
+        programa.intervalo_min, programa.intervalo_max = escrito
+        self._bases[id(programa)] = (base, escrito)
+
+    # --- Decisión ---
+
+    def _evaluar(self) -> None:
+        p95 = percentil(self._muestras, 95)
+        tasa_errores = self._errores / len(self._muestras)
+        self._muestras = []
+        self._errores = 0
+        limite, escala = self.limite, self.escala
+        if p95 > self.p95_objetivo or tasa_errores > self.max_errores:
+            accion = 'reducir'
+            self.limite = max(1, self.limite // 2)
+            self.escala = min(self.escala_max, self.escala * self.factor_freno)
+        elif p95 < self.p95_objetivo * self.margen:
+            accion = 'aumentar'
+            if self.limite < self.sesiones_max:
+                self.limite += 1
+            else:
+                self.escala = max(self.escala_min, self.escala - self.paso_ritmo)
+        else:
+            return
+        if (limite, escala) == (self.limite, self.escala):
+            return
+        ajuste = {
+            'ts': round(time.time(), 3),
+            'accion': accion,
+            'p95_s': round(p95, 3),
+            'errores': round(tasa_errores, 3),
+            'sesiones': self.limite,
+            'escala_intervalo': round(self.escala, 3),
+        }
+        self.ajustes.append(ajuste)
+        print(f"🎚️  Concurrencia: {accion} → {self.limite} sesión(es), intervalo x{self.escala:.2f} "
+              f"(p95 {p95:.2f}s / objetivo {self.p95_objetivo:.2f}s, errores {tasa_errores:.0%})")
+        self._estado.notify_all()
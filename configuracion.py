@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Configuración persistente de ClicToriano (`~/.clictoriano/config.json`) compartida por
+la CLI, la GUI y el motor.
+
+- `cargar_configuracion()` lee el fichero y valida cada clave; los valores no válidos
+  se sustituyen por el valor por defecto y las claves desconocidas se conservan.
+- `guardar_configuracion()` fusiona los cambios con el fichero existente y lo
+  reemplaza de forma atómica.
+- `RecargaConfiguracion` es un observador de `ClicToris` que vigila el fichero durante
+  la ejecución y aplica en caliente los parámetros seguros (intervalos, políticas y
+  límites) sin reiniciar el navegador.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Optional
+
+__all__ = [
+    "RUTA_CONFIG",
+    "AJUSTES_EN_CALIENTE",
+    "ConfiguracionEjecucion",
+    "cargar_configuracion",
+    "guardar_configuracion",
+    "aplicar_en_caliente",
+    "RecargaConfiguracion",
+]
+
+RUTA_CONFIG = Path.home() / '.clictoriano' / 'config.json'
+
+# Parámetros que se pueden cambiar con el navegador en marcha
+AJUSTES_EN_CALIENTE = ('intervalo_min', 'intervalo_max', 'external_policy', 'scroll_policy',
+                       'link_wait', 'max_clicks')
+
+_OPCIONES = {
+    'external_policy': ('new_tab', 'same_window', 'ignore'),
+    'scroll_policy': ('none', 'small', 'medium', 'full', 'random'),
+    'browser': ('chrome', 'chromium', 'firefox'),
+}
+
+
+@dataclass
+class ConfiguracionEjecucion:
+    """Valores de `config.json`; `None` significa «no fijado en el fichero»."""
+
+    external_policy: str = 'new_tab'
+    scroll_policy: str = 'none'
+    link_wait: float = 10
+    browser: str = 'chrome'
+    javascript_enabled: bool = True
+    secure_dns_enabled: bool = False
+    profile_enabled: bool = False
+    profile_iterations: Optional[int] = None
+    intervalo_min: Optional[float] = None
+    intervalo_max: Optional[float] = None
+    max_clicks: Optional[int] = None
+    # Claves que esta versión no conoce (se conservan al guardar)
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> 'ConfiguracionEjecucion':
+        config = cls()
+        conocidas = {f.name for f in fields(cls)} - {'extra'}
+        for clave, valor in (datos or {}).items():
+            if clave not in conocidas:
+                config.extra[clave] = valor
+                continue
+            valor = _validar(clave, valor)
+            if valor is not None:
+                setattr(config, clave, valor)
+        # Un intervalo incoherente no se aplica
+        if (config.intervalo_min is not None and config.intervalo_max is not None
+                and config.intervalo_max < config.intervalo_min):
+            config.intervalo_min = config.intervalo_max = None
+        return config
+
+    def a_dict(self) -> dict:
+        datos = dict(self.extra)
+        datos.update({k: v for k, v in asdict(self).items() if k != 'extra'})
+        return datos
+
+
+def _validar(clave: str, valor):
+    """Devuelve `valor` convertido al tipo de `clave`, o None si no es válido."""
+    if valor is None:
+        return None
+    if clave in _OPCIONES:
+        return valor if valor in _OPCIONES[clave] else None
+    if clave in ('javascript_enabled', 'secure_dns_enabled', 'profile_enabled'):
+        return bool(valor)
+    try:
+        if clave in ('profile_iterations', 'max_clicks'):
+            numero = int(valor)
+            return numero if numero > 0 else None
+        if clave == 'link_wait':
+            numero = float(valor)
+            return numero if numero >= 0 else None
+        if clave in ('intervalo_min', 'intervalo_max'):
+            numero = float(valor)
+            return numero if numero >= 1 else None
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def cargar_configuracion(ruta: Optional[Path] = None) -> ConfiguracionEjecucion:
+    """Lee `config.json`; si no existe o está dañado devuelve los valores por defecto."""
+    ruta = Path(ruta or RUTA_CONFIG)
+    try:
+        with ruta.open('r', encoding='utf-8') as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return ConfiguracionEjecucion()
+    return ConfiguracionEjecucion.desde_dict(datos if isinstance(datos, dict) else {})
+
+
+def guardar_configuracion(cambios: dict, ruta: Optional[Path] = None) -> None:
+    """Fusiona `cambios` con el fichero existente y lo reemplaza atómicamente."""
+    ruta = Path(ruta or RUTA_CONFIG)
+    ruta.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    datos = {}
+    try:
+        with ruta.open('r', encoding='utf-8') as f:
+            datos = json.load(f) or {}
+    except (OSError, ValueError):
+        datos = {}
+    datos.update(cambios)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, prefix='.config-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def aplicar_en_caliente(programa, config: ConfiguracionEjecucion, claves=AJUSTES_EN_CALIENTE) -> dict:
+    """Aplica a `programa` los valores de `claves` fijados en `config` y devuelve los cambiados."""
+    cambios = {}
+    for clave in claves:
+        if clave not in AJUSTES_EN_CALIENTE:
+            continue
+        valor = getattr(config, clave)
+        if valor is None or getattr(programa, clave, None) == valor:
+            continue
+        cambios[clave] = valor
+    # Mantener el intervalo coherente aunque sólo cambie uno de sus extremos
+    minimo = cambios.get('intervalo_min', programa.intervalo_min)
+    maximo = cambios.get('intervalo_max', programa.intervalo_max)
+    if maximo < minimo:
+        cambios.pop('intervalo_min', None)
+        cambios.pop('intervalo_max', None)
+    for clave, valor in cambios.items():
+        setattr(programa, clave, valor)
+    return cambios
+
+
+class RecargaConfiguracion:
+    """Observador de `ClicToris` que aplica en caliente los cambios de `config.json`.
+
+    Sólo se aplican las claves que cambian en el fichero durante la ejecución, de modo
+    que las opciones dadas por línea de comandos se respetan hasta que el fichero
+    modifica esa misma clave.
+    """
+
+    def __init__(self, ruta: Optional[Path] = None, intervalo: float = 1.0):
+        self.ruta = Path(ruta or RUTA_CONFIG)
+        self.intervalo = intervalo
+        self._programas: list = []
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo = None
+        self._firma = None
+        self._config = None
+
+    def _leer_firma(self):
+        try:
+            st = self.ruta.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iniciar(self, programa) -> None:
+        with self._lock:
+            self._programas.append(programa)
+            if self._hilo is not None:
+                return
+            self._firma = self._leer_firma()
+            self._config = cargar_configuracion(self.ruta)
+            self._parar.clear()
+            self._hilo = threading.Thread(target=self._vigilar, name='clictoriano-config', daemon=True)
+            self._hilo.start()
+
+    def al_finalizar(self, programa) -> None:
+        with self._lock:
+            if programa in self._programas:
+                self._programas.remove(programa)
+            if self._programas or self._hilo is None:
+                return
+            hilo, self._hilo = self._hilo, None
+        self._parar.set()
+        hilo.join(timeout=5)
+
+    # --- Vigilancia ---
+
+    def _vigilar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            firma = self._leer_firma()
+            if firma is None or firma == self._firma:
+                continue
+            self._firma = firma
+            self.recargar()
+
+    def recargar(self) -> dict:
+        """Relee el fichero y aplica las claves seguras que han cambiado."""
+        nueva = cargar_configuracion(self.ruta)
+        anterior, self._config = self._config, nueva
+        claves = [c for c in AJUSTES_EN_CALIENTE
+                  if anterior is None or getattr(nueva, c) != getattr(anterior, c)]
+        cambios = {}
+        with self._lock:
+            programas = list(self._programas)
+        for programa in programas:
+            cambios = aplicar_en_caliente(programa, nueva, claves) or cambios
+        reinicio = [c for c in ('browser', 'javascript_enabled', 'secure_dns_enabled')
+                    if anterior is not None and getattr(nueva, c) != getattr(anterior, c)]
+        if reinicio:
+            print(f"ℹ️  {', '.join(reinicio)}: se aplicará en el próximo arranque del navegador")
+        if cambios:
+            texto = ', '.join(f"{k}={v}" for k, v in cambios.items())
+            print(f"🔄 Configuración recargada en caliente: {texto}")
+        return cambios
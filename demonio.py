@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Modo demonio: un proceso de larga vida con navegadores ya arrancados que acepta
+trabajos por una API HTTP local.
+
+Los trabajos (URL semilla, límites y políticas) entran en una cola FIFO y los
+atiende la primera sesión libre, que reutiliza su navegador, de modo que la
+latencia de cada trabajo no incluye el arranque de Python, Selenium ni el navegador.
+
+API (sólo en 127.0.0.1 por defecto):
+
+    POST   /jobs              {"url": ..., "max_clicks": 10, "timeout": 60, ...} → 201 + trabajo
+    GET    /jobs              lista de trabajos recientes
+    GET    /jobs/<id>         estado y progreso de un trabajo
+    GET    /jobs/<id>/events  progreso en streaming (una línea JSON por evento)
+    DELETE /jobs/<id>         cancela un trabajo en cola o en ejecución
+    GET    /health            sesiones y trabajos en cola
+
+Las peticiones que modifican trabajos deben llegar sin cabecera `Origin` o con la del
+propio demonio, y `POST /jobs` exige `Content-Type: application/json`. Así una página
+web abierta en el equipo (incluidas las que rastrean las propias sesiones) no puede
+encolar ni cancelar trabajos con peticiones CORS "simples" (`text/plain`).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+__all__ = ["Trabajo", "DemonioClicToris", "servir_demonio"]
+
+_FIN = object()
+
+# Parámetros que un trabajo puede fijar: clave JSON → (atributo de ClicToris, tipo)
+_AJUSTES = {
+    'max_clicks': ('max_clicks', int),
+    'intervalo_min': ('intervalo_min', float),
+    'intervalo_max': ('intervalo_max', float),
+    'external_policy': ('external_policy', str),
+    'scroll_policy': ('scroll_policy', str),
+    'link_wait': ('link_wait', float),
+    'link_filter': ('link_filter', str),
+}
+_POLITICAS = {
+    'external_policy': ('new_tab', 'same_window', 'ignore'),
+    'scroll_policy': ('none', 'small', 'medium', 'full', 'random'),
+    'link_filter': ('any', 'visible', 'clickable', 'viewport'),
+}
+
+
+class Trabajo:
+    """Un recorrido solicitado al demonio y su progreso."""
+
+    def __init__(self, ident: str, url: str, ajustes: dict, timeout: Optional[float]):
+        self.id = ident
+        self.url = url
+        self.ajustes = ajustes
+        self.timeout = timeout
+        self.estado = 'en_cola'
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self.clics = 0
+        self.visitados = 0
+        self.error = None
+        self.cancelado = False
+        self.eventos: list[dict] = []
+        self.programa = None
+        self._cond = threading.Condition()
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado in ('completado', 'cancelado', 'error')
+
+    def anotar(self, evento: dict) -> None:
+        with self._cond:
+            evento['ts'] = round(time.time(), 3)
+            self.eventos.append(evento)
+            self._cond.notify_all()
+
+    def cambiar_estado(self, estado: str, **datos) -> None:
+        with self._cond:
+            self.estado = estado
+            for clave, valor in datos.items():
+                setattr(self, clave, valor)
+        self.anotar({'tipo': 'estado', 'estado': estado})
+
+    def esperar_eventos(self, desde: int, timeout: float = 1.0) -> list[dict]:
+        """Devuelve los eventos a partir del índice `desde`, esperando si aún no hay."""
+        with self._cond:
+            if len(self.eventos) <= desde and not self.terminado:
+                self._cond.wait(timeout)
+            return self.eventos[desde:]
+
+    def resumen(self) -> dict:
+        return {
+            'id': self.id,
+            'url': self.url,
+            'estado': self.estado,
+            'ajustes': self.ajustes,
+            'timeout': self.timeout,
+            'creado': round(self.creado, 3),
+            'inicio': round(self.inicio, 3) if self.inicio else None,
+            'fin': round(self.fin, 3) if self.fin else None,
+            'clics': self.programa.contador_clics if self.programa else self.clics,
+            'visitados': len(self.programa.enlaces_visitados) if self.programa else self.visitados,
+            'error': self.error,
+        }
+
+
+class _Progreso:
+    """Observador de una sesión que reenvía sus eventos al trabajo en curso."""
+
+    def __init__(self):
+        self.trabajo: Optional[Trabajo] = None
+
+    def al_navegar(self, programa, url, segundos, error) -> None:
+        if self.trabajo:
+            self.trabajo.anotar({'tipo': 'navegacion', 'url': url, 'segundos': round(segundos, 3),
+                                 'error': error.__class__.__name__ if error else None})
+
+    def al_iteracion(self, programa, numero) -> None:
+        if self.trabajo and numero:
+            self.trabajo.anotar({'tipo': 'clic', 'numero': numero, 'visitados': len(programa.enlaces_visitados)})
+
+    def al_error(self, programa, error) -> None:
+        if self.trabajo:
+            self.trabajo.anotar({'tipo': 'error', 'error': f"{error.__class__.__name__}: {error}"})
+
+
+class DemonioClicToris:
+    """Planificador FIFO de trabajos sobre `sesiones` navegadores permanentes."""
+
+    def __init__(self, crear_programa: Callable[[str], object], sesiones: int = 1, historial: int = 200):
+        self.crear_programa = crear_programa
+        self.sesiones = max(1, sesiones)
+        self.historial = historial
+        self._cola: queue.Queue = queue.Queue()
+        self._trabajos: 'OrderedDict[str, Trabajo]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._contador = itertools.count(1)
+        self._hilos: list[threading.Thread] = []
+        self._parado = threading.Event()
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self) -> None:
+        """Arranca las sesiones; cada una abre su navegador antes del primer trabajo."""
+        for i in range(self.sesiones):
+            hilo = threading.Thread(target=self._trabajador, name=f'clictoriano-demonio-{i}', daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def detener(self) -> None:
+        """Cancela los trabajos pendientes y cierra los navegadores."""
+        self._parado.set()
+        with self._lock:
+            trabajos = list(self._trabajos.values())
+        for trabajo in trabajos:
+            if not trabajo.terminado:
+                self.cancelar(trabajo.id)
+        for _ in self._hilos:
+            self._cola.put(_FIN)
+        for hilo in self._hilos:
+            hilo.join(timeout=30)
+
+    # --- API de trabajos ---
+
+    def enviar(self, datos: dict) -> Trabajo:
+        """Valida `datos` y encola un trabajo. Lanza ValueError si no son válidos."""
+        if self._parado.is_set():
+            raise ValueError('el demonio se está deteniendo')
+        url = datos.get('url')
+        if not isinstance(url, str) or not url.startswith('http'):
+            raise ValueError('La URL debe comenzar con http:// o https://')
+        ajustes = {}
+        for clave, (_, tipo) in _AJUSTES.items():
+            if datos.get(clave) is None:
+                continue
+            try:
+                ajustes[clave] = tipo(datos[clave])
+            except (TypeError, ValueError):
+                raise ValueError(f'valor no válido para {clave}')
+            if clave in _POLITICAS and ajustes[clave] not in _POLITICAS[clave]:
+                raise ValueError(f"{clave} debe ser uno de: {', '.join(_POLITICAS[clave])}")
+        timeout = datos.get('timeout')
+        try:
+            timeout = float(timeout) if timeout is not None else None
+        except (TypeError, ValueError):
+            raise ValueError('valor no válido para timeout')
+        trabajo = Trabajo(str(next(self._contador)), url, ajustes, timeout)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            self._purgar()
+        self._cola.put(trabajo)
+        return trabajo
+
+    def trabajo(self, ident: str) -> Optional[Trabajo]:
+        with self._lock:
+            return self._trabajos.get(ident)
+
+    def trabajos(self) -> list[Trabajo]:
+        with self._lock:
+            return list(self._trabajos.values())
+
+    def cancelar(self, ident: str) -> bool:
+        trabajo = self.trabajo(ident)
+        if trabajo is None:
+            return False
+        # Mismo lock que `_reclamar`: un trabajo en cola o se cancela o lo toma una sesión
+        with self._lock:
+            if trabajo.terminado:
+                return False
+            en_cola = trabajo.estado == 'en_cola'
+            if en_cola:
+                # El trabajador lo descartará al sacarlo de la cola
+                trabajo.cambiar_estado('cancelado', fin=time.time())
+            else:
+                trabajo.cancelado = True
+                programa = trabajo.programa
+        if not en_cola:
+            trabajo.anotar({'tipo': 'cancelacion'})
+            if programa is not None:
+                programa.detener()
+        return True
+
+    def _reclamar(self, trabajo: Trabajo, programa) -> bool:
+        """Pasa `trabajo` de en_cola a ejecutando en `programa`; False si ya se canceló."""
+        with self._lock:
+            if trabajo.estado != 'en_cola':
+                return False
+            trabajo.programa = programa
+            trabajo.cambiar_estado('ejecutando', inicio=time.time())
+            return True
+
+    def en_cola(self) -> int:
+        return sum(1 for t in self.trabajos() if t.estado == 'en_cola')
+
+    def _purgar(self) -> None:
+        # Olvidar los trabajos terminados más antiguos por encima del historial
+        sobrantes = len(self._trabajos) - self.historial
+        for ident in [i for i, t in self._trabajos.items() if t.terminado][:max(0, sobrantes)]:
+            del self._trabajos[ident]
+
+    # --- Sesiones ---
+
+    def _arrancar(self, progreso: _Progreso):
+        try:
+            programa = self.crear_programa('about:blank')
+            programa.observadores.append(progreso)
+            if not programa.iniciar_navegador():
+                return None, None
+        except Exception as e:
+            print(f"⚠️  No se pudo iniciar una sesión del demonio: {e.__class__.__name__}: {e}")
+            return None, None
+        programa._emitir('al_iniciar')
+        base = {atributo: getattr(programa, atributo, None) for atributo, _ in _AJUSTES.values()}
+        return programa, base
+
+    def _trabajador(self) -> None:
+        progreso = _Progreso()
+        programa, base = self._arrancar(progreso)
+        try:
+            while True:
+                trabajo = self._cola.get()
+                if trabajo is _FIN:
+                    break
+                if trabajo.terminado:
+                    continue
+                if programa is None:
+                    programa, base = self._arrancar(progreso)
+                    if programa is None:
+                        with self._lock:
+                            if trabajo.estado == 'en_cola':
+                                trabajo.cambiar_estado('error', error='No se pudo iniciar el navegador',
+                                                       fin=time.time())
+                        continue
+                self._ejecutar(programa, base, progreso, trabajo)
+                if getattr(programa, '_driver_lost', False):
+                    programa.cerrar_navegador()
+                    programa = None
+        finally:
+            if programa is not None:
+                programa.cerrar_navegador()
+
+    def _ejecutar(self, programa, base: dict, progreso: _Progreso, trabajo: Trabajo) -> None:
+        if not self._reclamar(trabajo, programa):
+            return
+        programa.cambiar_semilla(trabajo.url)
+        for atributo, valor in base.items():
+            setattr(programa, atributo, valor)
+        for clave, valor in trabajo.ajustes.items():
+            setattr(programa, _AJUSTES[clave][0], valor)
+        programa.limite_tiempo = time.monotonic() + trabajo.timeout if trabajo.timeout else None
+        progreso.trabajo = trabajo
+        # DELETE entre `_reclamar` y `cambiar_semilla` (que limpia la señal de detención)
+        if trabajo.cancelado:
+            programa.detener()
+        error = None
+        try:
+            programa.recorrer()
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        if getattr(programa, '_driver_lost', False) and not error:
+            error = 'Se perdió la sesión del navegador'
+        cancelado = trabajo.cancelado or programa._detener.is_set()
+        trabajo.clics = programa.contador_clics
+        trabajo.visitados = len(programa.enlaces_visitados)
+        trabajo.programa = None
+        progreso.trabajo = None
+        if error:
+            trabajo.cambiar_estado('error', error=error, fin=time.time())
+        else:
+            trabajo.cambiar_estado('cancelado' if cancelado else 'completado', fin=time.time())
+        print(f"📬 Trabajo {trabajo.id} {trabajo.estado}: {trabajo.clics} clics en {trabajo.url}")
+
+
+def servir_demonio(demonio: DemonioClicToris, puerto: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Arranca la API de trabajos en un hilo daemon y devuelve el servidor."""
+
+    class _Manejador(BaseHTTPRequestHandler):
+        def _responder(self, codigo: int, datos) -> None:
+            cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _partes(self) -> list[str]:
+            return [p for p in self.path.split('?', 1)[0].split('/') if p]
+
+        def do_GET(self):
+            partes = self._partes()
+            if partes == ['health']:
+                self._responder(200, {'sesiones': demonio.sesiones, 'en_cola': demonio.en_cola()})
+            elif partes == ['jobs']:
+                self._responder(200, [t.resumen() for t in demonio.trabajos()])
+            elif len(partes) in (2, 3) and partes[0] == 'jobs':
+                trabajo = demonio.trabajo(partes[1])
+                if trabajo is None:
+                    self._responder(404, {'error': 'trabajo no encontrado'})
+                elif len(partes) == 2:
+                    self._responder(200, trabajo.resumen())
+                elif partes[2] == 'events':
+                    self._transmitir(trabajo)
+                else:
+                    self._responder(404, {'error': 'ruta no encontrada'})
+            else:
+                self._responder(404, {'error': 'ruta no encontrada'})
+
+        def _origen_ajeno(self) -> bool:
+            """True si la petición viene de una página web de otro origen (navegador)."""
+            origen = self.headers.get('Origin')
+            if origen is None:
+                return False
+            partes = urlsplit(origen)
+            return not (partes.hostname in ('127.0.0.1', 'localhost', '::1')
+                        and partes.port == self.server.server_address[1])
+
+        def do_POST(self):
+            if self._partes() != ['jobs']:
+                self._responder(404, {'error': 'ruta no encontrada'})
+                return
+            if self._origen_ajeno():
+                self._responder(403, {'error': 'origen no permitido'})
+                return
+            tipo = (self.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+            if tipo != 'application/json':
+                # Obliga a los navegadores a hacer una petición preflight, que no se atiende
+                self._responder(415, {'error': 'se esperaba Content-Type: application/json'})
+                return
+            try:
+                longitud = int(self.headers.get('Content-Length') or 0)
+                datos = json.loads(self.rfile.read(longitud) or b'{}')
+                if not isinstance(datos, dict):
+                    raise ValueError('se esperaba un objeto JSON')
+                trabajo = demonio.enviar(datos)
+            except ValueError as e:
+                self._responder(400, {'error': str(e)})
+                return
+            self._responder(201, trabajo.resumen())
+
+        def do_DELETE(self):
+            if self._origen_ajeno():
+                self._responder(403, {'error': 'origen no permitido'})
+                return
+            partes = self._partes()
+            if len(partes) != 2 or partes[0] != 'jobs' or demonio.trabajo(partes[1]) is None:
+                self._responder(404, {'error': 'trabajo no encontrado'})
+                return
+            cancelado = demonio.cancelar(partes[1])
+            self._responder(202 if cancelado else 409, demonio.trabajo(partes[1]).resumen())
+
+        def _transmitir(self, trabajo: Trabajo) -> None:
+            # Sin Content-Length: el cuerpo termina al cerrar la conexión (HTTP/1.0)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+            self.end_headers()
+            enviados = 0
+            try:
+                while True:
+                    eventos = trabajo.esperar_eventos(enviados)
+                    for evento in eventos:
+                        self.wfile.write((json.dumps(evento, ensure_ascii=False) + '\n').encode('utf-8'))
+                    enviados += len(eventos)
+                    self.wfile.flush()
+                    if trabajo.terminado and enviados >= len(trabajo.eventos):
+                        break
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    hilo = threading.Thread(target=servidor.serve_forever, name='clictoriano-api', daemon=True)
+    hilo.start()
+    return servidor
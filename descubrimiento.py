@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Caché de descubrimiento de navegadores y webdrivers (`~/.clictoriano/descubrimiento.json`).
+
+Averiguar si un binario funciona y qué versión tiene exige lanzar `<binario> --version`,
+que cuesta decenas o cientos de milisegundos por candidato. El resultado se guarda
+asociado a la ruta invocada junto con la ruta real a la que apunta y su `mtime` y
+tamaño: mientras el fichero no cambie (no se actualice el navegador o el driver) la
+respuesta sale de la caché sin lanzar ningún proceso.
+
+El binario se ejecuta siempre por la ruta invocada, no por la real: `/snap/bin/chromium`
+es un enlace a `/usr/bin/snap`, un binario multillamada que decide qué hacer por argv[0].
+
+También recuerda qué ruta se resolvió para cada tipo (`chrome`, `chromium`, `firefox`,
+`chromedriver`, `geckodriver`), para probarla antes que las demás candidatas.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+__all__ = [
+    "RUTA_CACHE",
+    "version_binario",
+    "binario_valido",
+    "recordar_resuelto",
+    "resuelto",
+    "limpiar_cache",
+]
+
+RUTA_CACHE = Path.home() / '.clictoriano' / 'descubrimiento.json'
+
+_PATRON_VERSION = re.compile(r"(\d+\.\d+(?:\.\d+)*)")
+_lock = threading.Lock()
+_datos: Optional[dict] = None
+
+
+def _cargar() -> dict:
+    global _datos
+    if _datos is None:
+        try:
+            with RUTA_CACHE.open('r', encoding='utf-8') as f:
+                _datos = json.load(f)
+            if not isinstance(_datos, dict):
+                raise ValueError
+        except (OSError, ValueError):
+            _datos = {}
+        _datos.setdefault('binarios', {})
+        _datos.setdefault('resueltos', {})
+    return _datos
+
+
+def _guardar() -> None:
+    # Escritura atómica: otro proceso nunca lee un JSON a medias
+    try:
+        RUTA_CACHE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=RUTA_CACHE.parent, prefix='.descubrimiento-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(_datos, f)
+        os.replace(temporal, RUTA_CACHE)
+    except OSError:
+        pass
+
+
+def _firma(ruta: str) -> Optional[tuple[str, str, int, int]]:
+    """(ruta invocada, ruta real, mtime_ns, tamaño) del binario, o None si no existe o no es ejecutable."""
+    if os.sep not in ruta and not os.path.isabs(ruta):
+        ruta = shutil.which(ruta) or ruta
+    try:
+        invocada = os.path.abspath(ruta)
+        real = os.path.realpath(invocada)
+        st = os.stat(real)
+    except OSError:
+        return None
+    if not os.path.isfile(real) or not os.access(real, os.X_OK):
+        return None
+    return invocada, real, st.st_mtime_ns, st.st_size
+
+
+def _consultar(ruta: str) -> Optional[dict]:
+    firma = _firma(ruta)
+    if firma is None:
+        return None
+    invocada, real, mtime, tamano = firma
+    with _lock:
+        entrada = _cargar()['binarios'].get(invocada)
+        if (entrada and entrada.get('real') == real and entrada.get('mtime_ns') == mtime
+                and entrada.get('size') == tamano):
+            return entrada
+    # Fallo de caché: lanzar `--version` (fuera del lock, puede tardar)
+    ok, version = False, None
+    try:
+        proc = subprocess.run([invocada, '--version'], capture_output=True, text=True, timeout=10)
+        ok = proc.returncode == 0
+        m = _PATRON_VERSION.search(proc.stdout or proc.stderr or '')
+        version = m.group(1) if m else None
+    except Exception:
+        pass
+    entrada = {'real': real, 'mtime_ns': mtime, 'size': tamano, 'ok': ok, 'version': version}
+    with _lock:
+        _cargar()['binarios'][invocada] = entrada
+        _guardar()
+    return entrada
+
+
+def version_binario(ruta: str) -> Optional[str]:
+    """Versión que informa `ruta --version` (p.ej. '142.0.7444.175'), o None."""
+    entrada = _consultar(ruta)
+    return entrada.get('version') if entrada else None
+
+
+def binario_valido(ruta: str) -> bool:
+    """True si `ruta` existe, es ejecutable y `--version` termina correctamente."""
+    entrada = _consultar(ruta)
+    return bool(entrada and entrada.get('ok'))
+
+
+def recordar_resuelto(tipo: str, ruta: str) -> None:
+    """Anota que `ruta` es el binario elegido para `tipo` (p.ej. 'chrome')."""
+    with _lock:
+        datos = _cargar()
+        if datos['resueltos'].get(tipo) != ruta:
+            datos['resueltos'][tipo] = ruta
+            _guardar()
+
+
+def resuelto(tipo: str) -> Optional[str]:
+    """Ruta recordada para `tipo` si sigue siendo un binario válido."""
+    with _lock:
+        ruta = _cargar()['resueltos'].get(tipo)
+    if ruta and binario_valido(ruta):
+        return ruta
+    return None
+
+
+def limpiar_cache() -> None:
+    global _datos
+    with _lock:
+        _datos = None
+        try:
+            RUTA_CACHE.unlink()
+        except OSError:
+            pass
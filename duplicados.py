@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Detección de páginas casi duplicadas mediante SimHash.
+
+Tras cada carga se calcula la huella SimHash (64 bits) del texto visible de la página
+y se busca en un índice de huellas ya vistas (4 bandas de 16 bits, de modo que toda
+huella a distancia de Hamming <= 3 comparte al menos una banda). Cuando una plantilla
+de URL (ver `plantillas_url`) acumula páginas casi duplicadas, los enlaces pendientes
+que encajan en ella se omiten o se dejan para el final, y se informa de las cargas
+de página ahorradas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Optional
+
+from plantillas_url import plantilla_url
+
+__all__ = ["simhash", "distancia_hamming", "IndiceSimHash", "DetectorDuplicados"]
+
+_PALABRA = re.compile(r'\w+', re.UNICODE)
+_SCRIPT_TEXTO = "return document.body ? document.body.innerText : '';"
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(texto: str, tam_shingle: int = 3) -> Optional[int]:
+    """Huella SimHash de 64 bits de `texto` a partir de shingles de palabras.
+
+    Devuelve None si el texto no tiene palabras (no hay nada que comparar).
+    """
+    palabras = _PALABRA.findall(texto.lower())
+    if not palabras:
+        return None
+    if len(palabras) < tam_shingle:
+        shingles = [' '.join(palabras)]
+    else:
+        shingles = [' '.join(palabras[i:i + tam_shingle]) for i in range(len(palabras) - tam_shingle + 1)]
+    pesos = [0] * 64
+    for shingle in shingles:
+        h = _hash64(shingle)
+        for bit in range(64):
+            pesos[bit] += 1 if (h >> bit) & 1 else -1
+    huella = 0
+    for bit, peso in enumerate(pesos):
+        if peso > 0:
+            huella |= 1 << bit
+    return huella
+
+
+def distancia_hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class IndiceSimHash:
+    """Índice de huellas por bandas para buscar vecinos a distancia de Hamming <= `distancia`."""
+
+    BANDAS = 4
+    BITS_BANDA = 16
+
+    def __init__(self, distancia: int = 3):
+        self.distancia = distancia
+        self._bandas: list[dict[int, list[int]]] = [{} for _ in range(self.BANDAS)]
+
+    def _claves(self, huella: int):
+        mascara = (1 << self.BITS_BANDA) - 1
+        for i in range(self.BANDAS):
+            yield i, (huella >> (i * self.BITS_BANDA)) & mascara
+
+    def buscar(self, huella: int) -> Optional[int]:
+        """Devuelve una huella existente cercana a `huella`, o None."""
+        for i, clave in self._claves(huella):
+            for candidata in self._bandas[i].get(clave, ()):
+                if distancia_hamming(huella, candidata) <= self.distancia:
+                    return candidata
+        return None
+
+    def agregar(self, huella: int) -> None:
+        for i, clave in self._claves(huella):
+            self._bandas[i].setdefault(clave, []).append(huella)
+
+
+class DetectorDuplicados:
+    """Detecta páginas casi duplicadas y filtra los enlaces de plantillas que las producen.
+
+    modo: 'skip' omite los enlaces de plantillas con casi duplicados;
+          'deprioritize' sólo los elige cuando no queda ningún otro enlace.
+    """
+
+    def __init__(self, modo: str = 'skip', distancia: int = 3, min_duplicados: int = 2, ratio_minimo: float = 0.5):
+        self.modo = modo
+        self.distancia = distancia
+        self.min_duplicados = min_duplicados
+        self.ratio_minimo = ratio_minimo
+        self._omitidas = set()
+        self.paginas_duplicadas = 0
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Olvida las huellas y plantillas vistas (nueva semilla); conserva los totales."""
+        self.indice = IndiceSimHash(self.distancia)
+        # plantilla -> [páginas únicas, páginas casi duplicadas]
+        self._plantillas: dict[str, list[int]] = {}
+
+    @property
+    def cargas_ahorradas(self) -> int:
+        """URLs distintas omitidas en modo 'skip' (en 'deprioritize' no se ahorra ninguna)."""
+        return len(self._omitidas)
+
+    def es_plantilla_duplicada(self, plantilla: str) -> bool:
+        unicas, duplicadas = self._plantillas.get(plantilla, (0, 0))
+        return duplicadas >= self.min_duplicados and duplicadas / (unicas + duplicadas) >= self.ratio_minimo
+
+    def registrar_pagina(self, url: str, texto: str) -> bool:
+        """Registra el texto visible de `url`; devuelve True si es casi duplicado de una página anterior.
+
+        Las páginas sin texto (aún sin renderizar, sólo imágenes...) no se registran: todas
+        compartirían la misma huella y marcarían su plantilla como duplicada.
+        """
+        huella = simhash(texto)
+        if huella is None:
+            return False
+        duplicada = self.indice.buscar(huella) is not None
+        if not duplicada:
+            self.indice.agregar(huella)
+        else:
+            self.paginas_duplicadas += 1
+        contadores = self._plantillas.setdefault(plantilla_url(url), [0, 0])
+        contadores[1 if duplicada else 0] += 1
+        return duplicada
+
+    def filtrar(self, enlaces: list[dict]) -> list[dict]:
+        """Quita (o relega) los enlaces cuya plantilla produce casi duplicados."""
+        conservados = []
+        relegados = []
+        for enlace in enlaces:
+            if self.es_plantilla_duplicada(plantilla_url(enlace['url'])):
+                relegados.append(enlace)
+            else:
+                conservados.append(enlace)
+        if self.modo == 'deprioritize':
+            # Relegados, no omitidos: se cargarán cuando no quede otra cosa
+            return conservados or relegados
+        self._omitidas.update(e['url'] for e in relegados)
+        return conservados
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_navegar(self, programa, url, segundos, error) -> None:
+        if error is not None:
+            return
+        texto = programa.driver.execute_script(_SCRIPT_TEXTO) or ''
+        if self.registrar_pagina(url, texto):
+            print(f"    ♻️  Página casi duplicada de otra ya visitada ({plantilla_url(url)})")
+
+    def al_finalizar(self, programa) -> None:
+        print(f"♻️  Casi duplicados: {self.paginas_duplicadas} páginas detectadas, "
+              f"{self.cargas_ahorradas} cargas de página ahorradas")
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Utilidades estadísticas compartidas (instrumentación, control de concurrencia y benchmarks).
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+__all__ = ["percentil"]
+
+
+def percentil(valores, p: float) -> Optional[float]:
+    """Percentil `p` (0-100) por interpolación lineal; None si no hay valores."""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    if len(ordenados) == 1:
+        return ordenados[0]
+    pos = (len(ordenados) - 1) * p / 100.0
+    bajo = int(pos)
+    alto = min(bajo + 1, len(ordenados) - 1)
+    return ordenados[bajo] + (ordenados[alto] - ordenados[bajo]) * (pos - bajo)
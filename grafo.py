@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Registro del grafo de enlaces descubierto durante una ejecución.
+
+Cada URL se interna como un entero y las aristas origen→destino se guardan en listas
+de adyacencia respaldadas por `array('I')` (4 bytes por arista), de modo que un
+grafo de millones de aristas ocupa pocas decenas de MB.
+
+Las aristas se vuelcan a disco en streaming mientras se descubren:
+- `nodos.csv`   (id,url)
+- `aristas.csv` (origen,destino)
+y al terminar se genera `grafo.graphml` recorriendo los arrays sin materializar
+estructuras intermedias.
+"""
+
+from __future__ import annotations
+
+import csv
+from array import array
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+__all__ = ["GrafoRastreo"]
+
+
+class GrafoRastreo:
+    """Observador de `ClicToris` que registra las aristas origen→destino."""
+
+    def __init__(self, directorio: str = 'grafo', graphml: bool = True):
+        self.directorio = Path(directorio).expanduser()
+        self.graphml = graphml
+        self._ids: dict[str, int] = {}
+        self._urls: list[str] = []
+        self._adyacencia: list[array] = []
+        # Páginas cuyas aristas ya se registraron (una página revisitada no se duplica)
+        self._expandidos = set()
+        self.aristas = 0
+        self._fh_nodos = None
+        self._fh_aristas = None
+        self._nodos = None
+        self._aristas = None
+        # Nodos ya escritos en nodos.csv; tras el primer arranque los ficheros se reabren en modo 'a'
+        self._nodos_escritos = 0
+        self._cabecera_escrita = False
+        # Orígenes expandidos mientras los ficheros estaban cerrados (aristas sin volcar)
+        self._origenes_pendientes: list[int] = []
+
+    # --- API ---
+
+    def id_url(self, url: str) -> int:
+        """Devuelve el id entero de `url`, internándola si es nueva."""
+        ident = self._ids.get(url)
+        if ident is None:
+            ident = len(self._urls)
+            self._ids[url] = ident
+            self._urls.append(url)
+            self._adyacencia.append(array('I'))
+            if self._nodos is not None:
+                self._nodos.writerow((ident, url))
+                self._nodos_escritos += 1
+        return ident
+
+    def registrar(self, origen: str, destinos) -> None:
+        """Añade las aristas `origen` → cada url de `destinos` (sólo la primera vez que se ve `origen`)."""
+        id_origen = self.id_url(origen)
+        if id_origen in self._expandidos:
+            return
+        self._expandidos.add(id_origen)
+        vistos = set()
+        lista = self._adyacencia[id_origen]
+        for destino in destinos:
+            id_destino = self.id_url(destino)
+            if id_destino in vistos:
+                continue
+            vistos.add(id_destino)
+            lista.append(id_destino)
+            if self._aristas is not None:
+                self._aristas.writerow((id_origen, id_destino))
+        if self._aristas is None:
+            self._origenes_pendientes.append(id_origen)
+        self.aristas += len(vistos)
+
+    def vecinos(self, url: str) -> list[str]:
+        ident = self._ids.get(url)
+        if ident is None:
+            return []
+        return [self._urls[i] for i in self._adyacencia[ident]]
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iniciar(self, programa) -> None:
+        if self._fh_nodos is not None:
+            return
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        # Una sesión de lote que se reinicia vuelve a llamar a al_iniciar: no truncar lo ya volcado
+        modo = 'a' if self._cabecera_escrita else 'w'
+        self._fh_nodos = open(self.directorio / 'nodos.csv', modo, encoding='utf-8', newline='')
+        self._fh_aristas = open(self.directorio / 'aristas.csv', modo, encoding='utf-8', newline='')
+        self._nodos = csv.writer(self._fh_nodos)
+        self._aristas = csv.writer(self._fh_aristas)
+        if not self._cabecera_escrita:
+            self._nodos.writerow(('id', 'url'))
+            self._aristas.writerow(('origen', 'destino'))
+            self._cabecera_escrita = True
+        # Volcar los nodos y aristas registrados mientras los ficheros estaban cerrados
+        for ident in range(self._nodos_escritos, len(self._urls)):
+            self._nodos.writerow((ident, self._urls[ident]))
+        self._nodos_escritos = len(self._urls)
+        for id_origen in self._origenes_pendientes:
+            for id_destino in self._adyacencia[id_origen]:
+                self._aristas.writerow((id_origen, id_destino))
+        self._origenes_pendientes = []
+
+    def al_enlaces(self, programa, url_actual, enlaces) -> None:
+        if url_actual:
+            self.registrar(url_actual, (e['url'] for e in enlaces))
+
+    def al_finalizar(self, programa) -> None:
+        for fh in (self._fh_nodos, self._fh_aristas):
+            if fh is not None:
+                fh.close()
+        self._fh_nodos = self._fh_aristas = None
+        self._nodos = self._aristas = None
+        if self.graphml:
+            try:
+                self.exportar_graphml(self.directorio / 'grafo.graphml')
+            except OSError as e:
+                print(f"⚠️  No se pudo exportar GraphML: {e}")
+        print(f"🕸️  Grafo: {len(self._urls)} nodos, {self.aristas} aristas → {self.directorio}")
+
+    # --- Exportación ---
+
+    def exportar_graphml(self, ruta) -> None:
+        with open(ruta, 'w', encoding='utf-8') as fh:
+            fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            fh.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            fh.write('  <key id="url" for="node" attr.name="url" attr.type="string"/>\n')
+            fh.write('  <graph id="clictoriano" edgedefault="directed">\n')
+            for ident, url in enumerate(self._urls):
+                fh.write(f'    <node id="n{ident}"><data key="url">{escape(url)}</data></node>\n')
+            for origen, lista in enumerate(self._adyacencia):
+                for destino in lista:
+                    fh.write(f'    <edge source="n{origen}" target="n{destino}"/>\n')
+            fh.write('  </graph>\n</graphml>\n')
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Instrumentación de comandos WebDriver.
+
+Envuelve el `command_executor` del driver para registrar, por tipo de comando
+(findElements, getElementAttribute, executeScript, switchToWindow...), el número
+de llamadas, el tiempo total y el p95, atribuidos al método de `ClicToris` que
+los originó. Al terminar imprime una tabla de rutas calientes y, opcionalmente,
+la exporta a JSON. Compartido entre varias sesiones (modo lote o demonio), el
+informe se emite una sola vez, cuando termina la última sesión que siga abierta.
+
+Uso:
+
+    instrumentador = InstrumentadorComandos(ruta_json='comandos.json')
+    programa.observadores.append(instrumentador)
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import sys
+import threading
+import time
+from array import array
+from typing import Optional
+
+from estadisticas import percentil
+
+__all__ = ["InstrumentadorComandos"]
+
+
+class InstrumentadorComandos:
+    """Observador de `ClicToris` que mide cada round-trip al webdriver."""
+
+    def __init__(self, ruta_json: Optional[str] = None, imprimir: bool = True, filas: int = 25):
+        self.ruta_json = ruta_json
+        self.imprimir = imprimir
+        self.filas = filas
+        self._lock = threading.Lock()
+        # (metodo, comando) -> array de duraciones en segundos
+        self._muestras: dict[tuple[str, str], array] = {}
+        self._codigos: dict = {}
+        self._sesiones = 0
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iniciar(self, programa) -> None:
+        with self._lock:
+            self._sesiones += 1
+        # Códigos de los métodos de la clase para atribuir cada comando a su origen
+        self._codigos = {
+            f.__code__: nombre
+            for nombre, f in inspect.getmembers(type(programa), inspect.isfunction)
+        }
+        self.instalar(programa.driver)
+
+    def al_reciclar(self, programa, motivo) -> None:
+        # El navegador nuevo trae su propio command_executor
+        self.instalar(programa.driver)
+
+    def al_finalizar(self, programa) -> None:
+        # Varias sesiones comparten el instrumentador: sólo informa la última en cerrar
+        with self._lock:
+            self._sesiones = max(0, self._sesiones - 1)
+            if self._sesiones:
+                return
+        if self.imprimir:
+            self.imprimir_tabla()
+        if self.ruta_json:
+            try:
+                self.exportar_json(self.ruta_json)
+                print(f"📊 Instrumentación de comandos guardada en: {self.ruta_json}")
+            except OSError as e:
+                print(f"⚠️  No se pudo guardar la instrumentación: {e}")
+
+    # --- Instalación ---
+
+    def instalar(self, driver) -> None:
+        """Envuelve `driver.command_executor.execute` (idempotente)."""
+        ejecutor = driver.command_executor
+        if getattr(ejecutor, '_clictoriano_instrumentado', False):
+            return
+        original = ejecutor.execute
+
+        def execute(command, params):
+            origen = self._origen()
+            inicio = time.perf_counter()
+            try:
+                return original(command, params)
+            finally:
+                self._registrar(origen, command, time.perf_counter() - inicio)
+
+        ejecutor.execute = execute
+        ejecutor._clictoriano_instrumentado = True
+
+    def _origen(self) -> str:
+        """Nombre del método de ClicToris más cercano en la pila de llamadas."""
+        frame = sys._getframe(2)
+        while frame is not None:
+            nombre = self._codigos.get(frame.f_code)
+            if nombre:
+                return nombre
+            frame = frame.f_back
+        return '(externo)'
+
+    def _registrar(self, origen: str, comando: str, segundos: float) -> None:
+        clave = (origen, comando)
+        with self._lock:
+            muestras = self._muestras.get(clave)
+            if muestras is None:
+                muestras = self._muestras[clave] = array('d')
+            muestras.append(segundos)
+
+    # --- Resultados ---
+
+    def total_comandos(self) -> int:
+        with self._lock:
+            return sum(len(m) for m in self._muestras.values())
+
+    def resumen(self) -> list[dict]:
+        """Filas ordenadas por tiempo total descendente."""
+        with self._lock:
+            copia = {clave: list(m) for clave, m in self._muestras.items()}
+        filas = []
+        for (metodo, comando), muestras in copia.items():
+            total = sum(muestras)
+            filas.append({
+                'metodo': metodo,
+                'comando': comando,
+                'llamadas': len(muestras),
+                'total_ms': round(total * 1000, 2),
+                'media_ms': round(total * 1000 / len(muestras), 3),
+                'p95_ms': round(percentil(muestras, 95) * 1000, 3),
+            })
+        filas.sort(key=lambda f: f['total_ms'], reverse=True)
+        return filas
+
+    def imprimir_tabla(self) -> None:
+        filas = self.resumen()
+        if not filas:
+            return
+        columnas = ('metodo', 'comando', 'llamadas', 'total_ms', 'media_ms', 'p95_ms')
+        visibles = filas[:self.filas]
+        anchos = [max(len(c), *(len(str(f[c])) for f in visibles)) for c in columnas]
+        print("\n🔥 Comandos WebDriver (rutas calientes):")
+        print('  '.join(c.ljust(a) for c, a in zip(columnas, anchos)))
+        print('  '.join('-' * a for a in anchos))
+        for f in visibles:
+            print('  '.join(str(f[c]).ljust(a) for c, a in zip(columnas, anchos)))
+        print(f"Total de comandos: {sum(f['llamadas'] for f in filas)}")
+
+    def exportar_json(self, ruta: str) -> None:
+        with open(ruta, 'w', encoding='utf-8') as fh:
+            json.dump({'total_comandos': self.total_comandos(), 'comandos': self.resumen()},
+                      fh, indent=2, ensure_ascii=False)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Modo lote: recorre muchas URLs semilla con una (o varias) sesiones de navegador de larga vida.
+
+Las semillas se leen en streaming de un fichero o de stdin (una URL por línea, se
+ignoran líneas vacías y comentarios `#`) y pasan a los trabajadores por una cola
+acotada, de modo que la memoria usada no depende del tamaño de la lista. Cada
+trabajador mantiene su navegador abierto entre semillas y aplica a cada una su
+propio presupuesto de clics y de tiempo. El resultado de cada semilla se añade a un
+fichero JSONL en cuanto termina.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+__all__ = ["leer_semillas", "EjecutorLote"]
+
+_FIN = object()
+
+
+def leer_semillas(fuente: str) -> Iterator[str]:
+    """Itera las URLs de `fuente` (ruta de fichero o '-' para stdin) sin cargarlas en memoria."""
+    fh = sys.stdin if fuente == '-' else open(fuente, 'r', encoding='utf-8')
+    try:
+        for linea in fh:
+            url = linea.strip()
+            if url and not url.startswith('#'):
+                yield url
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+class EjecutorLote:
+    """Reparte semillas entre `sesiones` navegadores reutilizados."""
+
+    def __init__(self, crear_programa: Callable[[str], object], sesiones: int = 1,
+                 max_clicks: Optional[int] = None, tiempo_max: Optional[float] = None,
+                 ruta_resultados: str = 'resultados_lote.jsonl'):
+        self.crear_programa = crear_programa
+        self.sesiones = max(1, sesiones)
+        self.max_clicks = max_clicks
+        self.tiempo_max = tiempo_max
+        self.ruta_resultados = ruta_resultados
+        self.completadas = 0
+        self.fallidas = 0
+        self._lock = threading.Lock()
+        self._fh = None
+        self._detenido = threading.Event()
+        self._programas: list = []
+
+    def detener(self) -> None:
+        self._detenido.set()
+        with self._lock:
+            for programa in self._programas:
+                programa.detener()
+
+    def ejecutar(self, semillas: Iterable[str]) -> None:
+        cola: queue.Queue = queue.Queue(maxsize=self.sesiones * 2)
+        hilos = [threading.Thread(target=self._trabajador, args=(cola,), name=f'clictoriano-lote-{i}', daemon=True)
+                 for i in range(self.sesiones)]
+        with open(self.ruta_resultados, 'a', encoding='utf-8') as self._fh:
+            for hilo in hilos:
+                hilo.start()
+            try:
+                for url in semillas:
+                    if self._detenido.is_set():
+                        break
+                    if not url.startswith('http'):
+                        self._anotar({'url': url, 'clics': 0, 'visitados': 0, 'duracion_s': 0,
+                                      'error': 'La URL debe comenzar con http:// o https://'})
+                        continue
+                    self._encolar(cola, url, hilos)
+            except KeyboardInterrupt:
+                print("\n⚠️  Lote interrumpido por el usuario")
+                self.detener()
+            finally:
+                for _ in hilos:
+                    self._encolar(cola, _FIN, hilos)
+                for hilo in hilos:
+                    while hilo.is_alive():
+                        try:
+                            hilo.join(0.5)
+                        except KeyboardInterrupt:
+                            self.detener()
+        print(f"\n📋 Lote terminado: {self.completadas} semillas completadas, {self.fallidas} con error "
+              f"→ {self.ruta_resultados}")
+
+    def _encolar(self, cola: queue.Queue, elemento, hilos) -> None:
+        # Bloquear mientras quede algún trabajador vivo que pueda vaciar la cola
+        while any(h.is_alive() for h in hilos):
+            try:
+                cola.put(elemento, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _anotar(self, resultado: dict) -> None:
+        with self._lock:
+            if resultado.get('error'):
+                self.fallidas += 1
+            else:
+                self.completadas += 1
+            self._fh.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+            self._fh.flush()
+
+    def _trabajador(self, cola: queue.Queue) -> None:
+        programa = None
+        try:
+            while True:
+                url = cola.get()
+                if url is _FIN:
+                    break
+                if self._detenido.is_set():
+                    continue
+                if programa is None:
+                    try:
+                        programa = self.crear_programa(url)
+                        iniciado = programa.iniciar_navegador()
+                        error = None if iniciado else 'No se pudo iniciar el navegador'
+                    except Exception as e:
+                        error = f"No se pudo iniciar el navegador: {e.__class__.__name__}: {e}"
+                    if error:
+                        self._anotar({'url': url, 'clics': 0, 'visitados': 0, 'duracion_s': 0, 'error': error})
+                        programa = None
+                        continue
+                    programa._emitir('al_iniciar')
+                    with self._lock:
+                        self._programas.append(programa)
+                programa.cambiar_semilla(url)
+                if self._detenido.is_set():
+                    programa.detener()
+                programa.max_clicks = self.max_clicks
+                programa.limite_tiempo = time.monotonic() + self.tiempo_max if self.tiempo_max else None
+                inicio = time.monotonic()
+                error = None
+                try:
+                    programa.recorrer()
+                except Exception as e:
+                    error = f"{e.__class__.__name__}: {e}"
+                if getattr(programa, '_driver_lost', False) and not error:
+                    error = 'Se perdió la sesión del navegador'
+                self._anotar({
+                    'url': url,
+                    'clics': programa.contador_clics,
+                    'visitados': len(programa.enlaces_visitados),
+                    'duracion_s': round(time.monotonic() - inicio, 3),
+                    'error': error,
+                })
+                # Si la sesión quedó inservible, se arranca otra para la siguiente semilla
+                if getattr(programa, '_driver_lost', False):
+                    self._cerrar(programa)
+                    programa = None
+        finally:
+            if programa is not None:
+                self._cerrar(programa)
+
+    def _cerrar(self, programa) -> None:
+        with self._lock:
+            if programa in self._programas:
+                self._programas.remove(programa)
+        programa.cerrar_navegador()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Métricas en vivo para ejecuciones largas de ClicToriano.
+
+Expone un endpoint HTTP local (opcional) en formato de texto de Prometheus,
+servido desde un hilo en segundo plano del propio proceso:
+
+- páginas visitadas y errores por tipo
+- histograma de latencia de carga de página
+- tamaño de la frontera (enlaces pendientes) y del conjunto de visitados
+- RSS del árbol de procesos del navegador (leído de /proc en Linux)
+- reinicios del navegador por la política de reciclado (ver reciclaje.py)
+
+Uso típico:
+
+    metricas = MetricasClicToris()
+    programa.observadores.append(metricas)
+    servir_metricas(metricas, 9464)
+
+Después basta con `curl http://127.0.0.1:9464/metrics`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+__all__ = ["MetricasClicToris", "servir_metricas", "rss_arbol_procesos", "rss_navegador"]
+
+# Límites (segundos) de los buckets del histograma de latencia
+BUCKETS_LATENCIA = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _hijos_por_padre() -> dict[int, list[int]]:
+    """Construye el mapa ppid -> [pid] a partir de /proc/<pid>/stat."""
+    hijos: dict[int, list[int]] = {}
+    try:
+        entradas = os.listdir('/proc')
+    except OSError:
+        return hijos
+    for nombre in entradas:
+        if not nombre.isdigit():
+            continue
+        try:
+            with open(f'/proc/{nombre}/stat', 'rb') as fh:
+                stat = fh.read()
+        except OSError:
+            continue
+        # El nombre del proceso va entre paréntesis y puede contener espacios
+        cierre = stat.rfind(b')')
+        campos = stat[cierre + 2:].split()
+        if len(campos) < 2:
+            continue
+        hijos.setdefault(int(campos[1]), []).append(int(nombre))
+    return hijos
+
+
+def rss_arbol_procesos(pid: Optional[int], hijos: Optional[dict[int, list[int]]] = None) -> Optional[int]:
+    """Devuelve el RSS total (bytes) de `pid` y todos sus descendientes.
+
+    Lee /proc, por lo que sólo funciona en Linux; en otros sistemas devuelve None.
+    `hijos` permite reutilizar el mapa de `_hijos_por_padre` al medir varios árboles.
+    """
+    if not pid or not os.path.isdir('/proc'):
+        return None
+    if hijos is None:
+        hijos = _hijos_por_padre()
+    pagina = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    pendientes = [pid]
+    vistos = set()
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in vistos:
+            continue
+        vistos.add(actual)
+        try:
+            with open(f'/proc/{actual}/statm', 'rb') as fh:
+                total += int(fh.read().split()[1]) * pagina
+        except (OSError, IndexError, ValueError):
+            continue
+        pendientes.extend(hijos.get(actual, ()))
+    return total if vistos else None
+
+
+def _pid_navegador(programa) -> Optional[int]:
+    """Obtiene el pid del proceso del driver (raíz del árbol del navegador)."""
+    try:
+        return programa.driver.service.process.pid
+    except Exception:
+        return None
+
+
+def rss_navegador(programa) -> Optional[int]:
+    """RSS total (bytes) del navegador de `programa` (driver y procesos hijos), o None."""
+    return rss_arbol_procesos(_pid_navegador(programa))
+
+
+class _Histograma:
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = tuple(buckets)
+        self.cuentas = [0] * len(self.buckets)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.suma += valor
+        self.total += 1
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+
+    def lineas(self, nombre: str) -> list[str]:
+        salida = []
+        acumulado = 0
+        for limite, cuenta in zip(self.buckets, self.cuentas):
+            acumulado += cuenta
+            salida.append(f'{nombre}_bucket{{le="{limite}"}} {acumulado}')
+        salida.append(f'{nombre}_bucket{{le="+Inf"}} {self.total}')
+        salida.append(f'{nombre}_sum {self.suma:.6f}')
+        salida.append(f'{nombre}_count {self.total}')
+        return salida
+
+
+class MetricasClicToris:
+    """Observador de `ClicToris` que acumula contadores y los expone como Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.paginas_visitadas = 0
+        self.errores: dict[str, int] = {}
+        self.latencia_carga = _Histograma()
+        self.frontera = 0
+        self.visitados = 0
+        self.reciclados = 0
+        # id(programa) -> pid del driver; en modo lote o demonio hay una sesión por navegador
+        self._pids: dict[int, int] = {}
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iniciar(self, programa) -> None:
+        self._anotar_pid(programa)
+
+    def al_navegar(self, programa, url, segundos, error) -> None:
+        with self._lock:
+            if error is None:
+                self.paginas_visitadas += 1
+            self.latencia_carga.observar(segundos)
+
+    def al_error(self, programa, error) -> None:
+        tipo = error.__class__.__name__
+        with self._lock:
+            self.errores[tipo] = self.errores.get(tipo, 0) + 1
+
+    def al_frontera(self, programa, pendientes, visitados) -> None:
+        with self._lock:
+            self.frontera = pendientes
+            self.visitados = visitados
+
+    def al_reciclar(self, programa, motivo) -> None:
+        with self._lock:
+            self.reciclados += 1
+        self._anotar_pid(programa)
+
+    def al_finalizar(self, programa) -> None:
+        with self._lock:
+            self._pids.pop(id(programa), None)
+
+    def _anotar_pid(self, programa) -> None:
+        pid = _pid_navegador(programa)
+        with self._lock:
+            if pid:
+                self._pids[id(programa)] = pid
+            else:
+                self._pids.pop(id(programa), None)
+
+    # --- Exposición ---
+
+    def exportar(self) -> str:
+        """Devuelve el estado actual en formato de texto de Prometheus."""
+        with self._lock:
+            lineas = [
+                '# HELP clictoriano_pages_visited_total Páginas cargadas correctamente.',
+                '# TYPE clictoriano_pages_visited_total counter',
+                f'clictoriano_pages_visited_total {self.paginas_visitadas}',
+                '# HELP clictoriano_errors_total Errores durante la navegación, por tipo.',
+                '# TYPE clictoriano_errors_total counter',
+            ]
+            for tipo, cuenta in sorted(self.errores.items()):
+                lineas.append(f'clictoriano_errors_total{{type="{tipo}"}} {cuenta}')
+            lineas += [
+                '# HELP clictoriano_page_load_seconds Latencia de carga de página.',
+                '# TYPE clictoriano_page_load_seconds histogram',
+            ]
+            lineas += self.latencia_carga.lineas('clictoriano_page_load_seconds')
+            lineas += [
+                '# HELP clictoriano_frontier_size Enlaces pendientes en la página actual.',
+                '# TYPE clictoriano_frontier_size gauge',
+                f'clictoriano_frontier_size {self.frontera}',
+                '# HELP clictoriano_visited_set_size Enlaces en el conjunto de visitados.',
+                '# TYPE clictoriano_visited_set_size gauge',
+                f'clictoriano_visited_set_size {self.visitados}',
+                '# HELP clictoriano_browser_recycles_total Reinicios del navegador por la política de reciclado.',
+                '# TYPE clictoriano_browser_recycles_total counter',
+                f'clictoriano_browser_recycles_total {self.reciclados}',
+            ]
+            pids = list(self._pids.values())
+        rss = None
+        if pids:
+            hijos = _hijos_por_padre()
+            medidas = [m for m in (rss_arbol_procesos(pid, hijos) for pid in pids) if m is not None]
+            rss = sum(medidas) if medidas else None
+        if rss is not None:
+            lineas += [
+                '# HELP clictoriano_browser_rss_bytes RSS de los árboles de procesos de los navegadores (suma de las sesiones).',
+                '# TYPE clictoriano_browser_rss_bytes gauge',
+                f'clictoriano_browser_rss_bytes {rss}',
+            ]
+        return '\n'.join(lineas) + '\n'
+
+
+def servir_metricas(metricas: MetricasClicToris, puerto: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Arranca el endpoint `/metrics` en un hilo daemon y devuelve el servidor.
+
+    Para detenerlo basta con llamar a `servidor.shutdown()`.
+    """
+
+    class _Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            cuerpo = metricas.exportar().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, format, *args):
+            # No mezclar las peticiones del scraper con el log del programa
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    servidor.daemon_threads = True
+    hilo = threading.Thread(target=servidor.serve_forever, name='clictoriano-metricas', daemon=True)
+    hilo.start()
+    return servidor
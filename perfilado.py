@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Perfilado opcional de `ClicToris.ejecutar`.
+
+Combina dos fuentes por cada fase perfilada:
+- cProfile, volcado en formato pstats (`.pstats`), para `python -m pstats` o snakeviz.
+- Un muestreador de pila en un hilo aparte, volcado en formato de pilas colapsadas
+  (`.collapsed`), listo para flamegraph.pl o speedscope.
+
+Si se indica `iteraciones=N`, el arranque (inicio del navegador y carga inicial) y
+las N primeras iteraciones del bucle principal se perfilan en ficheros separados,
+de modo que el coste de arranque y el coste estable se ven por separado.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+__all__ = ["PerfiladorEjecucion"]
+
+
+class _Muestreador:
+    """Muestrea periódicamente la pila de un hilo y acumula pilas colapsadas."""
+
+    def __init__(self, id_hilo: int, intervalo: float):
+        self.id_hilo = id_hilo
+        self.intervalo = intervalo
+        self.pilas: dict[str, int] = {}
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name='clictoriano-muestreo', daemon=True)
+
+    def iniciar(self) -> None:
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._parar.set()
+        self._hilo.join()
+
+    def _bucle(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.id_hilo)
+            if frame is None:
+                continue
+            marcos = []
+            while frame is not None:
+                codigo = frame.f_code
+                marcos.append(f"{Path(codigo.co_filename).stem}:{codigo.co_name}")
+                frame = frame.f_back
+            clave = ';'.join(reversed(marcos))
+            self.pilas[clave] = self.pilas.get(clave, 0) + 1
+
+
+class PerfiladorEjecucion:
+    """Perfila una ejecución de `ClicToris` y vuelca pstats y pilas colapsadas por fase."""
+
+    def __init__(self, directorio: str = 'perfiles', iteraciones: Optional[int] = None,
+                 intervalo_muestreo: float = 0.005):
+        self.directorio = Path(directorio).expanduser()
+        self.iteraciones = iteraciones
+        self.intervalo_muestreo = intervalo_muestreo
+        self.prefijo = time.strftime('perfil-%Y%m%d-%H%M%S')
+        self.ficheros: list[Path] = []
+        self._fase = None
+        self._perfil = None
+        self._muestreador = None
+
+    def ejecutar(self, programa, funcion: Optional[Callable[[], object]] = None):
+        """Ejecuta `funcion` (por defecto `programa.ejecutar`) bajo el perfilador."""
+        programa.observadores.append(self)
+        self._iniciar_fase('arranque' if self.iteraciones else 'ejecucion')
+        try:
+            return (funcion or programa.ejecutar)()
+        finally:
+            self._terminar_fase()
+            try:
+                programa.observadores.remove(self)
+            except ValueError:
+                pass
+            if self.ficheros:
+                print("\n⏱️  Perfiles guardados:")
+                for ruta in self.ficheros:
+                    print(f"    {ruta}")
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iteracion(self, programa, numero) -> None:
+        if not self.iteraciones:
+            return
+        if numero == 1 and self._fase == 'arranque':
+            self._terminar_fase()
+            self._iniciar_fase('bucle')
+        elif numero == self.iteraciones + 1 and self._fase == 'bucle':
+            self._terminar_fase()
+
+    # --- Fases ---
+
+    def _iniciar_fase(self, nombre: str) -> None:
+        self._fase = nombre
+        self._muestreador = _Muestreador(threading.get_ident(), self.intervalo_muestreo)
+        self._muestreador.iniciar()
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+
+    def _terminar_fase(self) -> None:
+        if self._perfil is None:
+            return
+        self._perfil.disable()
+        self._muestreador.detener()
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            base = self.directorio / f"{self.prefijo}-{self._fase}"
+            ruta_pstats = base.with_suffix('.pstats')
+            self._perfil.dump_stats(str(ruta_pstats))
+            ruta_pilas = base.with_suffix('.collapsed')
+            with open(ruta_pilas, 'w', encoding='utf-8') as fh:
+                for pila, cuenta in sorted(self._muestreador.pilas.items()):
+                    fh.write(f"{pila} {cuenta}\n")
+            self.ficheros += [ruta_pstats, ruta_pilas]
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar el perfil en {self.directorio}: {e}")
+        self._perfil = None
+        self._muestreador = None
+        self._fase = None
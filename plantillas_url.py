@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Agrupación de URLs en plantillas de ruta/consulta.
+
+Dos URLs que sólo difieren en identificadores numéricos, hashes o en los valores de
+los parámetros de consulta comparten plantilla, p.ej.:
+
+    https://ej.com/productos/123?orden=precio&pagina=2
+    https://ej.com/productos/987?pagina=5&orden=nombre
+        → https://ej.com/productos/{n}?orden&pagina
+"""
+
+import re
+from urllib.parse import parse_qsl, urlsplit
+
+__all__ = ["plantilla_url"]
+
+_NUMERO = re.compile(r'^\d+$')
+_FECHA = re.compile(r'^\d{4}-\d{1,2}(-\d{1,2})?$')
+_IDENTIFICADOR = re.compile(r'^(?=.*\d)[0-9a-fA-F-]{8,}$')
+
+
+def _segmento(segmento: str) -> str:
+    if _NUMERO.match(segmento):
+        return '{n}'
+    if _FECHA.match(segmento):
+        return '{fecha}'
+    if _IDENTIFICADOR.match(segmento):
+        return '{id}'
+    return segmento
+
+
+def plantilla_url(url: str) -> str:
+    """Devuelve la plantilla de `url`: segmentos variables normalizados y sólo las claves de la consulta."""
+    partes = urlsplit(url)
+    ruta = '/'.join(_segmento(s) for s in partes.path.split('/'))
+    claves = sorted({k for k, _ in parse_qsl(partes.query, keep_blank_values=True)})
+    plantilla = f"{partes.scheme}://{partes.netloc.lower()}{ruta}"
+    if claves:
+        plantilla += '?' + '&'.join(claves)
+    return plantilla
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Reciclado automático del navegador en ejecuciones largas.
+
+La memoria de Chrome crece sin parar cuando una misma instancia navega durante horas.
+`PoliticaReciclaje` decide cuándo conviene reiniciar el driver:
+
+- tras `max_paginas` navegaciones,
+- cuando el navegador supera `max_edad` segundos de vida, o
+- cuando el RSS del árbol de procesos del navegador (leído de /proc, sólo Linux)
+  supera `max_rss` bytes.
+
+`ClicToris` consulta la política entre pasos y, si procede, cierra el navegador y abre
+uno nuevo. Emite `al_reciclar(motivo)` para que los observadores que guardan el driver
+lo actualicen y vuelve a la página en la que estaba como cualquier otra navegación
+(`al_navegar`, comprobación de enlaces y espera de enlaces dinámicos). El conjunto de
+visitados, los contadores y la frontera (los enlaces de la página actual) se conservan.
+
+Uso:
+
+    programa.reciclaje = PoliticaReciclaje(max_paginas=500, max_rss=1500 * 1024 * 1024)
+    programa.observadores.append(programa.reciclaje)
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from metricas import rss_navegador
+
+__all__ = ["PoliticaReciclaje"]
+
+
+class PoliticaReciclaje:
+    """Observador de `ClicToris` que indica cuándo reiniciar el navegador."""
+
+    def __init__(self, max_paginas: Optional[int] = None, max_edad: Optional[float] = None,
+                 max_rss: Optional[int] = None, intervalo_rss: float = 15.0):
+        self.max_paginas = max_paginas
+        self.max_edad = max_edad
+        self.max_rss = max_rss
+        # Leer /proc entero en cada paso sería caro: el RSS se mide como mucho cada N segundos
+        self.intervalo_rss = intervalo_rss
+        self.reciclados = 0
+        self._reiniciar_contadores()
+
+    def _reiniciar_contadores(self) -> None:
+        self.paginas = 0
+        self.inicio = time.monotonic()
+        self._ultima_medida_rss = 0.0
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_iniciar(self, programa) -> None:
+        self._reiniciar_contadores()
+
+    def al_navegar(self, programa, url, segundos, error) -> None:
+        self.paginas += 1
+
+    def al_reciclar(self, programa, motivo) -> None:
+        self.reciclados += 1
+        self._reiniciar_contadores()
+
+    # --- Decisión ---
+
+    def motivo(self, programa) -> Optional[str]:
+        """Devuelve por qué hay que reciclar el navegador ahora, o None."""
+        if self.max_paginas and self.paginas >= self.max_paginas:
+            return f"{self.paginas} páginas servidas"
+        edad = time.monotonic() - self.inicio
+        if self.max_edad and edad >= self.max_edad:
+            return f"{edad / 60:.1f} min de antigüedad"
+        if self.max_rss and time.monotonic() - self._ultima_medida_rss >= self.intervalo_rss:
+            self._ultima_medida_rss = time.monotonic()
+            rss = rss_navegador(programa)
+            if rss is not None and rss >= self.max_rss:
+                return f"RSS {rss / (1024 * 1024):.0f} MB"
+        return None
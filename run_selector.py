@@ -6,7 +6,8 @@ según el sistema operativo.
 - En Windows puedes elegir entre el archivo batch CLI y el archivo batch GUI 
 
 El script detecta el SO mediante `platform.system()` y muestra un menú numerado sencillo del todo.
-El script seleccionado se ejecuta con subprocess.run.
+El modo elegido se ejecuta en este mismo proceso (sin arrancar otro intérprete) si sus
+dependencias están instaladas; si no, o con `--subprocess`, se lanza el script con subprocess.run.
 """
 
 import os
@@ -15,10 +16,37 @@ import subprocess
 import sys
 import argparse
 import shutil
-try:
-    from webdrivers import ensure_webdriver
-except Exception:
-    ensure_webdriver = None
+from importlib.util import find_spec
+
+
+def _cargar_ensure_webdriver():
+    """Importa `webdrivers.ensure_webdriver` sólo cuando hace falta (None si no está disponible)."""
+    try:
+        from webdrivers import ensure_webdriver
+    except Exception:
+        return None
+    return ensure_webdriver
+
+
+def _ejecutar_en_proceso(nombre_script, argumentos):
+    """Ejecuta el CLI o la GUI en este intérprete.
+
+    Devuelve False (sin ejecutar nada) si faltan sus dependencias, para recurrir al script.
+    """
+    es_gui = 'gui' in nombre_script
+    dependencia = 'customtkinter' if es_gui else 'selenium'
+    if find_spec(dependencia) is None:
+        return False
+    if es_gui:
+        # Igual que click_enlaces_gui.sh: geckodriver suele instalarse en ~/.local/bin
+        local_bin = os.path.join(os.path.expanduser('~'), '.local', 'bin')
+        os.environ['PATH'] = local_bin + os.pathsep + os.environ.get('PATH', '')
+        import click_enlaces_gui as modulo
+    else:
+        import click_enlaces as modulo
+    sys.argv = [modulo.__file__] + list(argumentos)
+    modulo.main()
+    return True
 
 
 def obtener_scripts():
@@ -78,135 +106,58 @@ def get_chrome_version():
         if which:
             candidates.insert(0, which)
 
+    from descubrimiento import version_binario
     for cmd in candidates:
         if not cmd:
             continue
-        try:
-            out = subprocess.check_output([cmd, '--version'], universal_newlines=True, stderr=subprocess.DEVNULL)
-            # Ejemplo: 'Google Chrome 142.0.7444.175\n' o 'Chromium 142.0.7444.175'
-            ver = out.strip().split()[-1]
+        # Ejemplo: 'Google Chrome 142.0.7444.175' o 'Chromium 142.0.7444.175' (cacheado por mtime)
+        ver = version_binario(cmd)
+        if ver:
             return ver
-        except Exception:
-            continue
     return None
 
 def get_chromedriver_version(path):
-    try:
-        out = subprocess.check_output([path, "--version"], universal_newlines=True)
-        # Ejemplo: 'ChromeDriver 142.0.7444.175 (....)'
-        parts = out.strip().split()
-        if len(parts) >= 2:
-            return parts[1]
-        return None
-    except Exception:
-        return None
+    # Ejemplo: 'ChromeDriver 142.0.7444.175 (....)' (cacheado por mtime)
+    from descubrimiento import version_binario
+    return version_binario(path)
 
 def ensure_chromedriver():
-    """Asegura que exista un ChromeDriver compatible.
-
-    - En Linux coloca el binario en `/usr/local/bin/chromedriver` (requiere sudo si no hay permisos).
-    - En Windows descarga `chromedriver.exe` y lo coloca en una carpeta de usuario sin elevación, y añade esa carpeta a `PATH` para este proceso.
+    """Asegura que exista un ChromeDriver compatible con el Chrome instalado.
+
+    Delega en `webdrivers.ensure_webdriver`, el instalador único: descarga con bloqueo
+    entre procesos (varios arranques simultáneos hacen una sola descarga), caché local
+    e instalación atómica. Si el chromedriver que se usaría (el recordado de la
+    ejecución anterior o el del PATH) no coincide con la versión "major" de Chrome
+    se fuerza la reinstalación. La carpeta del driver se añade a `PATH` para este
+    proceso.
     """
-    import shutil
-    import tempfile
-    import zipfile
-    import urllib.request
+    ensure_webdriver = _cargar_ensure_webdriver()
+    if ensure_webdriver is None:
+        print("No hay instalador disponible (módulo webdrivers no cargado). Saltando verificación de ChromeDriver.")
+        return None
 
-    sistema = platform.system()
     chrome_version = get_chrome_version()
     if not chrome_version:
         print("No se pudo detectar la versión de Google Chrome. Saltando verificación de ChromeDriver.")
-        return
-
-    if sistema == 'Windows':
-        # Carpeta de usuario donde colocar chromedriver.exe sin necesitar elevación
-        local_appdata = os.getenv('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
-        dest_dir = os.path.join(local_appdata, 'chromedriver')
-        os.makedirs(dest_dir, exist_ok=True)
-        chromedriver_path = os.path.join(dest_dir, 'chromedriver.exe')
-        cd_version = get_chromedriver_version(chromedriver_path) if os.path.exists(chromedriver_path) else None
-        if cd_version == chrome_version:
-            # Asegurar que el directorio está en PATH para este proceso
-            os.environ['PATH'] = dest_dir + os.pathsep + os.environ.get('PATH', '')
-            return
-
-        print(f"Descargando ChromeDriver {chrome_version} para Windows (sin elevación)...")
-        url = f"https://storage.googleapis.com/chrome-for-testing-public/{chrome_version}/win64/chromedriver-win64.zip"
-        with tempfile.TemporaryDirectory() as tmpdir:
-            zip_path = os.path.join(tmpdir, 'chromedriver.zip')
-            try:
-                urllib.request.urlretrieve(url, zip_path)
-            except Exception as e:
-                print(f"Error descargando ChromeDriver: {e}")
-                return
-            try:
-                with zipfile.ZipFile(zip_path) as z:
-                    z.extractall(tmpdir)
-            except Exception as e:
-                print(f"Error extrayendo ChromeDriver: {e}")
-                return
-            # Dentro de la ZIP suele haber una carpeta chromedriver-win64\chromedriver.exe
-            candidate = None
-            for root, dirs, files in os.walk(tmpdir):
-                if 'chromedriver.exe' in files:
-                    candidate = os.path.join(root, 'chromedriver.exe')
-                    break
-            if not candidate:
-                print("No se encontró chromedriver.exe en el zip descargado")
-                return
-            try:
-                shutil.move(candidate, chromedriver_path)
-            except Exception:
-                try:
-                    # Intentar copiar si move falla
-                    shutil.copy(candidate, chromedriver_path)
-                except Exception as e:
-                    print(f"Error al mover/copy chromedriver.exe: {e}")
-                    return
-        # Añadir al PATH de este proceso
-        os.environ['PATH'] = dest_dir + os.pathsep + os.environ.get('PATH', '')
-        print(f"✓ ChromeDriver {chrome_version} instalado en {chromedriver_path} (usuario)")
-        return
-
-    # Linux / macOS fallback
-    chromedriver_path = '/usr/local/bin/chromedriver'
-    cd_version = get_chromedriver_version(chromedriver_path) if os.path.exists(chromedriver_path) else None
-    if cd_version == chrome_version:
-        return
+        return None
 
-    print(f"Descargando ChromeDriver {chrome_version} para Linux/macOS...")
-    url = f"https://storage.googleapis.com/chrome-for-testing-public/{chrome_version}/linux64/chromedriver-linux64.zip"
-    with tempfile.TemporaryDirectory() as tmpdir:
-        zip_path = os.path.join(tmpdir, 'chromedriver.zip')
-        try:
-            urllib.request.urlretrieve(url, zip_path)
-            with zipfile.ZipFile(zip_path) as z:
-                z.extractall(tmpdir)
-        except Exception as e:
-            print(f"Error descargando o extrayendo ChromeDriver: {e}")
-            return
-        src = os.path.join(tmpdir, 'chromedriver-linux64', 'chromedriver')
-        if not os.path.exists(src):
-            # intentar buscar binario en el TMP
-            found = None
-            for root, dirs, files in os.walk(tmpdir):
-                if 'chromedriver' in files:
-                    found = os.path.join(root, 'chromedriver')
-                    break
-            if found:
-                src = found
-        try:
-            try:
-                shutil.move(src, chromedriver_path)
-                os.chmod(chromedriver_path, 0o755)
-            except PermissionError:
-                print("Permiso denegado para mover ChromeDriver. Intentando con sudo...")
-                subprocess.run(["sudo", "cp", src, chromedriver_path], check=True)
-                subprocess.run(["sudo", "chmod", "+x", chromedriver_path], check=True)
-        except Exception as e:
-            print(f"Error instalando ChromeDriver: {e}")
-            return
-    print(f"✓ ChromeDriver {chrome_version} instalado en {chromedriver_path}")
+    # Comprobar el driver que ensure_webdriver devolvería: el recordado de la ejecución
+    # anterior (que no tiene por qué estar en PATH) o, si no hay, el del PATH
+    from descubrimiento import resuelto
+    actual = resuelto('chromedriver') or shutil.which('chromedriver')
+    cd_version = get_chromedriver_version(actual) if actual else None
+    forzar = bool(actual) and (cd_version or '').split('.')[0] != chrome_version.split('.')[0]
+    try:
+        ruta = ensure_webdriver('chrome', quiet=True, force_install=forzar)
+    except Exception as e:
+        print(f"Error instalando ChromeDriver: {e}")
+        return None
+    carpeta = os.path.dirname(ruta)
+    if carpeta not in os.environ.get('PATH', '').split(os.pathsep):
+        os.environ['PATH'] = carpeta + os.pathsep + os.environ.get('PATH', '')
+    if ruta != actual:
+        print(f"✓ ChromeDriver {get_chromedriver_version(ruta) or ''} instalado en {ruta}")
+    return ruta
 
 
 def warn_windows_chromedriver_missing():
@@ -219,7 +170,9 @@ def warn_windows_chromedriver_missing():
     # Comprobar carpeta de usuario donde el lanzador suele instalarlo
     local_appdata = os.getenv('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
     user_cd = os.path.join(local_appdata, 'chromedriver', 'chromedriver.exe')
-    if in_path or os.path.exists(user_cd):
+    # El instalador (webdrivers.ensure_webdriver) usa %LOCALAPPDATA%\\webdrivers
+    instalado = os.path.join(local_appdata, 'webdrivers', 'chromedriver.exe')
+    if in_path or os.path.exists(user_cd) or os.path.exists(instalado):
         return
 
     # Mensaje conciso y útil para usuarios menos técnicos
@@ -257,6 +210,7 @@ def main():
     parser.add_argument('--install-chromedriver', action='store_true', help='Intentar descargar e instalar ChromeDriver (compatibilidad)')
     parser.add_argument('--install-webdriver', action='store_true', help='Intentar descargar e instalar el webdriver adecuado (chrome|firefox)')
     parser.add_argument('--browser', choices=['chrome', 'chromium', 'firefox'], help='Navegador a usar para el script (chrome|chromium|firefox)')
+    parser.add_argument('--subprocess', action='store_true', help='Lanzar el script .sh/.bat en un proceso aparte en lugar de ejecutarlo en este proceso')
     args = parser.parse_args()
 
     scripts = obtener_scripts()
@@ -265,6 +219,7 @@ def main():
     if args.install_chromedriver or args.install_webdriver:
         target_browser = args.browser or 'chrome'
         print(f'Intentando descargar/instalar webdriver para: {target_browser}...')
+        ensure_webdriver = _cargar_ensure_webdriver()
         if ensure_webdriver:
             try:
                 path = ensure_webdriver(target_browser)
@@ -296,22 +251,8 @@ def main():
                 print(f'Error instalando webdriver: {e}')
                 sys.exit(1)
         else:
-            # Fallback a la implementación local (ensure_chromedriver) si existe
-            if args.install_chromedriver:
-                if platform.system() != 'Windows':
-                    print('La opción --install-chromedriver está pensada para Windows. No se realizará ninguna acción en este SO.')
-                    sys.exit(0)
-                print('Intentando descargar/instalar ChromeDriver para Windows (fallback)...')
-                ensure_chromedriver()
-                if shutil.which('chromedriver') or os.path.exists(os.path.join(os.getenv('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local'), 'chromedriver', 'chromedriver.exe')):
-                    print('ChromeDriver detectado correctamente tras la instalación (fallback).')
-                    sys.exit(0)
-                else:
-                    print('No se pudo instalar ChromeDriver automáticamente (fallback).')
-                    sys.exit(1)
-            else:
-                print('No hay instalador disponible en este entorno (module webdrivers no cargado).')
-                sys.exit(1)
+            print('No hay instalador disponible en este entorno (module webdrivers no cargado).')
+            sys.exit(1)
 
     # Modo no interactivo: elegir por flags
     if args.cli or args.gui:
@@ -358,12 +299,13 @@ def main():
 
     # En Linux, antes de ejecutar el CLI, aseguramos el webdriver correspondiente
     if platform.system() != "Windows" and nombre_script == "click_enlaces.sh":
-        # Usar ensure_webdriver si está disponible, sino fallback a ensure_chromedriver
-        if ensure_webdriver:
-            try:
-                ensure_webdriver(args.browser or 'chrome')
-            except Exception as e:
-                print(f"Advertencia: no fue posible ejecutar ensure_webdriver: {e}")
+        if (args.browser or 'chrome') == 'firefox':
+            ensure_webdriver = _cargar_ensure_webdriver()
+            if ensure_webdriver:
+                try:
+                    ensure_webdriver('firefox')
+                except Exception as e:
+                    print(f"Advertencia: no fue posible ejecutar ensure_webdriver: {e}")
         else:
             ensure_chromedriver()
         os.chmod(ruta_script, 0o755)
@@ -394,14 +336,16 @@ def main():
                 print("No se proporcionó URL. Cancelando.")
                 sys.exit(1)
             # Pasar la URL como argumento al script (y opcionalmente --link-wait)
-            cmd = [ruta_script, url]
+            argumentos = [url]
             if args.link_wait is not None:
-                cmd += ['--link-wait', str(args.link_wait)]
+                argumentos += ['--link-wait', str(args.link_wait)]
             if args.browser:
-                cmd += ['--browser', args.browser]
-            subprocess.run(cmd, check=True)
+                argumentos += ['--browser', args.browser]
         else:
-            subprocess.run([ruta_script], check=True)
+            argumentos = []
+        if not args.subprocess and _ejecutar_en_proceso(nombre_script, argumentos):
+            return
+        subprocess.run([ruta_script] + argumentos, check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error al ejecutar el script: {e}")
         sys.exit(e.returncode)
@@ -0,0 +1,100 @@
+"""
+Fixtures comunes de las pruebas: un servidor HTTP local que hace de CDN de webdrivers.
+
+`servidor.publicar(ruta, cuerpo, ...)` sirve `cuerpo` en `ruta` con ETag, soporte opcional
+de `Range` y cortes de conexión simulados; `servidor.peticiones` guarda (ruta, cabeceras)
+de cada petición recibida.
+"""
+
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Los módulos de ClicToriano viven en la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        servidor = self.server.fixture
+        servidor.peticiones.append((self.path, dict(self.headers)))
+        recurso = servidor.rutas.get(self.path)
+        if recurso is None:
+            self._responder(404, b'')
+            return
+        cuerpo = recurso['cuerpo']
+        etag = '"%s"' % hashlib.sha256(cuerpo).hexdigest()[:16]
+        if self.headers.get('If-None-Match') == etag:
+            self._responder(304, b'', {'ETag': etag})
+            return
+        inicio = 0
+        rango = self.headers.get('Range')
+        if rango and recurso['range'] and rango.startswith('bytes='):
+            inicio = int(rango[len('bytes='):].split('-')[0])
+        parcial = bool(inicio)
+        if parcial and inicio >= len(cuerpo):
+            self._responder(416, b'', {'Content-Range': f'bytes */{len(cuerpo)}'})
+            return
+        trozo = cuerpo[inicio:]
+        cabeceras = {'ETag': etag, 'Content-Type': recurso['tipo']}
+        if parcial:
+            cabeceras['Content-Range'] = f'bytes {inicio}-{len(cuerpo) - 1}/{len(cuerpo)}'
+        if recurso['cortes'] > 0:
+            # Anunciar el cuerpo completo y cerrar la conexión a mitad
+            recurso['cortes'] -= 1
+            self._responder(206 if parcial else 200, trozo, cabeceras, enviar=len(trozo) // 2)
+            self.close_connection = True
+            return
+        self._responder(206 if parcial else 200, trozo, cabeceras)
+
+    def _responder(self, estado, cuerpo, cabeceras=None, enviar=None):
+        self.send_response(estado)
+        for clave, valor in (cabeceras or {}).items():
+            self.send_header(clave, valor)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo if enviar is None else cuerpo[:enviar])
+        self.wfile.flush()
+
+
+class ServidorPruebas:
+    """Servidor HTTP en un hilo con recursos publicados en memoria."""
+
+    def __init__(self):
+        self.rutas = {}
+        self.peticiones = []
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Manejador)
+        self._httpd.daemon_threads = True
+        self._httpd.fixture = self
+        self.url = f'http://127.0.0.1:{self._httpd.server_address[1]}'
+        self._hilo = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._hilo.start()
+
+    def publicar(self, ruta, cuerpo, tipo='application/octet-stream', range=True, cortes=0):
+        """Sirve `cuerpo` en `ruta`; las `cortes` primeras respuestas se cortan a la mitad."""
+        self.rutas[ruta] = {'cuerpo': cuerpo, 'tipo': tipo, 'range': range, 'cortes': cortes}
+        return self.url + ruta
+
+    def cabeceras(self, ruta):
+        """Cabeceras de cada petición recibida en `ruta`, en orden."""
+        return [cabeceras for camino, cabeceras in self.peticiones if camino == ruta]
+
+    def cerrar(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorPruebas()
+    yield servidor
+    servidor.cerrar()
@@ -0,0 +1,200 @@
+"""
+Pruebas de `webdrivers` contra un servidor HTTP local (ver `conftest.py`).
+
+`CLICTORIANO_CFT_URL` se lee al importar el módulo, así que las pruebas apuntan
+`webdrivers.CFT_BASE_URL` y `webdrivers.CACHE_DIR` al servidor y a un directorio temporal.
+"""
+
+import hashlib
+import io
+import json
+import os
+import platform
+import zipfile
+
+import pytest
+
+import descubrimiento
+import webdrivers
+
+MANIFIESTO = '/latest-versions-per-milestone-with-downloads.json'
+
+
+def _manifiesto(servidor):
+    """Manifiesto de Chrome for Testing reducido a dos milestones."""
+    def descargas(version):
+        return {'chromedriver': [
+            {'platform': 'win64', 'url': f'{servidor.url}/{version}/win64/chromedriver-win64.zip'},
+            {'platform': 'linux64', 'url': f'{servidor.url}/{version}/linux64/chromedriver-linux64.zip'},
+        ]}
+    return {'timestamp': '2026-10-01T00:00:00.000Z', 'milestones': {
+        '129': {'milestone': '129', 'version': '129.0.6668.100', 'downloads': descargas('129.0.6668.100')},
+        '130': {'milestone': '130', 'version': '130.0.6723.91', 'downloads': descargas('130.0.6723.91')},
+    }}
+
+
+def _zip_cft(binario):
+    """Zip con la estructura de Chrome for Testing: el driver va dentro de una carpeta."""
+    datos = io.BytesIO()
+    with zipfile.ZipFile(datos, 'w') as z:
+        z.writestr('chromedriver-linux64/LICENSE.chromedriver', 'licencia')
+        info = zipfile.ZipInfo('chromedriver-linux64/chromedriver')
+        info.external_attr = 0o755 << 16
+        z.writestr(info, binario)
+    return datos.getvalue()
+
+
+@pytest.fixture
+def cft(servidor, tmp_path, monkeypatch):
+    """Publica el manifiesto y aísla las cachés de webdrivers y descubrimiento."""
+    servidor.publicar(MANIFIESTO, json.dumps(_manifiesto(servidor)).encode(), tipo='application/json')
+    monkeypatch.setattr(webdrivers, 'CFT_BASE_URL', servidor.url)
+    monkeypatch.setattr(webdrivers, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(webdrivers, '_cft_platform', lambda: 'linux64')
+    monkeypatch.setattr(descubrimiento, 'RUTA_CACHE', tmp_path / 'descubrimiento.json')
+    monkeypatch.setattr(descubrimiento, '_datos', None)
+    return servidor
+
+
+# --- Manifiestos de Chrome for Testing ----------------------------------------------
+
+def test_manifiesto_se_reutiliza_dentro_del_ttl(cft):
+    assert webdrivers.chrome_for_testing_driver('130.0.6723.58')[0] == '130.0.6723.91'
+    assert webdrivers.chrome_for_testing_driver('129.0.6668.58')[0] == '129.0.6668.100'
+    assert len(cft.cabeceras(MANIFIESTO)) == 1
+
+
+def test_manifiesto_caducado_se_revalida_con_etag(cft, monkeypatch):
+    monkeypatch.setattr(webdrivers, 'METADATA_TTL', 0)
+    primera = webdrivers.chrome_for_testing_driver('130')
+    segunda = webdrivers.chrome_for_testing_driver('130')
+    peticiones = cft.cabeceras(MANIFIESTO)
+    assert len(peticiones) == 2
+    assert 'If-None-Match' not in peticiones[0]
+    assert peticiones[1]['If-None-Match']
+    # El servidor respondió 304: se usa la copia local
+    assert primera == segunda
+
+
+def test_manifiesto_caducado_se_usa_sin_red(cft, monkeypatch):
+    esperado = webdrivers.chrome_for_testing_driver('129')
+    cft.cerrar()
+    monkeypatch.setattr(webdrivers, 'METADATA_TTL', 0)
+    assert webdrivers.chrome_for_testing_driver('129') == esperado
+
+
+def test_milestone_de_chrome(cft):
+    version, url = webdrivers.chrome_for_testing_driver('129.0.6668.58')
+    assert url == f'{cft.url}/129.0.6668.100/linux64/chromedriver-linux64.zip'
+    # Sin versión de Chrome: el milestone más reciente
+    assert webdrivers.chrome_for_testing_driver(None)[0] == '130.0.6723.91'
+    # Chrome < 115 no está en el manifiesto
+    assert webdrivers.chrome_for_testing_driver('114.0.5735.90') is None
+
+
+def test_sin_red_ni_cache_devuelve_none(cft):
+    cft.cerrar()
+    assert webdrivers.chrome_for_testing_driver('130') is None
+
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason='instala chromedriver sin extensión .exe')
+def test_instalacion_cft_extrae_el_binario_anidado(cft, tmp_path, monkeypatch):
+    binario = b'#!/bin/sh\necho "ChromeDriver 130.0.6723.91"\n'
+    cft.publicar('/130.0.6723.91/linux64/chromedriver-linux64.zip', _zip_cft(binario))
+    monkeypatch.setattr(webdrivers, '_get_chrome_binary_candidates', lambda: [])
+
+    ruta = webdrivers.ensure_webdriver('chrome', install_dir=str(tmp_path / 'bin'), quiet=True, force_install=True)
+
+    assert ruta == str(tmp_path / 'bin' / 'chromedriver')
+    with open(ruta, 'rb') as fh:
+        assert fh.read() == binario
+    assert os.access(ruta, os.X_OK)
+    assert webdrivers.resolve_cached_driver('chromedriver', '130', exact=False)
+
+
+# --- Descargas reanudables ----------------------------------------------------------
+
+@pytest.fixture
+def descarga(servidor, monkeypatch):
+    """Genera un archivo de 300 KiB (y su SHA-256) y elimina las esperas entre reintentos."""
+    monkeypatch.setattr(webdrivers.time, 'sleep', lambda segundos: None)
+    cuerpo = os.urandom(300 * 1024)
+    return cuerpo, hashlib.sha256(cuerpo).hexdigest()
+
+
+def test_descarga_cortada_se_reanuda_con_range(servidor, descarga, tmp_path):
+    cuerpo, suma = descarga
+    url = servidor.publicar('/driver.zip', cuerpo, cortes=1)
+    destino = tmp_path / 'driver.zip'
+
+    webdrivers._download_file(url, destino, expected_size=len(cuerpo), sha256=suma, retries=2)
+
+    assert destino.read_bytes() == cuerpo
+    assert not (tmp_path / 'driver.zip.part').exists()
+    peticiones = servidor.cabeceras('/driver.zip')
+    assert len(peticiones) == 2
+    assert 'Range' not in peticiones[0]
+    assert peticiones[1]['Range'].startswith('bytes=') and peticiones[1]['Range'] != 'bytes=0-'
+
+
+def test_servidor_sin_range_vuelve_a_empezar(servidor, descarga, tmp_path):
+    cuerpo, suma = descarga
+    url = servidor.publicar('/driver.zip', cuerpo, range=False, cortes=1)
+    destino = tmp_path / 'driver.zip'
+
+    webdrivers._download_file(url, destino, sha256=suma, retries=2)
+
+    # El servidor respondió 200 al Range: el parcial se descarta en vez de duplicarse
+    assert destino.read_bytes() == cuerpo
+    assert 'Range' in servidor.cabeceras('/driver.zip')[1]
+
+
+def test_parcial_se_conserva_entre_llamadas(servidor, descarga, tmp_path):
+    cuerpo, suma = descarga
+    url = servidor.publicar('/driver.zip', cuerpo, cortes=1)
+    destino = tmp_path / 'driver.zip'
+    parcial = tmp_path / 'driver.zip.part'
+
+    with pytest.raises(RuntimeError, match='tras 1 intentos'):
+        webdrivers._download_file(url, destino, sha256=suma, retries=0)
+    assert 0 < parcial.stat().st_size < len(cuerpo)
+    assert not destino.exists()
+
+    webdrivers._download_file(url, destino, sha256=suma, retries=0)
+    assert destino.read_bytes() == cuerpo
+    assert not parcial.exists()
+
+
+def test_parcial_completo_se_verifica_tras_416(servidor, descarga, tmp_path):
+    cuerpo, suma = descarga
+    url = servidor.publicar('/driver.zip', cuerpo)
+    destino = tmp_path / 'driver.zip'
+    (tmp_path / 'driver.zip.part').write_bytes(cuerpo)
+
+    webdrivers._download_file(url, destino, sha256=suma, retries=0)
+
+    assert destino.read_bytes() == cuerpo
+
+
+def test_suma_incorrecta_descarta_el_fichero(servidor, descarga, tmp_path):
+    cuerpo, _ = descarga
+    url = servidor.publicar('/driver.zip', cuerpo)
+    destino = tmp_path / 'driver.zip'
+
+    with pytest.raises(RuntimeError, match='SHA-256'):
+        webdrivers._download_file(url, destino, sha256='0' * 64, retries=0)
+
+    assert not destino.exists()
+    assert not (tmp_path / 'driver.zip.part').exists()
+
+
+def test_tamano_inesperado_descarta_el_fichero(servidor, descarga, tmp_path):
+    cuerpo, _ = descarga
+    url = servidor.publicar('/driver.zip', cuerpo)
+    destino = tmp_path / 'driver.zip'
+
+    with pytest.raises(RuntimeError, match='Tamaño inesperado'):
+        webdrivers._download_file(url, destino, expected_size=len(cuerpo) + 1, retries=0)
+
+    assert not destino.exists()
+    assert not (tmp_path / 'driver.zip.part').exists()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Detección de trampas de rastreo (espacios de URLs infinitos).
+
+Calendarios, parámetros de sesión y navegación facetada generan URLs únicas sin fin.
+El detector agrupa las URLs por plantilla (ver `plantillas_url`) y mide el
+rendimiento de cada plantilla: enlaces nuevos descubiertos por visita que llevan
+fuera de la propia plantilla, en las últimas `ventana` visitas. Un calendario sólo
+descubre más días del calendario, así que su rendimiento tiende a cero y la plantilla
+se marca como trampa. La ventana deslizante evita que los enlaces de navegación del
+sitio, descubiertos en la primera página de la plantilla, retrasen la detección.
+
+Las plantillas marcadas se limitan ('cap': no se visitan más) o se despriorizan
+('deprioritize': sólo reciben una fracción del peso en la selección aleatoria).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+
+from plantillas_url import plantilla_url
+
+__all__ = ["DetectorTrampas"]
+
+
+class DetectorTrampas:
+    """Observador de `ClicToris` que mide el rendimiento por plantilla de URL."""
+
+    def __init__(self, modo: str = 'cap', min_visitas: int = 5, rendimiento_minimo: float = 0.5,
+                 peso_trampa: float = 0.05, ventana: int = 5):
+        self.modo = modo
+        self.min_visitas = min_visitas
+        self.ventana = max(1, ventana)
+        self.rendimiento_minimo = rendimiento_minimo
+        self.peso_trampa = peso_trampa
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Olvida las estadísticas y trampas del sitio anterior (nueva semilla)."""
+        # plantilla -> [visitas, enlaces nuevos fuera de la plantilla en cada una de las últimas visitas]
+        self._estadisticas: dict[str, list] = {}
+        # Hashes de las URLs ya descubiertas (más compacto que guardar las cadenas)
+        self._descubiertas = set()
+        self._ultima = None
+        self.trampas = set()
+
+    def rendimiento(self, plantilla: str) -> float:
+        """Enlaces nuevos fuera de la plantilla por visita, en las últimas `ventana` visitas."""
+        _, recientes = self._estadisticas.get(plantilla, (0, ()))
+        return sum(recientes) / len(recientes) if recientes else float('inf')
+
+    def es_trampa(self, url: str) -> bool:
+        return plantilla_url(url) in self.trampas
+
+    def registrar_visita(self, url: str, destinos) -> None:
+        """Anota una visita a `url` y los enlaces que se encontraron en ella."""
+        plantilla = plantilla_url(url)
+        estadisticas = self._estadisticas.setdefault(plantilla, [0, deque(maxlen=self.ventana)])
+        estadisticas[0] += 1
+        nuevos = 0
+        for destino in destinos:
+            clave = hash(destino)
+            if clave in self._descubiertas:
+                continue
+            self._descubiertas.add(clave)
+            if plantilla_url(destino) != plantilla:
+                nuevos += 1
+        estadisticas[1].append(nuevos)
+        if (plantilla not in self.trampas and estadisticas[0] >= self.min_visitas
+                and self.rendimiento(plantilla) < self.rendimiento_minimo):
+            self.trampas.add(plantilla)
+            print(f"    🪤 Posible trampa de rastreo: {plantilla} "
+                  f"({estadisticas[0]} visitas, rendimiento {self.rendimiento(plantilla):.2f})")
+
+    def filtrar(self, enlaces: list[dict]) -> list[dict]:
+        """En modo 'cap' quita los enlaces de plantillas marcadas como trampa."""
+        if self.modo != 'cap' or not self.trampas:
+            return enlaces
+        return [e for e in enlaces if not self.es_trampa(e['url'])]
+
+    def pesos(self, enlaces: list[dict]) -> list[float]:
+        """Pesos de selección: las plantillas trampa reciben `peso_trampa`."""
+        return [self.peso_trampa if self.es_trampa(e['url']) else 1.0 for e in enlaces]
+
+    # --- Eventos emitidos por ClicToris ---
+
+    def al_enlaces(self, programa, url_actual, enlaces) -> None:
+        # Cada página cuenta una vez aunque se relean sus enlaces sin navegar
+        if not url_actual or url_actual == self._ultima:
+            return
+        self._ultima = url_actual
+        self.registrar_visita(url_actual, (e['url'] for e in enlaces))
+
+    def al_finalizar(self, programa) -> None:
+        if self.trampas:
+            print(f"🪤 Plantillas marcadas como trampa ({self.modo}): {len(self.trampas)}")
+            for plantilla in sorted(self.trampas):
+                print(f"    {plantilla}")
@@ -8,11 +8,19 @@ Función principal:
 El instalador intenta (en este orden):
 1. Detectar si el webdriver ya existe en PATH (shutil.which).
 2. Intentar usar la versión adecuada descargando desde los repositorios oficiales
-   (Chromedriver: chromedriver.storage.googleapis.com, Geckodriver: GitHub releases).
+   (Chromedriver: manifiestos de Chrome for Testing, o chromedriver.storage.googleapis.com
+   para Chrome < 115; Geckodriver: GitHub releases).
 3. Instalar en un directorio de usuario en Windows (sin elevación) o en
    `/usr/local/bin` cuando sea posible. Si `/usr/local/bin` no es escribible,
    usa `~/.local/bin`.
 
+Las descargas se hacen en streaming con memoria acotada, se reanudan con `Range` si la
+conexión se corta, se verifican (tamaño y, si se conoce, SHA-256) y sólo entonces se
+renombran atómicamente a su destino (ver `_download_file`).
+
+Las instalaciones se serializan entre procesos con un fichero de bloqueo en la caché
+(`_install_lock`): si varios procesos arrancan a la vez sólo uno descarga.
+
 Este módulo no requiere dependencias extra (usa urllib, zipfile, tarfile).
 """
 
@@ -20,20 +28,24 @@ from __future__ import annotations
 
 import os
 import sys
-import stat
 import json
 import shutil
 import platform
 import tempfile
 import urllib.request
 import urllib.error
+import urllib.parse
 import zipfile
 import tarfile
 import subprocess
+import hashlib
+import http.client
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Callable
 
-__all__ = ["ensure_webdriver"]
+__all__ = ["ensure_webdriver", "resolve_cached_driver", "chrome_for_testing_driver"]
 
 
 def _is_executable(path: Path) -> bool:
@@ -44,81 +56,470 @@ def _which(name: str) -> Optional[str]:
     return shutil.which(name)
 
 
-def _download_url(url: str, dest: Path) -> None:
-    req = urllib.request.Request(url, headers={"User-Agent": "clictoriano-webdriver-installer/1.0"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        with open(dest, "wb") as fh:
-            fh.write(resp.read())
+_USER_AGENT = "clictoriano-webdriver-installer/1.0"
+_CHUNK_SIZE = 64 * 1024
+
+
+def _hash_file(path: Path, hasher) -> None:
+    """Añade el contenido de `path` a `hasher` en bloques (memoria acotada)."""
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b''):
+            hasher.update(chunk)
 
 
-def _download_url_with_progress(url: str, dest: Path, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
-    """Descarga `url` a `dest`, llamando a `progress_callback(bytes_downloaded, total_bytes)` si se proporciona.
-    total_bytes puede ser None si el servidor no proporciona Content-Length.
+def _download_file(url: str, dest: Path,
+                   progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                   expected_size: Optional[int] = None, sha256: Optional[str] = None,
+                   retries: int = 3, timeout: float = 30) -> Path:
+    """Descarga `url` a `dest` en streaming, reanudable y verificada.
+
+    - Los datos se escriben en `dest.part`; si la conexión se corta, el siguiente intento
+      (o la siguiente llamada) pide sólo lo que falta con una cabecera `Range`.
+    - Al terminar se comprueba el tamaño (Content-Length/Content-Range o `expected_size`)
+      y, si se indica, el SHA-256. Un fichero que no cuadra se descarta.
+    - Sólo entonces se hace fsync y se renombra atómicamente a `dest`.
+
+    `progress_callback(bytes_descargados, total)` recibe `total=None` si el servidor no lo indica.
     """
-    req = urllib.request.Request(url, headers={"User-Agent": "clictoriano-webdriver-installer/1.0"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        total = None
+    dest = Path(dest)
+    part = dest.with_name(dest.name + '.part')
+    last_error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(min(2 ** (attempt - 1), 8))
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"User-Agent": _USER_AGENT}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+        req = urllib.request.Request(url, headers=headers)
         try:
-            cl = resp.getheader('Content-Length')
-            if cl:
-                total = int(cl)
-        except Exception:
-            total = None
-
-        chunk_size = 32 * 1024
-        downloaded = 0
-        with open(dest, 'wb') as fh:
-            while True:
-                chunk = resp.read(chunk_size)
-                if not chunk:
-                    break
-                fh.write(chunk)
-                downloaded += len(chunk)
-                if progress_callback:
-                    try:
-                        progress_callback(downloaded, total)
-                    except Exception:
-                        # No queremos que un error en el callback interrumpa la descarga
-                        pass
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                total = None
+                if resp.status == 206:
+                    # Content-Range: bytes inicio-fin/total
+                    rango = resp.getheader('Content-Range') or ''
+                    if rango.rpartition('/')[2].isdigit():
+                        total = int(rango.rpartition('/')[2])
+                else:
+                    # El servidor ignoró el Range: empezar de cero
+                    offset = 0
+                    cl = resp.getheader('Content-Length')
+                    if cl and cl.isdigit():
+                        total = int(cl)
+                total = total or expected_size
+                downloaded = offset
+                with open(part, 'ab' if offset else 'wb') as fh:
+                    while True:
+                        chunk = resp.read(_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        fh.write(chunk)
+                        downloaded += len(chunk)
+                        if progress_callback:
+                            try:
+                                progress_callback(downloaded, total)
+                            except Exception:
+                                # No queremos que un error en el callback interrumpa la descarga
+                                pass
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                if total is not None and downloaded < total:
+                    raise ConnectionError(f'descarga incompleta ({downloaded} de {total} bytes)')
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # El parcial ya está completo (o es mayor que el recurso): verificarlo abajo
+                pass
+            elif e.code >= 500 or e.code == 429:
+                last_error = e
+                continue
+            else:
+                raise
+        except (urllib.error.URLError, ConnectionError, TimeoutError, OSError, http.client.HTTPException) as e:
+            last_error = e
+            continue
+
+        size = part.stat().st_size
+        if expected_size is not None and size != expected_size:
+            part.unlink()
+            raise RuntimeError(f'Tamaño inesperado al descargar {url}: {size} bytes (esperados {expected_size})')
+        if sha256:
+            hasher = hashlib.sha256()
+            _hash_file(part, hasher)
+            if hasher.hexdigest().lower() != sha256.lower():
+                part.unlink()
+                raise RuntimeError(f'La suma SHA-256 de {url} no coincide')
+        os.replace(part, dest)
+        return dest
+    raise RuntimeError(f'No se pudo descargar {url} tras {retries + 1} intentos: {last_error}')
+
+
+_DRIVER_NAMES = ('chromedriver', 'chromedriver.exe', 'geckodriver', 'geckodriver.exe')
+
+
+def _write_atomic(src, target: Path) -> None:
+    """Vuelca el flujo `src` en `target`: temporal junto al destino, fsync y rename atómico.
+
+    Nadie puede encontrar nunca un binario a medio escribir en `target`.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f'.{target.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            shutil.copyfileobj(src, out, _CHUNK_SIZE)
+            out.flush()
+            os.fsync(out.fileno())
+        os.chmod(tmp_name, 0o755)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
 
 
 def _extract_archive(archive: Path, dest_dir: Path) -> Path:
-    """Extrae zip o tar.gz y devuelve la ruta del binario extraído (el primero que parezca un driver)."""
-    extracted = None
+    """Extrae del zip o tar.gz sólo el binario del driver y devuelve su ruta en `dest_dir`.
+
+    El miembro se elige a partir del índice del archivo (sin extraer nada más): primero
+    por nombre exacto (`chromedriver`, `geckodriver.exe`...) y, si no, el primer fichero
+    marcado como ejecutable. Se descomprime en streaming con `_write_atomic`.
+    """
     if archive.suffix == ".zip":
         with zipfile.ZipFile(archive, "r") as z:
-            z.extractall(path=dest_dir)
-            for name in z.namelist():
-                base = Path(name).name
-                if base.lower().startswith(("chromedriver", "geckodriver")):
-                    extracted = dest_dir / base
-                    break
+            members = [i for i in z.infolist() if not i.is_dir()]
+            member = next((i for i in members if Path(i.filename).name.lower() in _DRIVER_NAMES), None)
+            if member is None:
+                # Permisos Unix en los 16 bits altos de external_attr
+                member = next((i for i in members if (i.external_attr >> 16) & 0o111), None)
+            if member is None:
+                raise RuntimeError(f"No se encontró el binario del driver en {archive}")
+            extracted = dest_dir / Path(member.filename).name
+            with z.open(member) as src:
+                _write_atomic(src, extracted)
     else:
-        # tar.gz or .tar.bz2
+        # tar.gz o .tar.bz2
         with tarfile.open(archive, "r:*") as t:
-            t.extractall(path=dest_dir)
-            for member in t.getmembers():
-                base = Path(member.name).name
-                if base.lower().startswith(("chromedriver", "geckodriver")):
-                    extracted = dest_dir / base
-                    break
+            members = [m for m in t.getmembers() if m.isfile()]
+            member = next((m for m in members if Path(m.name).name.lower() in _DRIVER_NAMES), None)
+            if member is None:
+                member = next((m for m in members if m.mode & 0o111), None)
+            if member is None:
+                raise RuntimeError(f"No se encontró el binario del driver en {archive}")
+            extracted = dest_dir / Path(member.name).name
+            src = t.extractfile(member)
+            if src is None:
+                raise RuntimeError(f"No se pudo leer {member.name} de {archive}")
+            with src:
+                _write_atomic(src, extracted)
+    return extracted
+
+
+# --- Caché local de archivos de webdrivers -------------------------------------------
+#
+# <CACHE_DIR>/archivos/ab/<sha256>                          archivo descargado (zip/tar.gz)
+# <CACHE_DIR>/binarios/<driver>/<versión>/<plataforma>/<bin> binario ya extraído
+# <CACHE_DIR>/indice.json                                   driver|versión|plataforma → entrada
+#
+# Varias versiones conviven una junto a otra; la resolución versión → binario no usa la red.
+# Cuando el tamaño total supera CACHE_MAX_BYTES se eliminan las entradas usadas hace más tiempo.
+
+CACHE_DIR = Path(os.environ.get('CLICTORIANO_WEBDRIVER_CACHE') or (Path.home() / '.clictoriano' / 'webdrivers'))
+CACHE_MAX_BYTES = int(os.environ.get('CLICTORIANO_WEBDRIVER_CACHE_MB', '500')) * 1024 * 1024
+
+
+def _platform_key() -> str:
+    return f"{platform.system()}-{platform.machine()}".lower()
+
+
+def _version_tuple(version: str) -> tuple:
+    return tuple(int(p) if p.isdigit() else 0 for p in version.split('.'))
+
+
+def _cache_read_index() -> dict:
+    try:
+        with open(CACHE_DIR / 'indice.json', 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _cache_write_index(index: dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=CACHE_DIR, prefix='.indice-')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        json.dump(index, fh, indent=1)
+    os.replace(tmp_name, CACHE_DIR / 'indice.json')
+
+
+def resolve_cached_driver(driver: str, version: Optional[str] = None, exact: bool = False) -> Optional[str]:
+    """Devuelve la ruta del binario `driver` en caché para esta plataforma, sin usar la red.
+
+    `version` puede ser completa ('142.0.7444.175') o un prefijo ('142'); con `exact=True`
+    debe coincidir entera. Sin versión se devuelve la más reciente. None si no hay ninguna.
+    """
+    index = _cache_read_index()
+    plat = _platform_key()
+    candidates = []
+    for key, entry in index.items():
+        if entry.get('driver') != driver or entry.get('platform') != plat:
+            continue
+        v = entry.get('version') or ''
+        if version and not (v == version or (not exact and v.startswith(version + '.'))):
+            continue
+        binary = CACHE_DIR / entry.get('binary', '')
+        if _is_executable(binary):
+            candidates.append((_version_tuple(v), key, binary))
+    if not candidates:
+        return None
+    _, key, binary = max(candidates)
+    index[key]['last_used'] = time.time()
+    try:
+        _cache_write_index(index)
+    except OSError:
+        pass
+    return str(binary)
+
+
+def _cache_store(driver: str, version: str, archive: Path, binary: Path) -> Path:
+    """Guarda `archive` (por su SHA-256) y una copia de `binary` en la caché; devuelve la copia."""
+    hasher = hashlib.sha256()
+    _hash_file(archive, hasher)
+    digest = hasher.hexdigest()
+    archive_dest = CACHE_DIR / 'archivos' / digest[:2] / digest
+    if not archive_dest.exists():
+        archive_dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_copy = archive_dest.with_name(digest + '.tmp')
+        shutil.copyfile(archive, tmp_copy)
+        os.replace(tmp_copy, archive_dest)
+
+    plat = _platform_key()
+    rel_binary = Path('binarios') / driver / version / plat / binary.name
+    binary_dest = CACHE_DIR / rel_binary
+    binary_dest.parent.mkdir(parents=True, exist_ok=True)
+    with open(binary, 'rb') as src:
+        _write_atomic(src, binary_dest)
+
+    index = _cache_read_index()
+    index[f"{driver}|{version}|{plat}"] = {
+        'driver': driver,
+        'version': version,
+        'platform': plat,
+        'archive_name': archive.name,
+        'sha256': digest,
+        'size': archive_dest.stat().st_size + binary_dest.stat().st_size,
+        'binary': rel_binary.as_posix(),
+        'last_used': time.time(),
+    }
+    _cache_evict(index)
+    _cache_write_index(index)
+    return binary_dest
+
+
+def _cache_evict(index: dict, max_bytes: Optional[int] = None) -> None:
+    """Elimina entradas (LRU) hasta que la caché quepa en `max_bytes`."""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    total = sum(e.get('size', 0) for e in index.values())
+    for key, entry in sorted(index.items(), key=lambda kv: kv[1].get('last_used', 0)):
+        if total <= max_bytes or len(index) <= 1:
+            break
+        del index[key]
+        total -= entry.get('size', 0)
+        shutil.rmtree(CACHE_DIR / Path(entry.get('binary', '')).parent, ignore_errors=True)
+        # El archivo puede estar compartido por otra entrada (mismo contenido)
+        if not any(e.get('sha256') == entry.get('sha256') for e in index.values()):
+            try:
+                (CACHE_DIR / 'archivos' / entry['sha256'][:2] / entry['sha256']).unlink()
+            except (OSError, KeyError):
+                pass
+
+
+# --- Metadatos de versiones (Chrome for Testing) -------------------------------------
+#
+# Los manifiestos JSON se guardan en <CACHE_DIR>/metadatos junto con su ETag y
+# Last-Modified. Durante METADATA_TTL segundos se usan sin tocar la red; después se
+# revalidan con una petición condicional (304 → se reutiliza la copia local). Si la red
+# falla se usa la última copia aunque esté caducada.
+
+CFT_BASE_URL = (os.environ.get('CLICTORIANO_CFT_URL') or 'https://googlechromelabs.github.io/chrome-for-testing').rstrip('/')
+METADATA_TTL = int(os.environ.get('CLICTORIANO_METADATA_TTL', str(6 * 3600)))
+
+
+def _fetch_json_cached(url: str, ttl: Optional[int] = None) -> Optional[dict]:
+    """Devuelve el JSON de `url` usando la caché local con TTL y revalidación condicional."""
+    ttl = METADATA_TTL if ttl is None else ttl
+    name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:20]
+    meta_dir = CACHE_DIR / 'metadatos'
+    body_path = meta_dir / f'{name}.json'
+    info_path = meta_dir / f'{name}.info.json'
+
+    def _load(path: Path):
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _save(path: Path, data) -> None:
+        meta_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=meta_dir, prefix='.meta-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh)
+        os.replace(tmp_name, path)
+
+    info = _load(info_path) or {}
+    cached = _load(body_path) if body_path.exists() else None
+    if cached is not None and time.time() - info.get('fetched_at', 0) < ttl:
+        return cached
+
+    headers = {"User-Agent": _USER_AGENT}
+    if cached is not None:
+        if info.get('etag'):
+            headers['If-None-Match'] = info['etag']
+        if info.get('last_modified'):
+            headers['If-Modified-Since'] = info['last_modified']
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as resp:
+            data = json.load(resp)
+            info = {'url': url, 'etag': resp.getheader('ETag'), 'last_modified': resp.getheader('Last-Modified'),
+                    'fetched_at': time.time()}
+        _save(body_path, data)
+        _save(info_path, info)
+        return data
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            info['fetched_at'] = time.time()
+            try:
+                _save(info_path, info)
+            except OSError:
+                pass
+            return cached
+        return cached
+    except (urllib.error.URLError, OSError, ValueError, http.client.HTTPException):
+        # Sin red: mejor una copia caducada que nada
+        return cached
+
+
+def _cft_platform() -> Optional[str]:
+    system = platform.system()
+    machine = platform.machine().lower()
+    if system == 'Linux':
+        return 'linux64' if machine in ('x86_64', 'amd64') else None
+    if system == 'Darwin':
+        return 'mac-arm64' if machine in ('arm64', 'aarch64') else 'mac-x64'
+    if system == 'Windows':
+        return 'win64' if machine.endswith('64') else 'win32'
+    return None
+
+
+def chrome_for_testing_driver(chrome_version: Optional[str] = None) -> Optional[tuple[str, str]]:
+    """Resuelve (versión, url) del chromedriver de Chrome for Testing para `chrome_version`.
+
+    Usa el manifiesto `latest-versions-per-milestone-with-downloads.json` (cacheado) y
+    devuelve el chromedriver más reciente del mismo milestone que Chrome, que es compatible
+    con cualquier Chrome de ese milestone. Sin versión se usa el milestone más reciente.
+    Devuelve None si no hay datos (sin red y sin caché, Chrome < 115 o plataforma sin binarios).
+    """
+    plat = _cft_platform()
+    if not plat:
+        return None
+    data = _fetch_json_cached(f"{CFT_BASE_URL}/latest-versions-per-milestone-with-downloads.json")
+    milestones = (data or {}).get('milestones') or {}
+    if not milestones:
+        return None
+    if chrome_version:
+        entry = milestones.get(chrome_version.split('.')[0])
+    else:
+        entry = milestones[max(milestones, key=lambda m: int(m) if m.isdigit() else 0)]
+    if not entry:
+        return None
+    for download in (entry.get('downloads') or {}).get('chromedriver') or []:
+        if download.get('platform') == plat and download.get('url'):
+            return entry.get('version'), download['url']
+    return None
+
+
+# --- Bloqueo entre procesos ------------------------------------------------------------
+#
+# Varios workers o trabajos de CI pueden arrancar a la vez y llamar al instalador. Un
+# único fichero de bloqueo en CACHE_DIR serializa las instalaciones (y las escrituras del
+# índice de la caché): el primero descarga, los demás esperan y reutilizan su resultado.
+
+INSTALL_LOCK_TIMEOUT = float(os.environ.get('CLICTORIANO_INSTALL_LOCK_TIMEOUT', '600'))
+
+
+@contextmanager
+def _install_lock(timeout: Optional[float] = None, quiet: bool = False):
+    """Bloqueo exclusivo entre procesos (`fcntl` en POSIX, `msvcrt` en Windows)."""
+    timeout = INSTALL_LOCK_TIMEOUT if timeout is None else timeout
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fh = open(CACHE_DIR / 'instalacion.lock', 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
 
-    if not extracted:
-        # fallback: pick any executable file in dest_dir
-        for p in dest_dir.rglob("*"):
-            if p.is_file() and os.access(str(p), os.X_OK):
-                extracted = p
+            def _try_lock():
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+
+            def _unlock():
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            def _try_lock():
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            def _unlock():
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+        deadline = time.monotonic() + timeout
+        warned = False
+        while True:
+            try:
+                _try_lock()
                 break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Tiempo de espera agotado esperando el bloqueo de instalación ({CACHE_DIR})")
+                if not warned and not quiet:
+                    print("Otro proceso está instalando el webdriver; esperando a que termine...")
+                    warned = True
+                time.sleep(0.2)
+        try:
+            yield
+        finally:
+            try:
+                _unlock()
+            except OSError:
+                pass
+    finally:
+        fh.close()
 
-    if not extracted:
-        raise RuntimeError(f"No se encontró binario después de extraer {archive}")
 
-    return extracted
+def _install_binary(source: Path, target: Path) -> None:
+    """Copia `source` a `target` de forma atómica (copia temporal + fsync + rename)."""
+    with open(source, 'rb') as src:
+        _write_atomic(src, target)
 
 
-def _make_executable(path: Path) -> None:
-    mode = path.stat().st_mode
-    path.chmod(mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+def _print_windows_path_snippet() -> None:
+    snippet = (
+        "$cd = Join-Path $env:LOCALAPPDATA 'webdrivers'\n"
+        "if (-not (Test-Path $cd)) { New-Item -ItemType Directory -Path $cd -Force }\n"
+        "$old = [Environment]::GetEnvironmentVariable('Path', 'User')\n"
+        "if ($old -notlike \"*$cd*\") {\n"
+        "    [Environment]::SetEnvironmentVariable('Path', \"$old;$cd\", 'User')\n"
+        "    Write-Output \"Ruta agregada al PATH de usuario: $cd\"\n"
+        "} else {\n"
+        "    Write-Output \"La ruta ya está en el PATH de usuario: $cd\"\n"
+        "}\n"
+        "Write-Output 'Reinicia la terminal o la sesión para que los cambios surtan efecto.'\n"
+    )
+    print('\nPara usar el webdriver desde nuevas terminales en Windows, ejecuta este snippet en PowerShell (como usuario):\n')
+    print(snippet)
 
 
 def _get_chrome_binary_candidates() -> list[str]:
@@ -160,37 +561,33 @@ def _get_firefox_binary_candidates() -> list[str]:
 
 
 def _get_version_from_binary(path: str) -> Optional[str]:
-    try:
-        proc = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10)
-        out = proc.stdout.strip() or proc.stderr.strip()
-        if out:
-            # ejemplos: "Google Chrome 117.0.5938.132" o "Firefox 121.0"
-            parts = out.strip().split()
-            for part in parts[::-1]:
-                if any(c.isdigit() for c in part):
-                    return part
-        return None
-    except Exception:
-        return None
+    # ejemplos: "Google Chrome 117.0.5938.132" o "Firefox 121.0" (cacheado por mtime/tamaño)
+    from descubrimiento import version_binario
+    return version_binario(path)
 
 
 def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None, quiet: bool = False, force_install: bool = False,
                      progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
-                     status_callback: Optional[Callable[[str, Optional[object]], None]] = None) -> str:
+                     status_callback: Optional[Callable[[str, Optional[object]], None]] = None,
+                     offline: bool = False) -> str:
     """
     Asegura que el webdriver para `browser` esté instalado y devuelve la ruta al ejecutable.
 
     browser: 'chrome'|'chromium'|'firefox'
     install_dir: directorio destino opcional. Si None, elegirá un directorio adecuado.
+    offline: no usar la red; instalar la versión adecuada desde la caché local (CACHE_DIR).
     """
     browser = (browser or 'chrome').lower()
 
-    # 1) Verificar si ya existe en PATH (a menos que se fuerce la instalación)
+    # 1) Reutilizar el driver resuelto en la ejecución anterior o el que haya en PATH
+    #    (a menos que se fuerce la instalación)
+    from descubrimiento import recordar_resuelto, resuelto
     name = 'chromedriver' if browser in ('chrome', 'chromium') else 'geckodriver'
-    existing = _which(name)
-    if existing and not force_install:
+    existing = None if force_install else (resuelto(name) or _which(name))
+    if existing:
+        recordar_resuelto(name, existing)
         if not quiet:
-            print(f"webdriver ya en PATH: {existing}")
+            print(f"webdriver ya disponible: {existing}")
         return existing
 
     system = platform.system()
@@ -210,7 +607,35 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
                 out_dir = Path.home() / '.local' / 'bin'
 
     out_dir.mkdir(parents=True, exist_ok=True)
+    target = out_dir / (name + ('.exe' if system == 'Windows' else ''))
 
+    waiting_since = time.time()
+    with _install_lock(quiet=quiet):
+        # Si otro proceso lo instaló mientras esperábamos el bloqueo, reutilizar su resultado
+        try:
+            fresh = target.stat().st_mtime >= waiting_since
+        except OSError:
+            fresh = False
+        if fresh and _is_executable(target):
+            if not quiet:
+                print(f"webdriver instalado por otro proceso: {target}")
+            recordar_resuelto(name, str(target))
+            return str(target)
+        if not force_install:
+            existing = _which(name)
+            if existing:
+                recordar_resuelto(name, existing)
+                return existing
+        instalado = _install_webdriver(browser, system, out_dir, quiet, progress_callback, status_callback, offline)
+        recordar_resuelto(name, instalado)
+        return instalado
+
+
+def _install_webdriver(browser: str, system: str, out_dir: Path, quiet: bool,
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]],
+                       status_callback: Optional[Callable[[str, Optional[object]], None]],
+                       offline: bool) -> str:
+    """Descarga (o toma de la caché) e instala el driver; se llama con `_install_lock` tomado."""
     tmp = Path(tempfile.mkdtemp(prefix='clicdrv_'))
     try:
         if browser in ('chrome', 'chromium'):
@@ -224,24 +649,52 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
             version = None
             if chrome_path:
                 version = _get_version_from_binary(chrome_path)
-            if version:
-                major = version.split('.')[0]
-                # Obtener versión exacta de chromedriver para el major
-                url_latest = f"https://chromedriver.storage.googleapis.com/LATEST_RELEASE_{major}"
+            major = version.split('.')[0] if version else None
+            download_url = None
+            if offline:
+                # Sin red: la versión más reciente en caché compatible con el major de Chrome
+                cached = resolve_cached_driver('chromedriver', major)
+                if not cached:
+                    raise RuntimeError(f"Modo sin conexión: no hay chromedriver {major or ''} en la caché ({CACHE_DIR})")
+                chromedriver_version = Path(cached).parent.parent.name
             else:
-                # fallback a última versión
-                url_latest = "https://chromedriver.storage.googleapis.com/LATEST_RELEASE"
+                # Chrome >= 115: manifiestos de Chrome for Testing (cacheados con TTL y revalidación)
+                cft = chrome_for_testing_driver(version)
+                if cft:
+                    chromedriver_version, download_url = cft
+                else:
+                    # Versiones antiguas: servicio LATEST_RELEASE clásico
+                    if version:
+                        url_latest = f"https://chromedriver.storage.googleapis.com/LATEST_RELEASE_{major}"
+                    else:
+                        url_latest = "https://chromedriver.storage.googleapis.com/LATEST_RELEASE"
+                    try:
+                        req = urllib.request.Request(url_latest, headers={"User-Agent": "clictoriano-installer/1.0"})
+                        with urllib.request.urlopen(req, timeout=30) as r:
+                            chromedriver_version = r.read().decode().strip()
+                    except Exception as e:
+                        raise RuntimeError(f"No se pudo obtener versión de chromedriver: {e}")
+                cached = resolve_cached_driver('chromedriver', chromedriver_version, exact=True)
 
-            try:
-                req = urllib.request.Request(url_latest, headers={"User-Agent": "clictoriano-installer/1.0"})
-                with urllib.request.urlopen(req, timeout=30) as r:
-                    chromedriver_version = r.read().decode().strip()
-            except Exception as e:
-                raise RuntimeError(f"No se pudo obtener versión de chromedriver: {e}")
+            target = out_dir / ('chromedriver.exe' if system == 'Windows' else 'chromedriver')
+            if cached:
+                if not quiet:
+                    print(f"Usando chromedriver {chromedriver_version} de la caché local: {cached}")
+                if status_callback:
+                    try:
+                        status_callback('cache_hit', {'path': cached, 'version': chromedriver_version})
+                    except Exception:
+                        pass
+                _install_binary(Path(cached), target)
+                if not quiet:
+                    print(f"chromedriver instalado en: {target}")
+                return str(target)
 
             # determinar sufijo de plataforma
             machine = platform.machine().lower()
-            if system == 'Windows':
+            if download_url:
+                archive_name = Path(urllib.parse.urlparse(download_url).path).name
+            elif system == 'Windows':
                 plat = 'win32'
                 archive_name = f"chromedriver_{plat}.zip"
             elif system == 'Linux':
@@ -258,7 +711,7 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
             else:
                 raise RuntimeError(f"OS no soportado para chromedriver: {system}")
 
-            download_url = f"https://chromedriver.storage.googleapis.com/{chromedriver_version}/{archive_name}"
+            download_url = download_url or f"https://chromedriver.storage.googleapis.com/{chromedriver_version}/{archive_name}"
             archive_path = tmp / archive_name
             if not quiet:
                 print(f"Descargando chromedriver {chromedriver_version} desde {download_url}")
@@ -268,16 +721,14 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
                         status_callback('download_start', {'url': download_url, 'archive': archive_name, 'version': chromedriver_version})
                     except Exception:
                         pass
-                if progress_callback:
-                    _download_url_with_progress(download_url, archive_path, progress_callback)
-                else:
-                    _download_url(download_url, archive_path)
+                _download_file(download_url, archive_path, progress_callback=progress_callback)
             except urllib.error.HTTPError as e:
                 # algunos nombres de archivo para mac pueden variar, intentar alternativa
-                if system == 'Darwin':
+                if system == 'Darwin' and 'chromedriver.storage.googleapis.com' in download_url:
                     alt = tmp / 'chromedriver_mac64.zip'
                     try:
-                        _download_url(f"https://chromedriver.storage.googleapis.com/{chromedriver_version}/chromedriver_mac64.zip", alt)
+                        _download_file(f"https://chromedriver.storage.googleapis.com/{chromedriver_version}/chromedriver_mac64.zip", alt,
+                                       progress_callback=progress_callback)
                         archive_path = alt
                     except Exception:
                         raise
@@ -285,37 +736,48 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
                     raise
 
             extracted = _extract_archive(archive_path, tmp)
-            target = out_dir / ('chromedriver.exe' if system == 'Windows' else 'chromedriver')
-            shutil.move(str(extracted), str(target))
-            _make_executable(target)
+            try:
+                # Guardar archivo y binario en la caché para futuras instalaciones sin red
+                extracted = _cache_store('chromedriver', chromedriver_version, archive_path, extracted)
+            except OSError as e:
+                if not quiet:
+                    print(f"Aviso: no se pudo guardar chromedriver en la caché: {e}")
+            _install_binary(extracted, target)
 
             if not quiet:
                 print(f"chromedriver instalado en: {target}")
             # Si estamos en Windows, mostrar snippet de PowerShell para añadir al PATH de usuario
             if system == 'Windows' and not quiet:
-                p = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local')) / 'webdrivers'
-                snippet = (
-                    "$cd = Join-Path $env:LOCALAPPDATA 'webdrivers'\n"
-                    "if (-not (Test-Path $cd)) { New-Item -ItemType Directory -Path $cd -Force }\n"
-                    "$old = [Environment]::GetEnvironmentVariable('Path', 'User')\n"
-                    "if ($old -notlike \"*$cd*\") {\n"
-                    "    [Environment]::SetEnvironmentVariable('Path', \"$old;$cd\", 'User')\n"
-                    "    Write-Output \"Ruta agregada al PATH de usuario: $cd\"\n"
-                    "} else {\n"
-                    "    Write-Output \"La ruta ya está en el PATH de usuario: $cd\"\n"
-                    "}\n"
-                    "Write-Output 'Reinicia la terminal o la sesión para que los cambios surtan efecto.'\n"
-                )
-                print('\nPara usar el webdriver desde nuevas terminales en Windows, ejecuta este snippet en PowerShell (como usuario):\n')
-                print(snippet)
+                _print_windows_path_snippet()
             return str(target)
 
         elif browser == 'firefox':
-            # Obtener última release de geckodriver desde GitHub
-            api_url = 'https://api.github.com/repos/mozilla/geckodriver/releases/latest'
-            req = urllib.request.Request(api_url, headers={"User-Agent": "clictoriano-installer/1.0"})
-            with urllib.request.urlopen(req, timeout=30) as r:
-                data = json.load(r)
+            target = out_dir / ('geckodriver.exe' if system == 'Windows' else 'geckodriver')
+            gecko_version = None
+            if offline:
+                cached = resolve_cached_driver('geckodriver')
+                if not cached:
+                    raise RuntimeError(f"Modo sin conexión: no hay geckodriver en la caché ({CACHE_DIR})")
+            else:
+                # Obtener última release de geckodriver desde GitHub
+                api_url = 'https://api.github.com/repos/mozilla/geckodriver/releases/latest'
+                req = urllib.request.Request(api_url, headers={"User-Agent": "clictoriano-installer/1.0"})
+                with urllib.request.urlopen(req, timeout=30) as r:
+                    data = json.load(r)
+                gecko_version = (data.get('tag_name') or '').lstrip('v') or None
+                cached = resolve_cached_driver('geckodriver', gecko_version, exact=True) if gecko_version else None
+            if cached:
+                if not quiet:
+                    print(f"Usando geckodriver de la caché local: {cached}")
+                if status_callback:
+                    try:
+                        status_callback('cache_hit', {'path': cached, 'version': gecko_version})
+                    except Exception:
+                        pass
+                _install_binary(Path(cached), target)
+                if not quiet:
+                    print(f"geckodriver instalado en: {target}")
+                return str(target)
 
             assets = data.get('assets', [])
             chosen_asset = None
@@ -376,14 +838,12 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
                     status_callback('download_start', {'url': download_url, 'archive': archive_name})
                 except Exception:
                     pass
-            if progress_callback:
-                _download_url_with_progress(download_url, archive_path, progress_callback)
-            else:
-                _download_url(download_url, archive_path)
+            # La API de GitHub indica el tamaño de cada asset: verificarlo tras la descarga
+            _download_file(download_url, archive_path, progress_callback=progress_callback,
+                           expected_size=chosen_asset.get('size'))
             extracted = _extract_archive(archive_path, tmp)
-            target = out_dir / ('geckodriver.exe' if system == 'Windows' else 'geckodriver')
-            shutil.move(str(extracted), str(target))
-            _make_executable(target)
+            _install_binary(extracted, target)
+            installed_archive = archive_path
 
             # Probar el binario resultante para detectar problemas de formato (p.ej. Exec format error)
             try:
@@ -409,13 +869,11 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
                     alt_url = asset.get('browser_download_url')
                     alt_archive = tmp / Path(aname).name
                     try:
-                        if progress_callback:
-                            _download_url_with_progress(alt_url, alt_archive, progress_callback)
-                        else:
-                            _download_url(alt_url, alt_archive)
+                        _download_file(alt_url, alt_archive, progress_callback=progress_callback,
+                                       expected_size=asset.get('size'))
                         alt_extracted = _extract_archive(alt_archive, tmp)
-                        shutil.move(str(alt_extracted), str(target))
-                        _make_executable(target)
+                        _install_binary(alt_extracted, target)
+                        installed_archive = alt_archive
                         # Probar de nuevo
                         proc = subprocess.run([str(target), '--version'], capture_output=True, text=True, timeout=8)
                         if proc.returncode == 0 or proc.stdout or proc.stderr:
@@ -437,22 +895,15 @@ def ensure_webdriver(browser: str = 'chrome', install_dir: Optional[str] = None,
             else:
                 if not quiet:
                     print(f"geckodriver instalado en: {target}")
+            if gecko_version:
+                try:
+                    # Guardar el asset que funcionó para futuras instalaciones sin red
+                    _cache_store('geckodriver', gecko_version, installed_archive, target)
+                except OSError as e:
+                    if not quiet:
+                        print(f"Aviso: no se pudo guardar geckodriver en la caché: {e}")
             if system == 'Windows' and not quiet:
-                p = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local')) / 'webdrivers'
-                snippet = (
-                    "$cd = Join-Path $env:LOCALAPPDATA 'webdrivers'\n"
-                    "if (-not (Test-Path $cd)) { New-Item -ItemType Directory -Path $cd -Force }\n"
-                    "$old = [Environment]::GetEnvironmentVariable('Path', 'User')\n"
-                    "if ($old -notlike \"*$cd*\") {\n"
-                    "    [Environment]::SetEnvironmentVariable('Path', \"$old;$cd\", 'User')\n"
-                    "    Write-Output \"Ruta agregada al PATH de usuario: $cd\"\n"
-                    "} else {\n"
-                    "    Write-Output \"La ruta ya está en el PATH de usuario: $cd\"\n"
-                    "}\n"
-                    "Write-Output 'Reinicia la terminal o la sesión para que los cambios surtan efecto.'\n"
-                )
-                print('\nPara usar el webdriver desde nuevas terminales en Windows, ejecuta este snippet en PowerShell (como usuario):\n')
-                print(snippet)
+                _print_windows_path_snippet()
             return str(target)
 
         else:
@@ -472,9 +923,12 @@ if __name__ == '__main__':
     p.add_argument('--browser', choices=['chrome', 'chromium', 'firefox'], default='chrome')
     p.add_argument('--install-dir', help='Directorio de instalación (opcional)')
     p.add_argument('--quiet', action='store_true')
+    p.add_argument('--force', action='store_true', help='Instalar aunque ya haya un driver en PATH')
+    p.add_argument('--offline', action='store_true', help='No usar la red: instalar desde la caché local')
     args = p.parse_args()
     try:
-        path = ensure_webdriver(args.browser, install_dir=args.install_dir, quiet=args.quiet)
+        path = ensure_webdriver(args.browser, install_dir=args.install_dir, quiet=args.quiet,
+                                force_install=args.force, offline=args.offline)
         print(path)
     except Exception as e:
         print(f"ERROR: {e}", file=sys.stderr)